@@ -1,8 +1,16 @@
-from .token import (
-        DemurrageToken,
-        DemurrageTokenSettings,
-        DemurrageRedistribution,
-        )
-from .token import create
-from .token import bytecode
-from .token import args
+# The token interface pulls in the chainlib transaction and abi modules, and is loaded on first use so that importing a submodule, for example to run an entry point, stays fast.
+__all__ = [
+        'DemurrageToken',
+        'DemurrageTokenSettings',
+        'DemurrageRedistribution',
+        'create',
+        'bytecode',
+        'args',
+        ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import token
+        return getattr(token, name)
+    raise AttributeError('module {} has no attribute {}'.format(__name__, name))
@@ -0,0 +1,185 @@
+"""Integer port of the subset of ABDKMath64x64 used by DemurrageTokenSingleNocap.
+
+Values are signed 64.64-bit fixed point numbers represented as python ints. Functions round like their solidity counterparts, and raise where the solidity code reverts, so results are bit-identical to those of the contract.
+"""
+
+MIN_64X64 = -0x80000000000000000000000000000000
+MAX_64X64 = 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+ONE_64X64 = 0x10000000000000000
+
+# 2^(2^-(i+1)) as 128.128 fixed point, for i in 0..63
+_EXP_2_FACTORS = (
+        0x16A09E667F3BCC908B2FB1366EA957D3E,
+        0x1306FE0A31B7152DE8D5A46305C85EDEC,
+        0x1172B83C7D517ADCDF7C8C50EB14A791F,
+        0x10B5586CF9890F6298B92B71842A98363,
+        0x1059B0D31585743AE7C548EB68CA417FD,
+        0x102C9A3E778060EE6F7CACA4F7A29BDE8,
+        0x10163DA9FB33356D84A66AE336DCDFA3F,
+        0x100B1AFA5ABCBED6129AB13EC11DC9543,
+        0x10058C86DA1C09EA1FF19D294CF2F679B,
+        0x1002C605E2E8CEC506D21BFC89A23A00F,
+        0x100162F3904051FA128BCA9C55C31E5DF,
+        0x1000B175EFFDC76BA38E31671CA939725,
+        0x100058BA01FB9F96D6CACD4B180917C3D,
+        0x10002C5CC37DA9491D0985C348C68E7B3,
+        0x1000162E525EE054754457D5995292026,
+        0x10000B17255775C040618BF4A4ADE83FC,
+        0x1000058B91B5BC9AE2EED81E9B7D4CFAB,
+        0x100002C5C89D5EC6CA4D7C8ACC017B7C9,
+        0x10000162E43F4F831060E02D839A9D16D,
+        0x100000B1721BCFC99D9F890EA06911763,
+        0x10000058B90CF1E6D97F9CA14DBCC1628,
+        0x1000002C5C863B73F016468F6BAC5CA2B,
+        0x100000162E430E5A18F6119E3C02282A5,
+        0x1000000B1721835514B86E6D96EFD1BFE,
+        0x100000058B90C0B48C6BE5DF846C5B2EF,
+        0x10000002C5C8601CC6B9E94213C72737A,
+        0x1000000162E42FFF037DF38AA2B219F06,
+        0x10000000B17217FBA9C739AA5819F44F9,
+        0x1000000058B90BFCDEE5ACD3C1CEDC823,
+        0x100000002C5C85FE31F35A6A30DA1BE50,
+        0x10000000162E42FF0999CE3541B9FFFCF,
+        0x100000000B17217F80F4EF5AADDA45554,
+        0x10000000058B90BFBF8479BD5A81B51AD,
+        0x1000000002C5C85FDF84BD62AE30A74CC,
+        0x100000000162E42FEFB2FED257559BDAA,
+        0x1000000000B17217F7D5A7716BBA4A9AE,
+        0x100000000058B90BFBE9DDBAC5E109CCE,
+        0x10000000002C5C85FDF4B15DE6F17EB0D,
+        0x1000000000162E42FEFA494F1478FDE05,
+        0x10000000000B17217F7D20CF927C8E94C,
+        0x1000000000058B90BFBE8F71CB4E4B33D,
+        0x100000000002C5C85FDF477B662B26945,
+        0x10000000000162E42FEFA3AE53369388C,
+        0x100000000000B17217F7D1D351A389D40,
+        0x10000000000058B90BFBE8E8B2D3D4EDE,
+        0x1000000000002C5C85FDF4741BEA6E77E,
+        0x100000000000162E42FEFA39FE95583C2,
+        0x1000000000000B17217F7D1CFB72B45E1,
+        0x100000000000058B90BFBE8E7CC35C3F0,
+        0x10000000000002C5C85FDF473E242EA38,
+        0x1000000000000162E42FEFA39F02B772C,
+        0x10000000000000B17217F7D1CF7D83C1A,
+        0x1000000000000058B90BFBE8E7BDCBE2E,
+        0x100000000000002C5C85FDF473DEA871F,
+        0x10000000000000162E42FEFA39EF44D91,
+        0x100000000000000B17217F7D1CF79E949,
+        0x10000000000000058B90BFBE8E7BCE544,
+        0x1000000000000002C5C85FDF473DE6ECA,
+        0x100000000000000162E42FEFA39EF366F,
+        0x1000000000000000B17217F7D1CF79AFA,
+        0x100000000000000058B90BFBE8E7BCD6D,
+        0x10000000000000002C5C85FDF473DE6B2,
+        0x1000000000000000162E42FEFA39EF358,
+        0x10000000000000000B17217F7D1CF79AB,
+        )
+
+_LOG2_E = 0x171547652B82FE1777D0FFDA0D23A7D12
+_LN_2 = 0xB17217F7D1CF79ABC9E3B39803F2F6AF
+
+
+def to_int128(v):
+    """Truncate integer to its lower 128 bits, interpreted as two's complement.
+
+    Also converts a sign-extended 256-bit abi word (e.g. an int128 contract return value) to a signed python int.
+    """
+    v &= 0xffffffffffffffffffffffffffffffff
+    if v > MAX_64X64:
+        v -= 0x100000000000000000000000000000000
+    return v
+
+
+def _check(v):
+    if v < MIN_64X64 or v > MAX_64X64:
+        raise OverflowError('64x64 overflow: {}'.format(v))
+    return v
+
+
+def from_uint(x):
+    if x < 0 or x > 0x7FFFFFFFFFFFFFFF:
+        raise OverflowError('value {} does not fit 64x64'.format(x))
+    return x << 64
+
+
+def to_uint(x):
+    if x < 0:
+        raise ValueError('negative 64x64 value {}'.format(x))
+    return (x >> 64) & 0xffffffffffffffff
+
+
+def add(x, y):
+    return _check(x + y)
+
+
+def sub(x, y):
+    return _check(x - y)
+
+
+def mul(x, y):
+    return _check((x * y) >> 64)
+
+
+def div(x, y):
+    if y == 0:
+        raise ZeroDivisionError('64x64 division by zero')
+    # solidity signed division rounds towards zero
+    r = (abs(x) << 64) // abs(y)
+    if (x < 0) != (y < 0):
+        r = -r
+    return _check(r)
+
+
+def log_2(x):
+    if x <= 0:
+        raise ValueError('log of non-positive 64x64 value {}'.format(x))
+
+    msb = x.bit_length() - 1
+    result = (msb - 64) << 64
+    ux = x << (127 - msb)
+    bit = 0x8000000000000000
+    while bit > 0:
+        ux *= ux
+        b = ux >> 255
+        ux >>= 127 + b
+        result += bit * b
+        bit >>= 1
+
+    return to_int128(result)
+
+
+def ln(x):
+    if x <= 0:
+        raise ValueError('log of non-positive 64x64 value {}'.format(x))
+    # the contract multiplies the unsigned reinterpretation of log_2 modulo 2^256
+    v = ((log_2(x) % (1 << 256)) * _LN_2) % (1 << 256)
+    return to_int128(v >> 128)
+
+
+def exp_2(x):
+    if x >= 0x400000000000000000:
+        raise OverflowError('64x64 exp_2 overflow: {}'.format(x))
+    if x < -0x400000000000000000:
+        return 0
+
+    result = 0x80000000000000000000000000000000
+    bit = 0x8000000000000000
+    for factor in _EXP_2_FACTORS:
+        if x & bit > 0:
+            result = (result * factor) >> 128
+        bit >>= 1
+
+    result >>= 63 - (x >> 64)
+    if result > MAX_64X64:
+        raise OverflowError('64x64 exp_2 overflow: {}'.format(x))
+
+    return result
+
+
+def exp(x):
+    if x >= 0x400000000000000000:
+        raise OverflowError('64x64 exp overflow: {}'.format(x))
+    if x < -0x400000000000000000:
+        return 0
+
+    return exp_2(to_int128((x * _LOG2_E) >> 128))
@@ -0,0 +1,400 @@
+"""Asyncio client for DemurrageToken contracts.
+
+Requests are built with the synchronous DemurrageToken builders, and sent through an async connection with a do coroutine. Connections over HTTP and WebSocket are provided, and need the optional aiohttp dependency.
+"""
+
+# standard imports
+import asyncio
+import json
+import logging
+import time
+
+# external imports
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+from chainlib.eth.constant import ZERO_ADDRESS
+from chainlib.eth.tx import receipt
+from chainlib.eth.error import RevertEthException
+from chainlib.eth.dialect import DefaultErrorParser
+from chainlib.jsonrpc import (
+        IntSequenceGenerator,
+        jsonrpc_result,
+        )
+from chainlib.error import RPCException
+from potaahto.symbols import snake_and_camel
+
+# local imports
+from .token import DemurrageToken
+
+logg = logging.getLogger(__name__)
+
+error_parser = DefaultErrorParser()
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_POOL_SIZE = 100
+DEFAULT_TIMEOUT = 60.0
+
+
+def _check_aiohttp():
+    if aiohttp == None:
+        raise ImportError('async connections need aiohttp, install erc20-demurrage-token[async]')
+
+
+class AsyncHTTPConnection:
+    """Async json-rpc connection over HTTP, keeping a pool of open connections to the node.
+
+    :param url: Node json-rpc endpoint
+    :type url: str
+    :param pool_size: Maximum number of simultaneous HTTP connections
+    :type pool_size: int
+    :param timeout: Request timeout, in seconds
+    :type timeout: float
+    :param session: Session to send requests with. If set, the session is not closed when the connection is closed
+    :type session: aiohttp.ClientSession
+    :raises ImportError: aiohttp is not installed
+    """
+
+    def __init__(self, url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, session=None):
+        _check_aiohttp()
+        self.url = url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = session
+        self.own_session = session == None
+
+
+    # the session binds to the running event loop, and is created on first use
+    def __session(self):
+        if self.session == None:
+            self.session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.pool_size),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    )
+        return self.session
+
+
+    async def do(self, o):
+        """Send a json-rpc request.
+
+        :param o: json-rpc request object
+        :type o: dict
+        :raises chainlib.error.RPCException: Request failed
+        :raises chainlib.eth.error.EthException: Node returned an error
+        :returns: json-rpc result
+        """
+        try:
+            async with self.__session().post(self.url, json=o) as r:
+                v = await r.json(content_type=None)
+        except aiohttp.ClientError as e:
+            raise RPCException(e)
+        return jsonrpc_result(v, error_parser)
+
+
+    async def close(self):
+        if self.session != None and self.own_session:
+            await self.session.close()
+            self.session = None
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+    def __str__(self):
+        return 'async http {}'.format(self.url)
+
+
+class AsyncWebSocketConnection:
+    """Async json-rpc connection multiplexing concurrent requests over a single WebSocket.
+
+    Request ids are replaced with ones unique to the connection, and responses are matched to requests by id. The socket is opened on first use.
+
+    :param url: Node json-rpc WebSocket endpoint
+    :type url: str
+    :param timeout: Request timeout, in seconds
+    :type timeout: float
+    :param session: Session to open the socket with. If set, the session is not closed when the connection is closed
+    :type session: aiohttp.ClientSession
+    :raises ImportError: aiohttp is not installed
+    """
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT, session=None):
+        _check_aiohttp()
+        self.url = url
+        self.timeout = timeout
+        self.session = session
+        self.own_session = session == None
+        self.id_generator = IntSequenceGenerator()
+        self.pending = {}
+        self.ws = None
+        self.reader = None
+        self.lock = None
+
+
+    async def connect(self):
+        if self.lock == None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            if self.ws != None:
+                return
+            if self.session == None:
+                self.session = aiohttp.ClientSession()
+            try:
+                self.ws = await self.session.ws_connect(self.url)
+            except aiohttp.ClientError as e:
+                raise RPCException(e)
+            self.reader = asyncio.ensure_future(self.__read())
+            logg.debug('({}) connected'.format(self))
+
+
+    async def __read(self):
+        try:
+            async for msg in self.ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                r = json.loads(msg.data)
+                fut = self.pending.pop(r.get('id'), None)
+                if fut == None:
+                    logg.warning('({}) discarding response with unknown id {}'.format(self, r.get('id')))
+                elif not fut.done():
+                    fut.set_result(r)
+        finally:
+            self.ws = None
+            pending = self.pending
+            self.pending = {}
+            for fut in pending.values():
+                if not fut.done():
+                    fut.set_exception(RPCException('websocket connection to {} closed'.format(self.url)))
+
+
+    async def do(self, o):
+        """Send a json-rpc request.
+
+        :param o: json-rpc request object
+        :type o: dict
+        :raises chainlib.error.RPCException: Socket closed before the response was received
+        :raises chainlib.eth.error.EthException: Node returned an error
+        :raises asyncio.TimeoutError: No response within the connection timeout
+        :returns: json-rpc result
+        """
+        await self.connect()
+        # the socket may have closed again before this request got to use it
+        ws = self.ws
+        if ws == None:
+            raise RPCException('websocket connection to {} closed'.format(self.url))
+        o = dict(o)
+        o['id'] = self.id_generator.next()
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[o['id']] = fut
+        try:
+            try:
+                await ws.send_str(json.dumps(o))
+            except (aiohttp.ClientError, ConnectionError) as e:
+                raise RPCException(e)
+            r = await asyncio.wait_for(fut, self.timeout)
+        finally:
+            self.pending.pop(o['id'], None)
+        return jsonrpc_result(r, error_parser)
+
+
+    async def close(self):
+        if self.ws != None:
+            await self.ws.close()
+        if self.reader != None:
+            await self.reader
+            self.reader = None
+        if self.session != None and self.own_session:
+            await self.session.close()
+            self.session = None
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+    def __str__(self):
+        return 'async websocket {}'.format(self.url)
+
+
+class AsyncDemurrageTokenClient:
+    """Asyncio client running DemurrageToken calls and transactions through an async connection.
+
+    At most concurrency requests are in flight at any time, however many coroutines use the client. Receipt polling only holds a slot while a request is in flight.
+
+    Transactions are built and signed synchronously before the first await, so transactions from concurrent coroutines get consecutive nonces as long as the nonce oracle does not block, as with chainlib.eth.nonce.OverrideNonceOracle.
+
+    :param chain_spec: Chain spec
+    :type chain_spec: chainlib.chain.ChainSpec
+    :param conn: Async connection
+    :type conn: AsyncHTTPConnection or AsyncWebSocketConnection
+    :param sender_address: Address to make calls and send transactions with
+    :type sender_address: str
+    :param signer: Transaction signer, needed for transactions only
+    :type signer: funga.eth.signer.EIP155Signer
+    :param gas_oracle: Gas oracle
+    :type gas_oracle: chainlib.eth.gas.GasOracle
+    :param nonce_oracle: Nonce oracle
+    :type nonce_oracle: chainlib.eth.nonce.NonceOracle
+    :param concurrency: Maximum number of requests in flight
+    :type concurrency: int
+    """
+
+    def __init__(self, chain_spec, conn, sender_address=ZERO_ADDRESS, signer=None, gas_oracle=None, nonce_oracle=None, concurrency=DEFAULT_CONCURRENCY):
+        self.token = DemurrageToken(chain_spec, signer=signer, gas_oracle=gas_oracle, nonce_oracle=nonce_oracle)
+        self.conn = conn
+        self.sender_address = sender_address
+        self.concurrency = concurrency
+        self.semaphore = None
+
+
+    async def do(self, o):
+        """Send a json-rpc request through the connection, waiting for a free slot first.
+
+        :param o: json-rpc request object
+        :type o: dict
+        :returns: json-rpc result
+        """
+        # the semaphore binds to the running event loop on python < 3.10, and is created on first use
+        if self.semaphore == None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.semaphore:
+            return await self.conn.do(o)
+
+
+    async def call(self, method, contract_address, *args, parser=None):
+        """Make a contract call with a DemurrageToken builder method.
+
+        :param method: Builder method name, e.g. balance_of
+        :type method: str
+        :param contract_address: Token contract address
+        :type contract_address: str
+        :param parser: Method to decode the result with. If not set, the DemurrageToken parse method of the same name is used
+        :type parser: function
+        :returns: Decoded result
+        """
+        o = getattr(self.token, method)(contract_address, *args, sender_address=self.sender_address)
+        if parser == None:
+            parser = getattr(self.token, 'parse_' + method)
+        r = await self.do(o)
+        return parser(r)
+
+
+    async def call_many(self, calls):
+        """Make many contract calls concurrently.
+
+        :param calls: Builder method name, contract address and call arguments for each call
+        :type calls: list of tuple
+        :rtype: list
+        :returns: Decoded results, in the order of calls
+        """
+        return await asyncio.gather(*[self.call(*v) for v in calls])
+
+
+    async def balance_of(self, contract_address, address):
+        return await self.call('balance_of', contract_address, address)
+
+
+    async def balances_of(self, contract_address, addresses):
+        return await self.call_many([('balance_of', contract_address, address,) for address in addresses])
+
+
+    async def actual_period(self, contract_address):
+        return await self.call('actual_period', contract_address)
+
+
+    async def wait(self, tx_hash_hex, delay=0.5, timeout=0.0):
+        """Poll for the receipt of a transaction, as chainlib.eth.connection.EthHTTPConnection.wait does.
+
+        :param tx_hash_hex: Transaction hash, in hex
+        :type tx_hash_hex: str
+        :param delay: Polling interval, in seconds
+        :type delay: float
+        :param timeout: Maximum time to wait, in seconds (0 = no timeout)
+        :type timeout: float
+        :raises TimeoutError: Timeout reached
+        :raises chainlib.eth.error.RevertEthException: Transaction confirmed but failed
+        :rtype: dict
+        :returns: Transaction receipt
+        """
+        t = time.monotonic()
+        i = 0
+        while True:
+            r = await self.do(receipt(tx_hash_hex))
+            if r != None:
+                r = snake_and_camel(r)
+                if r['block_hash'] == None:
+                    logg.warning('poll receipt attempt {} returned receipt but with a null block hash value!'.format(i))
+                else:
+                    if int(r['status'], 16) == 0:
+                        raise RevertEthException(tx_hash_hex)
+                    return r
+
+            if timeout > 0.0 and time.monotonic() - t + delay >= timeout:
+                raise TimeoutError(tx_hash_hex)
+            i += 1
+            await asyncio.sleep(delay)
+
+
+    async def send(self, tx, wait=True, delay=0.5, timeout=0.0):
+        """Send a signed transaction and optionally wait for its receipt.
+
+        :param tx: Transaction hash and json-rpc request, as returned by the DemurrageToken transaction builders
+        :type tx: tuple
+        :param wait: Wait for the receipt
+        :type wait: bool
+        :param delay: Receipt polling interval, in seconds
+        :type delay: float
+        :param timeout: Maximum time to wait for the receipt, in seconds (0 = no timeout)
+        :type timeout: float
+        :rtype: tuple
+        :returns: Transaction hash, and receipt if wait is set, otherwise None
+        """
+        (tx_hash_hex, o) = tx
+        await self.do(o)
+        logg.debug('sent tx {}'.format(tx_hash_hex))
+        r = None
+        if wait:
+            r = await self.wait(tx_hash_hex, delay=delay, timeout=timeout)
+        return (tx_hash_hex, r,)
+
+
+    async def mint_to(self, contract_address, address, value, **kwargs):
+        tx = self.token.mint_to(contract_address, self.sender_address, address, value)
+        return await self.send(tx, **kwargs)
+
+
+    async def transfer(self, contract_address, address, value, **kwargs):
+        tx = self.token.transfer(contract_address, self.sender_address, address, value)
+        return await self.send(tx, **kwargs)
+
+
+    async def change_period(self, contract_address, **kwargs):
+        tx = self.token.change_period(contract_address, self.sender_address)
+        return await self.send(tx, **kwargs)
+
+
+    async def apply_demurrage(self, contract_address, limit=0, **kwargs):
+        tx = self.token.apply_demurrage(contract_address, self.sender_address, limit=limit)
+        return await self.send(tx, **kwargs)
+
+
+    async def close(self):
+        await self.conn.close()
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *args):
+        await self.close()
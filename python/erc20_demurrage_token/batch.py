@@ -0,0 +1,237 @@
+# standard imports
+import ssl
+import json
+import logging
+from urllib.request import (
+        Request,
+        HTTPSHandler,
+        build_opener,
+        )
+from urllib.error import URLError
+
+# external imports
+from chainlib.eth.constant import ZERO_ADDRESS
+from chainlib.eth.jsonrpc import to_blockheight_param
+from chainlib.jsonrpc import (
+        IntSequenceGenerator,
+        jsonrpc_result,
+        )
+from chainlib.connection import (
+        JSONRPCHTTPConnection,
+        PreemptiveBasicAuthHandler,
+        )
+from chainlib.eth.dialect import DefaultErrorParser
+from chainlib.error import RPCException
+
+# local imports
+from .token import (
+        DemurrageToken,
+        DemurrageRedistribution,
+        )
+
+logg = logging.getLogger(__name__)
+
+error_parser = DefaultErrorParser()
+
+
+def connection_opener(rpc):
+    """Build a urllib opener applying the TLS verification and basic auth settings of a HTTP json-rpc connection, as its do method does.
+
+    The opener is not installed globally.
+
+    :param rpc: RPC connection
+    :type rpc: chainlib.connection.JSONRPCHTTPConnection
+    :rtype: urllib.request.OpenerDirector
+    """
+    ssl_ctx = None
+    if not rpc.verify_identity:
+        ssl_ctx = ssl.create_default_context()
+        ssl_ctx.check_hostname = False
+        ssl_ctx.verify_mode = ssl.CERT_NONE
+    handlers = [HTTPSHandler(context=ssl_ctx)]
+    if rpc.basic != None:
+        handler = PreemptiveBasicAuthHandler()
+        handler.add_password(
+                realm=None,
+                uri=rpc.location,
+                user=rpc.basic[0],
+                passwd=rpc.basic[1],
+                )
+        handlers.append(handler)
+    return build_opener(*handlers)
+
+
+def send_batch(rpc, requests):
+    """Send a list of json-rpc requests in a single json-rpc batch.
+
+    The batch is posted with the location, auth, TLS verification and timeout settings of the connection. If the connection is not a HTTP json-rpc connection, the requests are sent one by one with the connection do method instead.
+
+    :param rpc: RPC connection
+    :type rpc: chainlib.connection.RPCConnection
+    :param requests: json-rpc request objects
+    :type requests: list of dict
+    :rtype: list of dict
+    :returns: json-rpc response objects, in arbitrary order
+    """
+    if len(requests) == 0:
+        return []
+
+    if not isinstance(rpc, JSONRPCHTTPConnection):
+        r = []
+        for o in requests:
+            r.append({
+                'jsonrpc': '2.0',
+                'id': o['id'],
+                'result': rpc.do(o),
+                })
+        return r
+
+    req = Request(
+            rpc.location,
+            method='POST',
+            )
+    req.add_header('Content-Type', 'application/json')
+    if rpc.auth != None:
+        p = rpc.auth.urllib_header()
+        req.add_header(p[0], p[1])
+    data = json.dumps(requests)
+    logg.debug('(HTTP) send batch of {}'.format(len(requests)))
+
+    try:
+        r = connection_opener(rpc).open(
+            req,
+            data=data.encode('utf-8'),
+            timeout=rpc.timeout,
+            )
+    except URLError as e:
+        raise RPCException(e)
+
+    r = json.loads(r.read())
+    if not isinstance(r, list):
+        # a node that rejects the batch as a whole returns a single error object
+        jsonrpc_result(r, error_parser)
+        raise ValueError('expected json-rpc batch response, got {}'.format(r))
+    return r
+
+
+class DemurrageTokenBatch:
+    """Collects DemurrageToken eth_call requests for a single contract, to be sent as one json-rpc batch.
+
+    Every add method returns the index of the corresponding result in the list returned by decode and do.
+
+    :param chain_spec: Chain spec
+    :type chain_spec: chainlib.chain.ChainSpec
+    :param contract_address: Token contract address
+    :type contract_address: str
+    :param sender_address: Address to make calls with
+    :type sender_address: str
+    :param height: Block height or hash to make all calls against. If not set, 'latest' is used
+    :type height: int or str
+    """
+
+    def __init__(self, chain_spec, contract_address, sender_address=ZERO_ADDRESS, height=None):
+        self.token = DemurrageToken(chain_spec)
+        self.contract_address = contract_address
+        self.sender_address = sender_address
+        self.height = None
+        if height != None:
+            self.height = to_blockheight_param(height)
+        self.id_generator = IntSequenceGenerator()
+        self.requests = []
+        self.parsers = []
+
+
+    def add(self, o, parser):
+        """Add an arbitrary json-rpc request to the batch.
+
+        The request id is replaced with one unique within the batch.
+
+        :param o: json-rpc request object
+        :type o: dict
+        :param parser: Method to decode the result value with
+        :type parser: function
+        :rtype: int
+        :returns: Result index
+        """
+        o['id'] = self.id_generator.next()
+        if self.height != None and o['method'] == 'eth_call':
+            o['params'][1] = self.height
+        self.requests.append(o)
+        self.parsers.append(parser)
+        return len(self.requests) - 1
+
+
+    def balance_of(self, address):
+        o = self.token.balance_of(self.contract_address, address, sender_address=self.sender_address)
+        return self.add(o, self.token.parse_balance_of)
+
+
+    def base_balance_of(self, address):
+        o = self.token.base_balance_of(self.contract_address, address, sender_address=self.sender_address)
+        return self.add(o, self.token.parse_balance_of)
+
+
+    def redistributions(self, idx):
+        o = self.token.redistributions(self.contract_address, idx, sender_address=self.sender_address)
+        return self.add(o, self.__parse_redistribution)
+
+
+    def actual_period(self):
+        o = self.token.actual_period(self.contract_address, sender_address=self.sender_address)
+        return self.add(o, self.token.parse_actual_period)
+
+
+    def last_period(self):
+        o = self.token.last_period(self.contract_address, sender_address=self.sender_address)
+        return self.add(o, self.token.parse_last_period)
+
+
+    def redistribution_count(self):
+        o = self.token.redistribution_count(self.contract_address, sender_address=self.sender_address)
+        return self.add(o, self.token.parse_redistribution_count)
+
+
+    def demurrage_amount(self):
+        o = self.token.demurrage_amount(self.contract_address, sender_address=self.sender_address)
+        return self.add(o, self.token.parse_demurrage_amount)
+
+
+    def demurrage_timestamp(self):
+        o = self.token.demurrage_timestamp(self.contract_address, sender_address=self.sender_address)
+        return self.add(o, self.token.parse_demurrage_timestamp)
+
+
+    def __parse_redistribution(self, v):
+        return DemurrageRedistribution(self.token.parse_redistributions(v))
+
+
+    def request(self):
+        return self.requests
+
+
+    def decode(self, responses):
+        """Decode batch responses to typed results.
+
+        :param responses: json-rpc response objects
+        :type responses: list of dict
+        :raises chainlib.eth.error.EthException: A response in the batch is an error
+        :raises ValueError: A response is missing for a request
+        :rtype: list
+        :returns: Decoded results, in the order they were added
+        """
+        results = [None] * len(self.requests)
+        seen = [False] * len(self.requests)
+        for r in responses:
+            i = r['id']
+            v = jsonrpc_result(r, error_parser)
+            results[i] = self.parsers[i](v)
+            seen[i] = True
+        for i, v in enumerate(seen):
+            if not v:
+                raise ValueError('missing response for batch request {} ({})'.format(i, self.requests[i]['method']))
+        return results
+
+
+    def do(self, rpc):
+        r = send_batch(rpc, self.requests)
+        return self.decode(r)
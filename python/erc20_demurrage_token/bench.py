@@ -0,0 +1,255 @@
+# standard imports
+import os
+import csv
+import json
+import hashlib
+import logging
+import statistics
+
+logg = logging.getLogger(__name__)
+
+BASELINE_VERSION = 1
+# allowed relative increase of the median gas of a scenario against the baseline
+DEFAULT_THRESHOLD = 0.05
+
+
+class GasStats:
+    """Gas usage distribution of a benchmark scenario.
+
+    :param samples: Gas used by every round of the scenario
+    :type samples: list of int
+    """
+
+    def __init__(self, samples):
+        if len(samples) == 0:
+            raise ValueError('no samples')
+        self.samples = list(samples)
+        self.min = min(samples)
+        self.median = int(statistics.median(samples))
+        self.max = max(samples)
+
+
+    def serialize(self):
+        return {
+            'min': self.min,
+            'median': self.median,
+            'max': self.max,
+            'rounds': len(self.samples),
+                }
+
+
+    def __str__(self):
+        return 'min {} median {} max {} rounds {}'.format(self.min, self.median, self.max, len(self.samples))
+
+
+class GasRegression:
+    """A scenario whose median gas exceeds the baseline by more than the threshold.
+
+    :param name: Scenario name
+    :type name: str
+    :param baseline: Baseline median gas
+    :type baseline: int
+    :param current: Current median gas
+    :type current: int
+    """
+
+    def __init__(self, name, baseline, current):
+        self.name = name
+        self.baseline = baseline
+        self.current = current
+
+
+    def ratio(self):
+        return (self.current - self.baseline) / self.baseline
+
+
+    def __str__(self):
+        return '{}: median gas {} -> {} (+{:.2%})'.format(self.name, self.baseline, self.current, self.ratio())
+
+
+class GasBenchmark:
+    """Registry of named gas benchmark scenarios.
+
+    A scenario is a callable taking the test case and the round index, and returning the gas used in that round. Every scenario is run for the given number of rounds, with the chain state restored from the same EVM snapshot before each round. The round index can be used to vary the conditions of each round, for example the time within a period.
+    """
+
+    def __init__(self):
+        self.scenarios = {}
+
+
+    def register(self, name, fn, rounds=None):
+        """Register a scenario.
+
+        :param name: Unique scenario name
+        :type name: str
+        :param fn: Scenario callable
+        :type fn: function
+        :param rounds: Number of rounds for this scenario, overriding the number given to run
+        :type rounds: int
+        :raises ValueError: Name is already registered
+        """
+        if self.scenarios.get(name) != None:
+            raise ValueError('scenario {} already registered'.format(name))
+        self.scenarios[name] = (fn, rounds,)
+
+
+    def scenario(self, name, rounds=None):
+        """Decorator variant of register.
+        """
+        def wrapper(fn):
+            self.register(name, fn, rounds=rounds)
+            return fn
+        return wrapper
+
+
+    def run(self, case, rounds=5, names=None):
+        """Run scenarios against an EthTesterCase based test case with a deployed token.
+
+        :param case: Test case
+        :type case: erc20_demurrage_token.unittest.TestDemurrage
+        :param rounds: Default number of rounds per scenario
+        :type rounds: int
+        :param names: Scenarios to run. If not set, all registered scenarios are run.
+        :type names: list of str
+        :rtype: dict
+        :returns: Scenario name to erc20_demurrage_token.bench.GasStats
+        """
+        if names == None:
+            names = list(self.scenarios.keys())
+        snapshot_id = case.helper.take_snapshot()
+        results = {}
+        for name in names:
+            (fn, scenario_rounds) = self.scenarios[name]
+            if scenario_rounds == None:
+                scenario_rounds = rounds
+            samples = []
+            for i in range(scenario_rounds):
+                case.helper.revert_to_snapshot(snapshot_id)
+                case.helper.enable_auto_mine_transactions()
+                samples.append(fn(case, i))
+            results[name] = GasStats(samples)
+            logg.info('scenario {} {}'.format(name, results[name]))
+        case.helper.revert_to_snapshot(snapshot_id)
+        case.helper.enable_auto_mine_transactions()
+        return results
+
+
+def bytecode_hash(bytecode):
+    """Identifies the contract version a baseline was recorded for.
+
+    :param bytecode: Contract bytecode, hex
+    :type bytecode: str
+    :rtype: str
+    """
+    return hashlib.sha256(bytecode.strip().encode('utf-8')).hexdigest()
+
+
+def save_baseline(path, results, contract_hash=None):
+    """Write benchmark results to a baseline file.
+
+    :param path: Baseline file path
+    :type path: str
+    :param results: Scenario name to erc20_demurrage_token.bench.GasStats
+    :type results: dict
+    :param contract_hash: Hash of the benchmarked contract bytecode
+    :type contract_hash: str
+    """
+    o = {
+        'version': BASELINE_VERSION,
+        'contract': contract_hash,
+        'scenarios': {},
+            }
+    for k in sorted(results.keys()):
+        o['scenarios'][k] = results[k].serialize()
+    f = open(path + '.tmp', 'w')
+    json.dump(o, f, indent=2, sort_keys=True)
+    f.write('\n')
+    f.close()
+    os.replace(path + '.tmp', path)
+
+
+def load_baseline(path):
+    """Read a baseline file.
+
+    :param path: Baseline file path
+    :type path: str
+    :raises ValueError: Unsupported baseline file version
+    :rtype: dict
+    :returns: Baseline, or None if the file does not exist
+    """
+    try:
+        f = open(path, 'r')
+    except FileNotFoundError:
+        return None
+    o = json.load(f)
+    f.close()
+    if o.get('version') != BASELINE_VERSION:
+        raise ValueError('unsupported baseline version {}, expected {}'.format(o.get('version'), BASELINE_VERSION))
+    return o
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare benchmark results to a baseline.
+
+    Scenarios missing from either side are skipped.
+
+    :param results: Scenario name to erc20_demurrage_token.bench.GasStats
+    :type results: dict
+    :param baseline: Baseline, as returned by load_baseline
+    :type baseline: dict
+    :param threshold: Allowed relative increase of the median gas
+    :type threshold: float
+    :rtype: list of erc20_demurrage_token.bench.GasRegression
+    :returns: Regressed scenarios, in name order
+    """
+    regressions = []
+    for k in sorted(results.keys()):
+        v = baseline['scenarios'].get(k)
+        if v == None:
+            logg.info('scenario {} not in baseline'.format(k))
+            continue
+        if results[k].median > v['median'] * (1 + threshold):
+            regressions.append(GasRegression(k, v['median'], results[k].median))
+    return regressions
+
+
+def dump_curve(f, rows, fields, fmt='json'):
+    """Write rows of a cost curve to an open file.
+
+    :param f: Output file
+    :type f: file
+    :param rows: Curve points, as dicts keyed by field name
+    :type rows: list of dict
+    :param fields: Field names, in column order
+    :type fields: list of str
+    :param fmt: Output format, csv or json
+    :type fmt: str
+    """
+    if fmt == 'csv':
+        w = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        w.writeheader()
+        for row in rows:
+            w.writerow(row)
+    else:
+        json.dump([dict([(k, row.get(k),) for k in fields]) for row in rows], f, indent=2)
+        f.write('\n')
+
+
+def write_curve(path, rows, fields):
+    """Write rows of a cost curve to a file.
+
+    The format is chosen by the file extension, CSV for .csv and JSON otherwise.
+
+    :param path: Output file path
+    :type path: str
+    :param rows: Curve points, as dicts keyed by field name
+    :type rows: list of dict
+    :param fields: Field names, in column order
+    :type fields: list of str
+    """
+    fmt = 'json'
+    if path.endswith('.csv'):
+        fmt = 'csv'
+    f = open(path, 'w', newline='')
+    dump_curve(f, rows, fields, fmt=fmt)
+    f.close()
@@ -0,0 +1,122 @@
+# standard imports
+import logging
+import copy
+from collections import OrderedDict
+
+# external imports
+from chainlib.hash import keccak256_string_to_hex
+from chainlib.eth.jsonrpc import to_blockheight_param
+from hexathon import strip_0x
+
+logg = logging.getLogger(__name__)
+
+# contract values that cannot change for the lifetime of a contract address
+IMMUTABLE_METHODS = [
+    'decimals',
+    'name',
+    'symbol',
+    'periodStart',
+    'periodDuration',
+    'decayLevel',
+    'maxSealState',
+        ]
+
+BLOCK_TAGS = [
+    'latest',
+    'pending',
+    'earliest',
+        ]
+
+
+def method_selector(signature):
+    return keccak256_string_to_hex(signature)[:8]
+
+
+class DemurrageTokenCache:
+    """Connection wrapper memoizing eth_call results for DemurrageToken reads.
+
+    Calls to immutable contract values are cached per contract address and calldata for the lifetime of the cache object. Other calls are cached per block when made against a specific block height or hash, or when the cache has been pinned to a block with set_height. All other requests are passed through to the wrapped connection unchanged.
+
+    The object can be used anywhere an rpc connection with a do method is expected.
+
+    :param rpc: RPC connection
+    :type rpc: chainlib.connection.RPCConnection
+    :param height: Block number or block hash to pin 'latest' reads to
+    :type height: int or str
+    :param max_entries: Maximum number of block-tagged results to keep
+    :type max_entries: int
+    """
+
+    def __init__(self, rpc, height=None, max_entries=4096):
+        self.rpc = rpc
+        self.max_entries = max_entries
+        self.constants = {}
+        self.results = OrderedDict()
+        self.immutable_selectors = {}
+        for v in IMMUTABLE_METHODS:
+            self.immutable_selectors[method_selector(v + '()')] = v
+        self.height = None
+        self.set_height(height)
+
+
+    def set_height(self, height):
+        """Pin 'latest' reads to the given block number or block hash.
+
+        :param height: Block number or block hash, or None to unpin.
+        :type height: int or str
+        """
+        if height == None:
+            self.height = None
+        else:
+            self.height = self.__to_height_param(height)
+        logg.debug('cache height set to {}'.format(self.height))
+
+
+    def __to_height_param(self, height):
+        if isinstance(height, str) and len(strip_0x(height)) == 64:
+            return {'blockHash': height}
+        return to_blockheight_param(height)
+
+
+    def flush(self):
+        self.results = OrderedDict()
+
+
+    def do(self, o, *args, **kwargs):
+        if o['method'] != 'eth_call':
+            return self.rpc.do(o, *args, **kwargs)
+
+        tx = o['params'][0]
+        contract_address = tx['to'].lower()
+        data = strip_0x(tx['data'])
+
+        if self.immutable_selectors.get(data[:8]) != None:
+            k = (contract_address, data,)
+            r = self.constants.get(k)
+            if r == None:
+                r = self.rpc.do(o, *args, **kwargs)
+                self.constants[k] = r
+            return r
+
+        height = 'latest'
+        if len(o['params']) > 1:
+            height = o['params'][1]
+        if height == 'latest' and self.height != None:
+            o = copy.copy(o)
+            o['params'] = [o['params'][0], self.height]
+            height = self.height
+
+        if height in BLOCK_TAGS:
+            return self.rpc.do(o, *args, **kwargs)
+
+        k = (str(height), contract_address, data,)
+        r = self.results.get(k)
+        if r != None:
+            self.results.move_to_end(k)
+            return r
+
+        r = self.rpc.do(o, *args, **kwargs)
+        self.results[k] = r
+        if len(self.results) > self.max_entries:
+            self.results.popitem(last=False)
+        return r
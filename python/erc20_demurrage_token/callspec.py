@@ -0,0 +1,91 @@
+# external imports
+from chainlib.hash import keccak256_string_to_hex
+from hexathon import strip_0x
+
+
+def _pack_uint256(b, offset, v):
+    b[offset:offset+32] = int(v).to_bytes(32, byteorder='big')
+
+
+def _pack_int128(b, offset, v):
+    v = int(v)
+    if v < -(1 << 127) or v >= (1 << 127):
+        raise ValueError('value {} out of int128 range'.format(v))
+    b[offset:offset+32] = v.to_bytes(32, byteorder='big', signed=True)
+
+
+def _pack_address(b, offset, v):
+    v = bytes.fromhex(strip_0x(v))
+    if len(v) != 20:
+        raise ValueError('address must be 20 bytes, got {}'.format(len(v)))
+    b[offset:offset+12] = bytes(12)
+    b[offset+12:offset+32] = v
+
+
+def _pack_bytes32(b, offset, v):
+    v = bytes.fromhex(strip_0x(v))
+    if len(v) > 32:
+        raise ValueError('value must be at most 32 bytes, got {}'.format(len(v)))
+    # shorter values are left-padded, as by chainlib.eth.contract.ABIContractEncoder
+    b[offset:offset+32] = v.rjust(32, b'\x00')
+
+
+packers = {
+    'uint256': _pack_uint256,
+    'int128': _pack_int128,
+    'address': _pack_address,
+    'bytes32': _pack_bytes32,
+        }
+
+
+class CallSpec:
+    """Precompiled calldata encoder for a contract method taking only static, single word arguments.
+
+    The method selector is hashed once when the spec is created, and every encode call copies a preallocated template buffer holding the selector and packs the arguments into it in place.
+
+    :param method: Method name
+    :type method: str
+    :param types: Argument types, one of uint256, int128, address and bytes32 per word
+    :type types: list of str
+    :param signature: Argument list of the method signature, if it differs from the argument types. A static tuple is passed as one bytes32 type per member
+    :type signature: str
+    :raises ValueError: Unsupported argument type
+    """
+
+    def __init__(self, method, types=[], signature=None):
+        self.method = method
+        self.types = tuple(types)
+        self.packers = []
+        for typ in self.types:
+            packer = packers.get(typ)
+            if packer == None:
+                raise ValueError('unsupported argument type {}'.format(typ))
+            self.packers.append(packer)
+        if signature == None:
+            signature = '(' + ','.join(self.types) + ')'
+        self.signature = method + signature
+        self.selector = keccak256_string_to_hex(self.signature)[:8]
+        self.size = 4 + (32 * len(self.types))
+        self.template = bytearray(self.size)
+        self.template[:4] = bytes.fromhex(self.selector)
+
+
+    def encode(self, *args):
+        """Encode calldata for the given arguments.
+
+        :raises ValueError: Wrong number of arguments, or invalid argument value
+        :rtype: str
+        :returns: Calldata, in hex without 0x prefix
+        """
+        if len(args) != len(self.packers):
+            raise ValueError('{} takes {} arguments, got {}'.format(self.signature, len(self.packers), len(args)))
+        b = self.template[:]
+        offset = 4
+        for (packer, v) in zip(self.packers, args):
+            packer(b, offset, v)
+            offset += 32
+        return b.hex()
+
+
+    def __str__(self):
+        return '{} {}'.format(self.selector, self.signature)
@@ -0,0 +1,29 @@
+# standard imports
+import time
+
+
+class SystemClock:
+    """Clock returning the current system time as integer unix timestamp.
+    """
+
+    def now(self):
+        return int(time.time())
+
+
+class FixedClock:
+    """Clock returning a preset integer unix timestamp, e.g. the timestamp of a block.
+
+    :param timestamp: Unix timestamp
+    :type timestamp: int
+    """
+
+    def __init__(self, timestamp):
+        self.timestamp = int(timestamp)
+
+
+    def set(self, timestamp):
+        self.timestamp = int(timestamp)
+
+
+    def now(self):
+        return self.timestamp
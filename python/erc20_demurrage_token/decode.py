@@ -0,0 +1,63 @@
+# external imports
+from hexathon import strip_0x
+
+WORD_SIZE = 32
+
+
+def to_view(v):
+    """Wrap ABI encoded data in a memoryview.
+
+    Hex input is converted to bytes once. Bytes-like input is wrapped without copying, so words can be sliced from it without allocating new buffers.
+
+    :param v: ABI encoded data
+    :type v: str, bytes, bytearray or memoryview
+    :rtype: memoryview
+    """
+    if isinstance(v, str):
+        v = bytes.fromhex(strip_0x(v))
+    if isinstance(v, memoryview):
+        return v
+    return memoryview(v)
+
+
+def decode_word(v, i=0, signed=False):
+    """Decode a single 32 byte big-endian word.
+
+    :param v: ABI encoded data
+    :type v: str, bytes, bytearray or memoryview
+    :param i: Word index
+    :type i: int
+    :param signed: Decode as two's complement
+    :type signed: bool
+    :raises ValueError: Data ends before the word
+    :rtype: int
+    """
+    v = to_view(v)
+    offset = i * WORD_SIZE
+    if len(v) < offset + WORD_SIZE:
+        raise ValueError('data length {} too short for word {}'.format(len(v), i))
+    return int.from_bytes(v[offset:offset+WORD_SIZE], byteorder='big', signed=signed)
+
+
+def decode_words(v, count=None, offset=0):
+    """Decode consecutive 32 byte big-endian words.
+
+    :param v: ABI encoded data
+    :type v: str, bytes, bytearray or memoryview
+    :param count: Number of words to decode. If not set, all words from offset to the end of the data are decoded
+    :type count: int
+    :param offset: Index of first word
+    :type offset: int
+    :raises ValueError: Data ends before the last word, or is not word aligned
+    :rtype: list of int
+    """
+    v = to_view(v)
+    if count == None:
+        if len(v) % WORD_SIZE > 0:
+            raise ValueError('data length {} not a multiple of word size'.format(len(v)))
+        count = len(v) // WORD_SIZE - offset
+    start = offset * WORD_SIZE
+    end = start + (count * WORD_SIZE)
+    if len(v) < end:
+        raise ValueError('data length {} too short for {} words at offset {}'.format(len(v), count, offset))
+    return [int.from_bytes(v[i:i+WORD_SIZE], byteorder='big') for i in range(start, end, WORD_SIZE)]
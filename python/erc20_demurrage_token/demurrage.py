@@ -1,67 +1,180 @@
 # standard imports
 import logging
-import datetime
 import math
+import numbers
 
 # eternal imports
 from chainlib.eth.constant import ZERO_ADDRESS
+from dexif import to_fixed
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # local imports
 from .token import DemurrageToken
+from .clock import SystemClock
+from . import abdk
 
 logg = logging.getLogger(__name__)
 
-
 class DemurrageCalculator:
 
-    def __init__(self, interest_f_minute):
+    def __init__(self, interest_f_minute, decay_level=None, clock=None):
 
         self.r_min = interest_f_minute
         self.r_hour = 1 - ((1 -self.r_min) ** 60)
         self.r_day = 1 - ((1 -self.r_hour) ** 24)
         #self.r_week = interest_f_day ** 7
-        logg.info('demurrage calculator set with min {:.32f} hour {:.32f} day {:.32f}'.format(self.r_min, self.r_hour, self.r_day))
-
 
-    def amount_since(self, amount, timestamp):
-        delta = datetime.datetime.utcnow() - datetime.datetime.fromtimestamp(timestamp)
-        adjusted_amount = amount * ((1 - self.r_day) ** (delta.days))
-        logg.debug('adjusted for {} days {} -> {}'.format(delta.days, amount, adjusted_amount))
-
-        remainder = delta.seconds
-        remainder_hours = math.floor(remainder / (60 * 60))
-        adjusted_delta = adjusted_amount * ((1 - self.r_hour) ** remainder_hours)
-        adjusted_amount -= (adjusted_amount - adjusted_delta)
-        logg.debug('adjusted for {} hours {} -> {} delta {}'.format(remainder_hours, amount, adjusted_amount, adjusted_delta))
-
-        remainder -= (remainder_hours * (60 * 60))
-        remainder_minutes = math.floor(remainder / 60)
-        adjusted_delta = adjusted_amount * ((1 - self.r_min) ** remainder_minutes)
-        adjusted_amount -= (adjusted_amount - adjusted_delta)
-        logg.debug('adjusted for {} minutes {} -> {} delta {}'.format(remainder_minutes, amount, adjusted_amount, adjusted_delta))
+        if clock == None:
+            clock = SystemClock()
+        self.clock = clock
+
+        # decay level as stored by the contract constructor; ln of the 64x64 per-minute remainder
+        if decay_level == None:
+            decay_level = abdk.ln(to_fixed(1 - self.r_min))
+        self.decay_level = decay_level
+        logg.info('demurrage calculator set with min {:.32f} hour {:.32f} day {:.32f} decay level {}'.format(self.r_min, self.r_hour, self.r_day, self.decay_level))
+
+
+    def decay_factor(self, minutes):
+        """Float decay multiplier for the given number of minutes.
+
+        :param minutes: Number of minutes
+        :type minutes: int
+        :rtype: float
+        :returns: Multiplier to apply to undecayed amount
+        """
+        return (1 - self.r_min) ** minutes
+
+
+    def amount_at(self, amount, timestamp, now):
+        """Demurraged amount at unix timestamp now of an amount undecayed since unix timestamp timestamp.
+
+        :param amount: Undecayed amount
+        :type amount: int
+        :param timestamp: Unix timestamp from which to calculate demurrage
+        :type timestamp: int
+        :param now: Unix timestamp to calculate demurrage until
+        :type now: int
+        :rtype: float
+        :returns: Demurraged amount
+        """
+        minutes = (now - timestamp) // 60
+        adjusted_amount = amount * self.decay_factor(minutes)
+        if logg.isEnabledFor(logging.DEBUG):
+            logg.debug('adjusted for {} minutes {} -> {} delta {}'.format(minutes, amount, adjusted_amount, amount - adjusted_amount))
 
         return adjusted_amount
 
+
+    def amount_since(self, amount, timestamp):
+        return self.amount_at(amount, int(timestamp), self.clock.now())
+
     
     def amount_since_slow(self, amount, timestamp):
-        delta = datetime.datetime.utcnow() - datetime.datetime.fromtimestamp(timestamp)
-        remainder_minutes = math.floor(delta.total_seconds() / 60)
-        adjusted_amount = amount * ((1 - self.r_min) ** remainder_minutes)
-        logg.debug('adjusted for {} minutes {} -> {} delta {}'.format(remainder_minutes, amount, adjusted_amount, amount - adjusted_amount))
+        remainder_minutes = (self.clock.now() - int(timestamp)) // 60
+        adjusted_amount = amount * self.decay_factor(remainder_minutes)
+        if logg.isEnabledFor(logging.DEBUG):
+            logg.debug('adjusted for {} minutes {} -> {} delta {}'.format(remainder_minutes, amount, adjusted_amount, amount - adjusted_amount))
 
         return adjusted_amount
 
 
+    def amounts_since(self, amounts, timestamps, now=None, exact=False):
+        """Batch version of amount_since for many holders.
+
+        The result type and model depend only on exact. The float model multiplies by (1 - r_min) ** minutes like amount_since, and loses precision for amounts above 2^53. The exact model truncates with 64x64 math like the contract.
+
+        :param amounts: Base amounts, as numpy array or sequence of ints
+        :type amounts: numpy.ndarray or list
+        :param timestamps: Unix timestamp for each amount, or a single timestamp for all
+        :type timestamps: numpy.ndarray, list or int
+        :param now: Unix timestamp to calculate demurrage until. If not set, the calculator clock is used
+        :type now: int
+        :param exact: Use the exact 64x64 model
+        :type exact: bool
+        :raises ValueError: A timestamp is later than now, or the number of timestamps does not match the number of amounts
+        :rtype: numpy.ndarray or list
+        :returns: With exact, a list of int truncated demurraged amounts. Otherwise a float64 array of demurraged amounts, or a list of float if numpy is not available
+        """
+        if now == None:
+            now = self.clock.now()
+        scalar = isinstance(timestamps, numbers.Integral)
+        if numpy != None:
+            scalar = numpy.ndim(timestamps) == 0
+        if scalar:
+            minutes = (now - int(timestamps)) // 60
+            if minutes < 0:
+                raise ValueError('timestamp {} later than now {}'.format(timestamps, now))
+        elif len(timestamps) != len(amounts):
+            raise ValueError('got {} timestamps for {} amounts'.format(len(timestamps), len(amounts)))
+        elif numpy != None:
+            minutes = (now - numpy.asarray(timestamps, dtype=numpy.int64)) // 60
+            if minutes.size > 0 and minutes.min() < 0:
+                raise ValueError('timestamp {} later than now {}'.format(max(timestamps), now))
+        else:
+            minutes = [(now - int(t)) // 60 for t in timestamps]
+            if len(minutes) > 0 and min(minutes) < 0:
+                raise ValueError('timestamp {} later than now {}'.format(max(timestamps), now))
+
+        if exact:
+            if scalar:
+                modifier = self.decay_modifier(minutes)
+                return [(int(amount) * modifier) >> 64 for amount in amounts]
+            modifiers = {}
+            r = []
+            for (amount, m) in zip(amounts, minutes):
+                m = int(m)
+                modifier = modifiers.get(m)
+                if modifier == None:
+                    modifier = self.decay_modifier(m)
+                    modifiers[m] = modifier
+                r.append((int(amount) * modifier) >> 64)
+            return r
+
+        if numpy != None:
+            return numpy.asarray(amounts, dtype=numpy.float64) * numpy.power(1 - self.r_min, minutes)
+        if scalar:
+            f = self.decay_factor(minutes)
+            return [amount * f for amount in amounts]
+        return [amount * self.decay_factor(m) for (amount, m) in zip(amounts, minutes)]
+
+
+    # 64x64 decay multiplier after the given number of minutes, as calculated in applyDemurrageLimited and changePeriod
+    def decay_modifier(self, minutes):
+        v = abdk.mul(self.decay_level, abdk.from_uint(minutes))
+        return abdk.exp(v)
+
+
+    # Mirrors decayBy in the contract
+    def decay_by(self, value, period):
+        v = self.decay_modifier(period)
+        v = abdk.mul(abdk.from_uint(value), v)
+        return abdk.to_uint(v)
+
+
+    # Mirrors toBaseAmount in the contract, for the given 64x64 demurrageAmount
+    def to_base_amount(self, value, demurrage_amount):
+        r = abdk.div(abdk.from_uint(value), demurrage_amount)
+        return abdk.to_uint(r)
+
+
+    # Mirrors balanceOf in the contract, for the given demurrageAmount and demurrageTimestamp evaluated at timestamp
+    def balance_of(self, base_balance, demurrage_amount, demurrage_timestamp, timestamp):
+        period_count = (timestamp - demurrage_timestamp) // 60
+        v = abdk.mul(abdk.from_uint(base_balance), demurrage_amount)
+        return self.decay_by(abdk.to_uint(v), period_count)
+
+
     @staticmethod
-    def from_contract(rpc, chain_spec, contract_address, sender_address=ZERO_ADDRESS):
+    def from_contract(rpc, chain_spec, contract_address, sender_address=ZERO_ADDRESS, clock=None):
         c = DemurrageToken(chain_spec)
-        o = c.tax_level(contract_address, sender_address=sender_address)
+        o = c.decay_level(contract_address, sender_address=sender_address)
         r = rpc.do(o)
-        taxlevel_i = c.parse_tax_level(r)
+        decay_level = abdk.to_int128(c.parse_decay_level(r))
 
-        o = c.resolution_factor(contract_address, sender_address=sender_address)
-        r = rpc.do(o)
-        divider = c.parse_resolution_factor(r)
-        logg.debug('taxlevel {} f {}'.format(taxlevel_i, divider))
-        taxlevel_f = taxlevel_i / divider
-        return DemurrageCalculator(taxlevel_f)
+        taxlevel_f = 1 - math.exp(decay_level / abdk.ONE_64X64)
+        logg.debug('decay level {} taxlevel {}'.format(decay_level, taxlevel_f))
+        return DemurrageCalculator(taxlevel_f, decay_level=decay_level, clock=clock)
@@ -0,0 +1,137 @@
+# standard imports
+import logging
+
+# external imports
+from chainlib.eth.constant import ZERO_ADDRESS
+
+# local imports
+from .batch import DemurrageTokenBatch
+
+logg = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+
+class DemurrageRedistributionHistory:
+    """Local cache of the redistributions array of one or more DemurrageToken contracts.
+
+    The redistributions array is append-only, and only the last item, which accumulates the supply of the current period, can change. Items are cached by contract address and index, and every call reads the array length and fetches only the last cached item and any items appended since the previous call, in json-rpc batches of batch_size requests.
+
+    If the array is shorter than what has been cached, for example after a chain reorganization or when reading at an earlier block height, the cached items beyond the end of the array are discarded.
+
+    :param chain_spec: Chain spec
+    :type chain_spec: chainlib.chain.ChainSpec
+    :param sender_address: Address to make calls with
+    :type sender_address: str
+    :param batch_size: Maximum number of requests per json-rpc batch
+    :type batch_size: int
+    """
+
+    def __init__(self, chain_spec, sender_address=ZERO_ADDRESS, batch_size=DEFAULT_BATCH_SIZE):
+        self.chain_spec = chain_spec
+        self.sender_address = sender_address
+        self.batch_size = batch_size
+        self.items = {}
+        self.counts = {}
+
+
+    def __key(self, contract_address):
+        return contract_address.lower()
+
+
+    def count(self, contract_address):
+        """Number of items cached for a contract.
+
+        :param contract_address: Token contract address
+        :type contract_address: str
+        :rtype: int
+        """
+        return self.counts.get(self.__key(contract_address), 0)
+
+
+    def cached(self, contract_address):
+        """Items cached for a contract, without making any calls.
+
+        :param contract_address: Token contract address
+        :type contract_address: str
+        :rtype: list of erc20_demurrage_token.token.DemurrageRedistribution
+        """
+        k = self.__key(contract_address)
+        return [self.items[(k, i,)] for i in range(self.counts.get(k, 0))]
+
+
+    def flush(self, contract_address=None):
+        """Discard cached items.
+
+        :param contract_address: Token contract address. If not set, items for all contracts are discarded
+        :type contract_address: str
+        """
+        if contract_address == None:
+            self.items = {}
+            self.counts = {}
+            return
+        k = self.__key(contract_address)
+        for i in range(self.counts.get(k, 0)):
+            del self.items[(k, i,)]
+        self.counts.pop(k, None)
+
+
+    def __batch(self, contract_address, height):
+        return DemurrageTokenBatch(self.chain_spec, contract_address, sender_address=self.sender_address, height=height)
+
+
+    def sync(self, rpc, contract_address, height=None):
+        """Fetch the redistribution items missing from the cache.
+
+        :param rpc: RPC connection
+        :type rpc: chainlib.connection.RPCConnection
+        :param contract_address: Token contract address
+        :type contract_address: str
+        :param height: Block height to read at. If not set, 'latest' is used
+        :type height: int
+        :rtype: int
+        :returns: Number of items fetched
+        """
+        k = self.__key(contract_address)
+        batch = self.__batch(contract_address, height)
+        batch.redistribution_count()
+        (count,) = batch.do(rpc)
+
+        cached = self.counts.get(k, 0)
+        if count < cached:
+            logg.info('redistribution count {} for {} below cached count {}, discarding cached tail'.format(count, k, cached))
+            for i in range(count, cached):
+                del self.items[(k, i,)]
+            cached = count
+            self.counts[k] = cached
+
+        # the last cached item may still have been changing when it was fetched
+        start = max(cached - 1, 0)
+        for i in range(start, count, self.batch_size):
+            batch = self.__batch(contract_address, height)
+            end = min(i + self.batch_size, count)
+            for j in range(i, end):
+                batch.redistributions(j)
+            for (j, v) in enumerate(batch.do(rpc)):
+                self.items[(k, i + j,)] = v
+            # record progress per batch, so that a failed batch does not discard earlier ones
+            self.counts[k] = end
+
+        self.counts[k] = count
+        logg.debug('synced {} redistributions from {} for {}'.format(count - start, start, k))
+        return count - start
+
+
+    def get(self, rpc, contract_address, height=None):
+        """Bring the cache up to date for a contract and return all its redistribution items.
+
+        :param rpc: RPC connection
+        :type rpc: chainlib.connection.RPCConnection
+        :param contract_address: Token contract address
+        :type contract_address: str
+        :param height: Block height to read at. If not set, 'latest' is used
+        :type height: int
+        :rtype: list of erc20_demurrage_token.token.DemurrageRedistribution
+        """
+        self.sync(rpc, contract_address, height=height)
+        return self.cached(contract_address)
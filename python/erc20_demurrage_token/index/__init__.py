@@ -0,0 +1,11 @@
+from .event import (
+        DemurrageTokenEvent,
+        decode_log,
+        logs,
+        )
+from .store import DemurrageTokenStore
+from .checkpoint import FileCheckpoint
+from .indexer import (
+        DemurrageTokenIndexer,
+        ReorgError,
+        )
@@ -0,0 +1,92 @@
+# standard imports
+import os
+import json
+import logging
+
+logg = logging.getLogger(__name__)
+
+
+class FileCheckpoint:
+    """Persists indexer state as a full json snapshot file, and a log of changes made since the snapshot.
+
+    The snapshot file is replaced atomically on every save, so a crash during a save leaves the previous checkpoint intact. Saving a snapshot empties the log. The log is a file of one json entry per line next to the snapshot, and entries are appended to it in constant time regardless of the size of the state.
+
+    :param path: Snapshot file path. The log is kept in the same path with a .log suffix
+    :type path: str
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log_path = path + '.log'
+
+
+    def load(self):
+        """Load the last saved checkpoint.
+
+        :rtype: dict
+        :returns: Checkpoint, or None if none has been saved yet
+        """
+        try:
+            f = open(self.path, 'r')
+        except FileNotFoundError:
+            return None
+        v = json.load(f)
+        f.close()
+        return v
+
+
+    def load_log(self):
+        """Load the entries appended since the last saved snapshot.
+
+        An incomplete last line, left by a crash during an append, is discarded.
+
+        :rtype: list of dict
+        :returns: Log entries, oldest first
+        """
+        try:
+            f = open(self.log_path, 'r')
+        except FileNotFoundError:
+            return []
+        r = []
+        for line in f:
+            try:
+                r.append(json.loads(line))
+            except ValueError:
+                logg.warning('discarding incomplete checkpoint log entry in {}'.format(self.log_path))
+                break
+        f.close()
+        return r
+
+
+    def append(self, v):
+        """Append an entry to the log.
+
+        :param v: Log entry
+        :type v: dict
+        """
+        f = open(self.log_path, 'a')
+        f.write(json.dumps(v) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+
+
+    def save(self, v):
+        """Save a full snapshot, and empty the log.
+
+        :param v: Snapshot
+        :type v: dict
+        """
+        tmp_path = self.path + '.tmp'
+        f = open(tmp_path, 'w')
+        json.dump(v, f)
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(tmp_path, self.path)
+        # entries left behind by a crash before this point are older than the snapshot, and are skipped on load
+        try:
+            os.unlink(self.log_path)
+        except FileNotFoundError:
+            pass
+        logg.debug('saved checkpoint at block {} to {}'.format(v.get('block_number'), self.path))
@@ -0,0 +1,140 @@
+# standard imports
+import logging
+
+# external imports
+from chainlib.hash import keccak256_string_to_hex
+from chainlib.jsonrpc import JSONRPCRequest
+from chainlib.eth.address import to_checksum_address
+from hexathon import (
+        add_0x,
+        strip_0x,
+        )
+
+# local imports
+from erc20_demurrage_token import abdk
+
+logg = logging.getLogger(__name__)
+
+# event name -> signature
+EVENT_SIGNATURES = {
+    'Transfer': 'Transfer(address,address,uint256)',
+    'Mint': 'Mint(address,address,uint256)',
+    'Burn': 'Burn(address,uint256)',
+    'Decayed': 'Decayed(uint256,uint256,int128,int128)',
+    'Period': 'Period(uint256)',
+    'Redistribution': 'Redistribution(address,uint256,uint256)',
+        }
+
+# topic hash -> event name
+EVENT_TOPICS = {}
+for (k, v) in EVENT_SIGNATURES.items():
+    EVENT_TOPICS[keccak256_string_to_hex(v)] = k
+
+
+def logs(contract_address, from_block, to_block, topics=None, id_generator=None):
+    """Generate eth_getLogs query for the given contract and inclusive block range.
+
+    :param contract_address: Token contract address
+    :type contract_address: str
+    :param from_block: First block of range
+    :type from_block: int
+    :param to_block: Last block of range
+    :type to_block: int
+    :param topics: Event topic hashes to match, in hex. If not set, all indexed events are matched.
+    :type topics: list of str
+    :rtype: dict
+    :returns: json-rpc query object
+    """
+    if topics == None:
+        topics = list(EVENT_TOPICS.keys())
+    j = JSONRPCRequest(id_generator)
+    o = j.template()
+    o['method'] = 'eth_getLogs'
+    o['params'].append({
+        'address': contract_address,
+        'fromBlock': add_0x(hex(from_block)[2:]),
+        'toBlock': add_0x(hex(to_block)[2:]),
+        'topics': [[add_0x(v) for v in topics]],
+        })
+    return j.finalize(o)
+
+
+def _log_value(lg, camel, snake):
+    v = lg.get(camel)
+    if v == None:
+        v = lg.get(snake)
+    if isinstance(v, str) and v[:2] == '0x' and len(v) < 66:
+        v = int(v, 16)
+    return v
+
+
+def _topic_address(v):
+    return to_checksum_address(strip_0x(v)[24:])
+
+
+def _topic_int(v):
+    return int(strip_0x(v), 16)
+
+
+class DemurrageTokenEvent:
+    """Decoded DemurrageTokenSingleNocap event log.
+
+    :param name: Event name
+    :type name: str
+    :param lg: Log object as returned by eth_getLogs or in a receipt
+    :type lg: dict
+    """
+
+    def __init__(self, name, lg):
+        self.name = name
+        self.block_number = _log_value(lg, 'blockNumber', 'block_number')
+        self.block_hash = _log_value(lg, 'blockHash', 'block_hash')
+        self.tx_hash = _log_value(lg, 'transactionHash', 'transaction_hash')
+        self.log_index = _log_value(lg, 'logIndex', 'log_index')
+        self.args = {}
+
+
+    def __str__(self):
+        return '{} block {} index {} {}'.format(self.name, self.block_number, self.log_index, self.args)
+
+
+def decode_log(lg):
+    """Decode a token event log.
+
+    :param lg: Log object as returned by eth_getLogs or in a receipt
+    :type lg: dict
+    :rtype: erc20_demurrage_token.index.DemurrageTokenEvent
+    :returns: Decoded event, or None if the log is not one of the indexed events
+    """
+    topics = lg['topics']
+    if len(topics) == 0:
+        return None
+    name = EVENT_TOPICS.get(strip_0x(topics[0]))
+    if name == None:
+        return None
+
+    e = DemurrageTokenEvent(name, lg)
+    data = strip_0x(lg['data'])
+    if name == 'Transfer':
+        e.args['from'] = _topic_address(topics[1])
+        e.args['to'] = _topic_address(topics[2])
+        e.args['value'] = int(data[:64], 16)
+    elif name == 'Mint':
+        e.args['minter'] = _topic_address(topics[1])
+        e.args['beneficiary'] = _topic_address(topics[2])
+        e.args['value'] = int(data[:64], 16)
+    elif name == 'Burn':
+        e.args['burner'] = _topic_address(topics[1])
+        e.args['value'] = int(data[:64], 16)
+    elif name == 'Decayed':
+        e.args['timestamp'] = _topic_int(topics[1])
+        e.args['period_count'] = _topic_int(topics[2])
+        e.args['old_amount'] = abdk.to_int128(_topic_int(topics[3]))
+        e.args['new_amount'] = abdk.to_int128(int(data[:64], 16))
+    elif name == 'Period':
+        e.args['period'] = int(data[:64], 16)
+    elif name == 'Redistribution':
+        e.args['account'] = _topic_address(topics[1])
+        e.args['period'] = _topic_int(topics[2])
+        e.args['value'] = int(data[:64], 16)
+    return e
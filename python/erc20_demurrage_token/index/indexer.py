@@ -0,0 +1,256 @@
+# standard imports
+import logging
+
+# external imports
+from chainlib.eth.block import (
+        block_latest,
+        block_by_number,
+        )
+
+# local imports
+from .event import (
+        logs,
+        decode_log,
+        )
+from .store import DemurrageTokenStore
+
+logg = logging.getLogger(__name__)
+
+# blocks per eth_getLogs query
+DEFAULT_CHUNK_SIZE = 2000
+
+# blocks below the head that can still be rolled back on a chain reorganization
+DEFAULT_REORG_DEPTH = 64
+
+# blocks between full checkpoint snapshots
+DEFAULT_SNAPSHOT_INTERVAL = 1000
+
+
+class ReorgError(Exception):
+    """Chain reorganization is deeper than the indexer can roll back.
+    """
+    pass
+
+
+class DemurrageTokenIndexer:
+    """Builds a DemurrageTokenStore from the event logs of a single token contract.
+
+    Indexing must start at the block the contract was deployed in, since the store cannot be seeded with balances.
+
+    The indexer keeps a cursor of the last processed block and its hash. Each sync first checks the cursor block hash against the chain, and on mismatch walks back to the most recent known block still on the chain and rolls back the store to it. Changes can be rolled back for reorg_depth blocks below the chain head.
+
+    If a checkpoint is given, the cursor and store are loaded from it on creation. After every processed chunk of blocks, the logs of the chunk are appended to the checkpoint log, and the full state is saved as a snapshot only when snapshot_interval blocks have been processed since the last one, or a reorg has been rolled back. Call save to write a snapshot on shutdown. On load, the logged chunks are applied again on top of the snapshot.
+
+    :param contract_address: Token contract address
+    :type contract_address: str
+    :param start_block: Block the token contract was deployed in
+    :type start_block: int
+    :param store: State store to apply events to
+    :type store: erc20_demurrage_token.index.DemurrageTokenStore
+    :param chunk_size: Number of blocks to request logs for in each eth_getLogs query
+    :type chunk_size: int
+    :param checkpoint: Checkpoint backend
+    :type checkpoint: erc20_demurrage_token.index.FileCheckpoint
+    :param reorg_depth: Number of blocks below head to keep undo records for
+    :type reorg_depth: int
+    :param snapshot_interval: Number of blocks between full checkpoint snapshots
+    :type snapshot_interval: int
+    """
+
+    def __init__(self, contract_address, start_block, store=None, chunk_size=DEFAULT_CHUNK_SIZE, checkpoint=None, reorg_depth=DEFAULT_REORG_DEPTH, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+        self.contract_address = contract_address
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+        self.reorg_depth = reorg_depth
+        self.snapshot_interval = snapshot_interval
+        self.next_block = start_block
+        # (block number, block hash) of recent processed blocks, oldest first
+        self.hashes = []
+        # block of the last full checkpoint snapshot
+        self.snapshot_block = None
+
+        v = None
+        if checkpoint != None:
+            v = checkpoint.load()
+        if v != None:
+            if v['contract_address'].lower() != contract_address.lower():
+                raise ValueError('checkpoint is for contract {}, not {}'.format(v['contract_address'], contract_address))
+            self.next_block = v['block_number'] + 1
+            self.hashes = [tuple(e) for e in v['hashes']]
+            self.snapshot_block = v['block_number']
+            self.store = DemurrageTokenStore.deserialize(v['store'])
+            c = 0
+            for entry in checkpoint.load_log():
+                if entry['block_number'] <= self.snapshot_block:
+                    continue
+                self.process(entry['logs'])
+                self.__advance(entry['block_number'], entry['block_hash'], entry['head'])
+                c += 1
+            logg.info('resuming index of {} from block {}, {} chunks applied from checkpoint log'.format(contract_address, self.next_block, c))
+        else:
+            if store == None:
+                store = DemurrageTokenStore()
+            self.store = store
+
+
+    def cursor(self):
+        """Last processed block.
+
+        :rtype: tuple
+        :returns: Block number and block hash, or None if no block has been processed
+        """
+        if len(self.hashes) == 0:
+            return None
+        return self.hashes[-1]
+
+
+    def process(self, lgs):
+        """Decode and apply a list of logs, sorted by block number and log index.
+
+        :param lgs: Log objects
+        :type lgs: list of dict
+        :rtype: int
+        :returns: Number of events applied
+        """
+        c = 0
+        for lg in lgs:
+            if lg.get('removed'):
+                continue
+            e = decode_log(lg)
+            if e == None:
+                continue
+            self.store.apply(e)
+            if e.block_hash != None and (len(self.hashes) == 0 or self.hashes[-1][0] != e.block_number):
+                self.hashes.append((e.block_number, e.block_hash,))
+            c += 1
+        return c
+
+
+    def __block_hash(self, rpc, block_number):
+        o = block_by_number(block_number, include_tx=False)
+        r = rpc.do(o)
+        if r == None:
+            return None
+        return r['hash']
+
+
+    def __advance(self, block_number, block_hash, head):
+        if len(self.hashes) == 0 or self.hashes[-1][0] != block_number:
+            self.hashes.append((block_number, block_hash,))
+        self.next_block = block_number + 1
+
+        final_block = head - self.reorg_depth
+        i = 0
+        # keep at least one known block below the reorg depth as a common ancestor
+        while i < len(self.hashes) - 1 and self.hashes[i + 1][0] <= final_block:
+            i += 1
+        del self.hashes[:i]
+        self.store.prune(min(final_block, block_number))
+
+
+    def __commit(self, block_number, block_hash, head, lgs):
+        self.__advance(block_number, block_hash, head)
+        if self.checkpoint == None:
+            return
+        if self.snapshot_block == None or block_number - self.snapshot_block >= self.snapshot_interval:
+            self.save()
+            return
+        self.checkpoint.append({
+            'block_number': block_number,
+            'block_hash': block_hash,
+            'head': head,
+            'logs': lgs,
+            })
+
+
+    def save(self):
+        """Save the full state to the checkpoint as a snapshot, for example on shutdown.
+
+        Does nothing if no checkpoint is set or no block has been processed.
+        """
+        if self.checkpoint == None or len(self.hashes) == 0:
+            return
+        (block_number, block_hash,) = self.hashes[-1]
+        self.checkpoint.save({
+            'contract_address': self.contract_address,
+            'block_number': block_number,
+            'block_hash': block_hash,
+            'hashes': self.hashes,
+            'store': self.store.serialize(),
+            })
+        self.snapshot_block = block_number
+
+
+    def check_reorg(self, rpc):
+        """Roll back to the most recent processed block that is still on the chain.
+
+        :param rpc: RPC connection
+        :type rpc: chainlib.connection.RPCConnection
+        :raises ReorgError: No known block is on the chain anymore
+        :rtype: int
+        :returns: Number of blocks rolled back, measured by block number
+        """
+        if len(self.hashes) == 0:
+            return 0
+        last_block = self.hashes[-1][0]
+        i = len(self.hashes)
+        while i > 0:
+            (block_number, block_hash) = self.hashes[i - 1]
+            if self.__block_hash(rpc, block_number) == block_hash:
+                break
+            i -= 1
+            logg.warning('block {} {} no longer on chain'.format(block_number, block_hash))
+        if i == 0:
+            raise ReorgError('no processed block found on chain, reorg is deeper than {} blocks'.format(last_block - self.hashes[0][0]))
+        if i == len(self.hashes):
+            return 0
+
+        block_number = self.hashes[i - 1][0]
+        self.store.rollback(block_number)
+        del self.hashes[i:]
+        self.next_block = block_number + 1
+        logg.info('reorg, rolled back from block {} to {}'.format(last_block, block_number))
+        # the checkpoint log only records applied chunks, so the rolled back state is saved in full
+        self.save()
+        return last_block - block_number
+
+
+    def sync(self, rpc, to_block=None):
+        """Fetch and apply all events from the next unprocessed block up to and including to_block.
+
+        :param rpc: RPC connection
+        :type rpc: chainlib.connection.RPCConnection
+        :param to_block: Last block to process. If not set, the latest block is used.
+        :type to_block: int
+        :raises ReorgError: Reorg deeper than the rollback depth
+        :rtype: int
+        :returns: Number of events applied
+        """
+        self.check_reorg(rpc)
+
+        o = block_latest()
+        head = rpc.do(o)
+        if isinstance(head, str):
+            head = int(head, 16)
+        if to_block == None:
+            to_block = head
+
+        c = 0
+        while self.next_block <= to_block:
+            start_block = self.next_block
+            end_block = min(start_block + self.chunk_size - 1, to_block)
+            block_hash = self.__block_hash(rpc, end_block)
+            o = logs(self.contract_address, start_block, end_block)
+            r = rpc.do(o)
+            n = self.process(r)
+            # the logs may have been served from a different branch if the chain changed during the query
+            if self.__block_hash(rpc, end_block) != block_hash:
+                logg.warning('chain changed while indexing blocks {} - {}, retrying'.format(start_block, end_block))
+                self.store.rollback(start_block - 1)
+                while len(self.hashes) > 0 and self.hashes[-1][0] >= start_block:
+                    self.hashes.pop()
+                continue
+            c += n
+            self.__commit(end_block, block_hash, head, r)
+            logg.debug('indexed blocks {} - {}, {} events total'.format(start_block, end_block, c))
+        return c
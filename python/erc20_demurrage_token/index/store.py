@@ -0,0 +1,236 @@
+# standard imports
+import logging
+
+# external imports
+from chainlib.eth.address import to_checksum_address
+
+# local imports
+from erc20_demurrage_token import abdk
+
+logg = logging.getLogger(__name__)
+
+# final demurrage and period history entries to keep
+DEFAULT_MAX_HISTORY = 1024
+
+
+class DemurrageTokenStore:
+    """Local replica of token state, built by applying decoded events in chain order.
+
+    Base balance changes are calculated from the event values with the same 64x64 math as the contract, using the demurrage modifier of the most recent Decayed event.
+
+    The demurrage and period histories keep the entries of blocks that can still be rolled back, and at most max_history older entries. Older entries are dropped when they are pruned from the journal.
+
+    :param demurrage_timestamp: Timestamp of contract deployment
+    :type demurrage_timestamp: int
+    :param max_history: Maximum number of final entries to keep in each history
+    :type max_history: int
+    """
+
+    def __init__(self, demurrage_timestamp=0, max_history=DEFAULT_MAX_HISTORY):
+        self.base_balances = {}
+        self.demurrage_amount = abdk.ONE_64X64
+        self.demurrage_timestamp = demurrage_timestamp
+        self.total_sink = 0
+        self.supply = 0
+        self.burned = 0
+        self.period = 1
+        # (block number, demurrage timestamp, demurrage amount)
+        self.demurrage_history = []
+        # (block number, period)
+        self.period_history = []
+        # per-block undo records, oldest first
+        self.journal = []
+        self.journal_floor = 0
+        self.max_history = max_history
+
+
+    def base_balance_of(self, address):
+        return self.base_balances.get(to_checksum_address(address), 0)
+
+
+    def balance_of(self, address, timestamp, calculator):
+        """Demurraged balance of account as of the given timestamp, as balanceOf in the contract would return it.
+
+        :param address: Account address
+        :type address: str
+        :param timestamp: Unix timestamp to calculate balance for
+        :type timestamp: int
+        :param calculator: Calculator for the token
+        :type calculator: erc20_demurrage_token.demurrage.DemurrageCalculator
+        :rtype: int
+        :returns: Balance
+        """
+        return calculator.balance_of(self.base_balance_of(address), self.demurrage_amount, self.demurrage_timestamp, timestamp)
+
+
+    def total_supply(self):
+        return self.supply - self.burned
+
+
+    def to_base_amount(self, value):
+        r = abdk.div(abdk.from_uint(value), self.demurrage_amount)
+        return abdk.to_uint(r)
+
+
+    def __state(self):
+        return [
+            self.demurrage_amount,
+            self.demurrage_timestamp,
+            self.total_sink,
+            self.supply,
+            self.burned,
+            self.period,
+                ]
+
+
+    def __add_base(self, address, delta):
+        undo = self.journal[-1]['balances']
+        if address not in undo:
+            undo[address] = self.base_balances.get(address)
+        self.base_balances[address] = self.base_balances.get(address, 0) + delta
+
+
+    def begin(self, block_number, block_hash=None):
+        """Open an undo record for the given block, if it is not already the most recent one.
+
+        Called implicitly by apply. All changes made until the next block is opened can be reverted with rollback.
+
+        :param block_number: Block number
+        :type block_number: int
+        :param block_hash: Block hash
+        :type block_hash: str
+        """
+        if len(self.journal) > 0 and self.journal[-1]['block_number'] == block_number:
+            return
+        self.journal.append({
+            'block_number': block_number,
+            'block_hash': block_hash,
+            'state': self.__state(),
+            'balances': {},
+            'history': [len(self.demurrage_history), len(self.period_history)],
+            })
+
+
+    def rollback(self, block_number):
+        """Revert all changes made by events in blocks after block_number.
+
+        :param block_number: Last block to keep changes for
+        :type block_number: int
+        :raises ValueError: Changes after block_number have already been pruned from the journal
+        :rtype: int
+        :returns: Number of blocks reverted
+        """
+        if block_number < self.journal_floor - 1:
+            raise ValueError('cannot roll back to block {}, changes up to block {} are final'.format(block_number, self.journal_floor - 1))
+        c = 0
+        while len(self.journal) > 0 and self.journal[-1]['block_number'] > block_number:
+            entry = self.journal.pop()
+            (self.demurrage_amount, self.demurrage_timestamp, self.total_sink, self.supply, self.burned, self.period,) = entry['state']
+            for (address, v) in entry['balances'].items():
+                if v == None:
+                    del self.base_balances[address]
+                else:
+                    self.base_balances[address] = v
+            del self.demurrage_history[entry['history'][0]:]
+            del self.period_history[entry['history'][1]:]
+            c += 1
+        logg.debug('rolled back {} blocks to block {}'.format(c, block_number))
+        return c
+
+
+    def prune(self, block_number):
+        """Discard undo records for blocks up to and including block_number, making them final.
+
+        :param block_number: Last block to discard records for
+        :type block_number: int
+        """
+        i = 0
+        for entry in self.journal:
+            if entry['block_number'] > block_number:
+                break
+            i += 1
+        del self.journal[:i]
+        self.journal_floor = max(self.journal_floor, block_number + 1)
+        self.__trim_history(self.demurrage_history, 0)
+        self.__trim_history(self.period_history, 1)
+
+
+    # drop final entries beyond max_history; the journal refers to history entries by position, so its positions are shifted to match
+    def __trim_history(self, history, journal_index):
+        final = 0
+        for e in history:
+            if e[0] >= self.journal_floor:
+                break
+            final += 1
+        c = final - self.max_history
+        if c <= 0:
+            return
+        del history[:c]
+        for entry in self.journal:
+            entry['history'][journal_index] -= c
+
+
+    def serialize(self):
+        """Serialize the full state, including the undo journal, to a json-compatible dict."""
+        return {
+            'base_balances': self.base_balances,
+            'state': self.__state(),
+            'demurrage_history': self.demurrage_history,
+            'period_history': self.period_history,
+            'journal': self.journal,
+            'journal_floor': self.journal_floor,
+            }
+
+
+    @classmethod
+    def deserialize(cls, v, max_history=DEFAULT_MAX_HISTORY):
+        """Create a store from a dict created with serialize."""
+        o = cls(max_history=max_history)
+        o.base_balances = dict(v['base_balances'])
+        (o.demurrage_amount, o.demurrage_timestamp, o.total_sink, o.supply, o.burned, o.period,) = v['state']
+        o.demurrage_history = [tuple(e) for e in v['demurrage_history']]
+        o.period_history = [tuple(e) for e in v['period_history']]
+        o.journal = v['journal']
+        o.journal_floor = v['journal_floor']
+        return o
+
+
+    def apply(self, e):
+        """Apply a decoded event to the state.
+
+        :param e: Decoded event
+        :type e: erc20_demurrage_token.index.DemurrageTokenEvent
+        """
+        self.begin(e.block_number, e.block_hash)
+        if e.name == 'Decayed':
+            self.demurrage_amount = e.args['new_amount']
+            self.demurrage_timestamp = e.args['timestamp']
+            self.demurrage_history.append((e.block_number, self.demurrage_timestamp, self.demurrage_amount,))
+
+        elif e.name == 'Period':
+            self.period = e.args['period']
+            self.period_history.append((e.block_number, self.period,))
+
+        elif e.name == 'Mint':
+            self.supply += e.args['value']
+            self.__add_base(e.args['beneficiary'], self.to_base_amount(e.args['value']))
+
+        elif e.name == 'Burn':
+            self.burned += e.args['value']
+            self.__add_base(e.args['burner'], -self.to_base_amount(e.args['value']))
+
+        elif e.name == 'Redistribution':
+            base_value = self.to_base_amount(e.args['value']) - self.total_sink
+            self.__add_base(e.args['account'], base_value)
+            self.total_sink += base_value
+
+        elif e.name == 'Transfer':
+            sender = e.args['from']
+            value = e.args['value']
+            base_value = self.to_base_amount(value)
+            # sweep emits the base amount, which is always the full base balance of the sender.
+            # a transfer of that same number as a demurraged value would have overspent.
+            if base_value > value and value == self.base_balances.get(sender, 0):
+                base_value = value
+            self.__add_base(sender, -base_value)
+            self.__add_base(e.args['to'], base_value)
@@ -0,0 +1,239 @@
+# standard imports
+import logging
+
+# external imports
+from chainlib.eth.constant import ZERO_ADDRESS
+from chainlib.eth.block import (
+        block_latest,
+        block_by_number,
+        )
+
+# local imports
+from erc20_demurrage_token.batch import DemurrageTokenBatch
+
+logg = logging.getLogger(__name__)
+
+# gas estimates of a single call, to be adjusted to the figures of tests/bench_gas.py for the deployed contract version
+DEFAULT_CHANGE_PERIOD_GAS = 200000
+DEFAULT_APPLY_DEMURRAGE_GAS = 80000
+# one week of minutes
+DEFAULT_MAX_ROUNDS = 10080
+
+
+class KeeperAction:
+    """A transaction the keeper will send for a token.
+
+    :param contract_address: Token contract address
+    :type contract_address: str
+    :param method: Contract method, changePeriod or applyDemurrageLimited
+    :type method: str
+    :param rounds: Round limit for applyDemurrageLimited
+    :type rounds: int
+    :param gas: Estimated gas of the transaction
+    :type gas: int
+    """
+
+    CHANGE_PERIOD = 'changePeriod'
+    APPLY_DEMURRAGE = 'applyDemurrageLimited'
+
+    def __init__(self, contract_address, method, rounds=0, gas=0):
+        self.contract_address = contract_address
+        self.method = method
+        self.rounds = rounds
+        self.gas = gas
+
+
+    def __str__(self):
+        if self.method == KeeperAction.APPLY_DEMURRAGE:
+            return '{} {}({}) gas {}'.format(self.contract_address, self.method, self.rounds, self.gas)
+        return '{} {}() gas {}'.format(self.contract_address, self.method, self.gas)
+
+
+class DemurrageTokenKeeperState:
+    """Catch-up state of a token, as of a given block.
+
+    :param contract_address: Token contract address
+    :type contract_address: str
+    :param timestamp: Block timestamp the values were read at
+    :type timestamp: int
+    :param actual_period: Period of the block timestamp
+    :type actual_period: int
+    :param last_period: Index of the last redistribution. The redistribution at this index covers period last_period + 1
+    :type last_period: int
+    :param demurrage_timestamp: Timestamp the cached demurrage modifier was calculated for
+    :type demurrage_timestamp: int
+    """
+
+    def __init__(self, contract_address, timestamp, actual_period, last_period, demurrage_timestamp):
+        self.contract_address = contract_address
+        self.timestamp = timestamp
+        self.actual_period = actual_period
+        self.last_period = last_period
+        self.demurrage_timestamp = demurrage_timestamp
+
+
+    def periods_behind(self):
+        """Number of changePeriod calls needed to reach the actual period.
+        """
+        return max(self.actual_period - (self.last_period + 1), 0)
+
+
+    def minutes_behind(self):
+        """Number of minutes of demurrage not yet applied to the cached modifier.
+        """
+        return max((self.timestamp - self.demurrage_timestamp) // 60, 0)
+
+
+    def __str__(self):
+        return '{} periods behind {} minutes behind {}'.format(self.contract_address, self.periods_behind(), self.minutes_behind())
+
+
+def read_state(rpc, chain_spec, contract_addresses, sender_address=ZERO_ADDRESS):
+    """Read the catch-up state of tokens with a single json-rpc batch, with all values taken from the latest block.
+
+    :param rpc: RPC connection
+    :type rpc: chainlib.connection.RPCConnection
+    :param chain_spec: Chain spec
+    :type chain_spec: chainlib.chain.ChainSpec
+    :param contract_addresses: Token contract addresses
+    :type contract_addresses: list of str
+    :rtype: list of erc20_demurrage_token.keeper.DemurrageTokenKeeperState
+    :returns: Token states, in the same order as contract_addresses
+    """
+    if len(contract_addresses) == 0:
+        return []
+
+    o = block_latest()
+    height = rpc.do(o)
+    if isinstance(height, str):
+        height = int(height, 16)
+    o = block_by_number(height, include_tx=False)
+    block = rpc.do(o)
+    timestamp = block['timestamp']
+    if isinstance(timestamp, str):
+        timestamp = int(timestamp, 16)
+
+    batch = DemurrageTokenBatch(chain_spec, contract_addresses[0], sender_address=sender_address, height=height)
+    c = batch.token
+    for contract_address in contract_addresses:
+        batch.add(c.actual_period(contract_address, sender_address=sender_address), c.parse_actual_period)
+        batch.add(c.last_period(contract_address, sender_address=sender_address), c.parse_last_period)
+        batch.add(c.demurrage_timestamp(contract_address, sender_address=sender_address), c.parse_demurrage_timestamp)
+    v = batch.do(rpc)
+
+    r = []
+    for (i, contract_address) in enumerate(contract_addresses):
+        r.append(DemurrageTokenKeeperState(contract_address, timestamp, v[i*3], v[i*3+1], v[i*3+2]))
+    return r
+
+
+def plan(states, gas_budget, change_period_gas=DEFAULT_CHANGE_PERIOD_GAS, apply_demurrage_gas=DEFAULT_APPLY_DEMURRAGE_GAS, apply_demurrage_round_gas=0, max_rounds=DEFAULT_MAX_ROUNDS, min_minutes=60):
+    """Choose the transactions to send for a set of tokens within a total gas budget.
+
+    Tokens are served round-robin, one transaction per token per pass, starting with the tokens furthest behind, so that a single token with a long backlog cannot use up the budget of the others.
+
+    A token behind on periods first gets its demurrage applied with applyDemurrageLimited if more than max_rounds minutes are due, so that the demurrage applied by each changePeriod call stays bounded, and then one changePeriod call per missed period. A token only behind on demurrage gets an applyDemurrageLimited call once at least min_minutes minutes are due.
+
+    The gas of applyDemurrageLimited is estimated as apply_demurrage_gas plus apply_demurrage_round_gas per round. The round limit of the call is lowered to what fits in the remaining budget.
+
+    :param states: Token states
+    :type states: list of erc20_demurrage_token.keeper.DemurrageTokenKeeperState
+    :param gas_budget: Total gas of all transactions
+    :type gas_budget: int
+    :param max_rounds: Maximum round limit of a single applyDemurrageLimited call
+    :type max_rounds: int
+    :param min_minutes: Minimum number of due minutes to apply demurrage for, in tokens not behind on periods
+    :type min_minutes: int
+    :rtype: list of erc20_demurrage_token.keeper.KeeperAction
+    :returns: Actions, in the order they should be sent
+    """
+    pending = []
+    for state in states:
+        pending.append([state, state.periods_behind(), state.minutes_behind()])
+    pending.sort(key=lambda v: (v[1], v[2]), reverse=True)
+
+    actions = []
+    remaining = gas_budget
+    progress = True
+    while progress:
+        progress = False
+        for v in pending:
+            (state, periods, minutes) = v
+            action = None
+            if minutes > 0 and (minutes > max_rounds or (periods == 0 and minutes >= min_minutes)):
+                rounds = min(minutes, max_rounds)
+                if apply_demurrage_round_gas > 0:
+                    rounds = min(rounds, (remaining - apply_demurrage_gas) // apply_demurrage_round_gas)
+                if rounds > 0:
+                    action = KeeperAction(state.contract_address, KeeperAction.APPLY_DEMURRAGE, rounds=rounds, gas=apply_demurrage_gas + (apply_demurrage_round_gas * rounds))
+            elif periods > 0:
+                action = KeeperAction(state.contract_address, KeeperAction.CHANGE_PERIOD, gas=change_period_gas)
+
+            if action == None or action.gas > remaining:
+                continue
+            if action.method == KeeperAction.APPLY_DEMURRAGE:
+                v[2] -= action.rounds
+            else:
+                v[1] -= 1
+                # the period change applies all outstanding demurrage
+                v[2] = 0
+            remaining -= action.gas
+            actions.append(action)
+            progress = True
+            logg.debug('planned {}'.format(action))
+
+    return actions
+
+
+class DemurrageTokenKeeper:
+    """Keeps a set of tokens caught up with their periods and demurrage, by sending changePeriod and applyDemurrageLimited transactions.
+
+    :param chain_spec: Chain spec
+    :type chain_spec: chainlib.chain.ChainSpec
+    :param token: Token interface with signer and nonce oracle set
+    :type token: erc20_demurrage_token.DemurrageToken
+    :param sender_address: Address to send transactions from
+    :type sender_address: str
+    :param contract_addresses: Token contract addresses to keep
+    :type contract_addresses: list of str
+    :param gas_budget: Total gas of the transactions of each tick
+    :type gas_budget: int
+
+    Remaining keyword arguments are passed to plan.
+    """
+
+    def __init__(self, chain_spec, token, sender_address, contract_addresses, gas_budget, **kwargs):
+        self.chain_spec = chain_spec
+        self.token = token
+        self.sender_address = sender_address
+        self.contract_addresses = contract_addresses
+        self.gas_budget = gas_budget
+        self.plan_args = kwargs
+
+
+    def tick(self, rpc, send=True):
+        """Read token states, plan transactions and send them.
+
+        :param rpc: RPC connection
+        :type rpc: chainlib.connection.RPCConnection
+        :param send: If not set, transactions are built but not sent
+        :type send: bool
+        :rtype: list of tuple
+        :returns: Transaction hash and json-rpc request of each transaction
+        """
+        states = read_state(rpc, self.chain_spec, self.contract_addresses, sender_address=self.sender_address)
+        for state in states:
+            logg.info('token {}'.format(state))
+        actions = plan(states, self.gas_budget, **self.plan_args)
+
+        r = []
+        for action in actions:
+            if action.method == KeeperAction.APPLY_DEMURRAGE:
+                (tx_hash, o) = self.token.apply_demurrage(action.contract_address, self.sender_address, limit=action.rounds)
+            else:
+                (tx_hash, o) = self.token.change_period(action.contract_address, self.sender_address)
+            if send:
+                rpc.do(o)
+            logg.info('{} {}'.format(action, tx_hash))
+            r.append((tx_hash, o,))
+        return r
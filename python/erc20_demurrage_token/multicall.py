@@ -0,0 +1,103 @@
+# standard imports
+import logging
+
+# external imports
+from chainlib.eth.contract import (
+        ABIContractType,
+        abi_decode_single,
+        )
+from chainlib.eth.block import (
+        block_latest,
+        block_by_number,
+        )
+from chainlib.eth.constant import ZERO_ADDRESS
+
+# local imports
+from erc20_demurrage_token.batch import DemurrageTokenBatch
+from erc20_demurrage_token import abdk
+
+logg = logging.getLogger(__name__)
+
+# accounts per json-rpc batch, two requests each
+DEFAULT_CHUNK_SIZE = 500
+
+
+class DemurrageTokenBalances:
+    """Balances of many accounts, together with the token demurrage state as of the same block.
+
+    :param block_number: Block number the values were read at
+    :type block_number: int
+    :param timestamp: Timestamp of the block
+    :type timestamp: int
+    :param demurrage_amount: Cached 64x64 demurrage modifier of the token
+    :type demurrage_amount: int
+    :param demurrage_timestamp: Timestamp the demurrage modifier was calculated for
+    :type demurrage_timestamp: int
+    """
+
+    def __init__(self, block_number, timestamp, demurrage_amount, demurrage_timestamp):
+        self.block_number = block_number
+        self.timestamp = timestamp
+        self.demurrage_amount = demurrage_amount
+        self.demurrage_timestamp = demurrage_timestamp
+        self.balances = []
+        self.base_balances = []
+
+
+    def __str__(self):
+        return 'block {} timestamp {} demurrage amount {} demurrage timestamp {} accounts {}'.format(
+                self.block_number,
+                self.timestamp,
+                self.demurrage_amount,
+                self.demurrage_timestamp,
+                len(self.balances),
+                )
+
+
+def balances_of(rpc, chain_spec, token_address, accounts, sender_address=ZERO_ADDRESS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read balances of many accounts for one token, with all values taken from the same block.
+
+    Balances are read with json-rpc batches of balanceOf and baseBalanceOf calls for chunk_size accounts each, all made against the latest block number as read before the first batch.
+
+    :param rpc: RPC connection
+    :type rpc: chainlib.connection.RPCConnection
+    :param chain_spec: Chain spec
+    :type chain_spec: chainlib.chain.ChainSpec
+    :param token_address: Token contract address
+    :type token_address: str
+    :param accounts: Accounts to read balances for
+    :type accounts: list of str
+    :param sender_address: Address to make calls with
+    :type sender_address: str
+    :param chunk_size: Maximum number of accounts per json-rpc batch
+    :type chunk_size: int
+    :rtype: erc20_demurrage_token.multicall.DemurrageTokenBalances
+    :returns: Balances, in the same order as accounts
+    """
+    o = block_latest()
+    height = rpc.do(o)
+    if isinstance(height, str):
+        height = int(height, 16)
+    o = block_by_number(height, include_tx=False)
+    block = rpc.do(o)
+    timestamp = block['timestamp']
+    if isinstance(timestamp, str):
+        timestamp = int(timestamp, 16)
+
+    result = None
+    for i in range(0, max(len(accounts), 1), chunk_size):
+        batch = DemurrageTokenBatch(chain_spec, token_address, sender_address=sender_address, height=height)
+        if result == None:
+            o = batch.token.demurrage_amount(token_address, sender_address=sender_address)
+            batch.add(o, lambda v: abdk.to_int128(abi_decode_single(ABIContractType.UINT256, v)))
+            batch.demurrage_timestamp()
+        for account in accounts[i:i+chunk_size]:
+            batch.balance_of(account)
+            batch.base_balance_of(account)
+        v = batch.do(rpc)
+        if result == None:
+            result = DemurrageTokenBalances(height, timestamp, v[0], v[1])
+            v = v[2:]
+        result.balances += v[0::2]
+        result.base_balances += v[1::2]
+    return result
@@ -0,0 +1,138 @@
+"""Keep demurrage tokens caught up with their periods and demurrage
+
+.. moduleauthor:: Louis Holbrook <dev@holbrook.no>
+.. pgp:: 0826EDA1702D1E87C6E2875121D2E7BB88C2A746
+
+"""
+
+# standard imports
+import sys
+import time
+import logging
+
+# external imports
+import chainlib.eth.cli
+from chainlib.eth.cli.arg import (
+        Arg,
+        ArgFlag,
+        process_args,
+        )
+from chainlib.eth.cli.config import (
+        Config,
+        process_config,
+        )
+from chainlib.eth.cli.log import process_log
+from chainlib.eth.settings import process_settings
+from chainlib.eth.address import to_checksum_address
+from chainlib.settings import ChainSettings
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+from erc20_demurrage_token.keeper import (
+        DemurrageTokenKeeper,
+        DEFAULT_CHANGE_PERIOD_GAS,
+        DEFAULT_APPLY_DEMURRAGE_GAS,
+        DEFAULT_MAX_ROUNDS,
+        )
+
+logg = logging.getLogger()
+
+
+def process_config_local(config, arg, args, flags):
+    tokens = []
+    for v in args.tokens:
+        tokens.append(to_checksum_address(v))
+    config.add(tokens, '_TOKENS')
+    config.add(args.gas_budget, '_GAS_BUDGET')
+    config.add(args.change_period_gas, '_CHANGE_PERIOD_GAS')
+    config.add(args.apply_demurrage_gas, '_APPLY_DEMURRAGE_GAS')
+    config.add(args.apply_demurrage_round_gas, '_APPLY_DEMURRAGE_ROUND_GAS')
+    config.add(args.max_rounds, '_MAX_ROUNDS')
+    config.add(args.min_minutes, '_MIN_MINUTES')
+    config.add(args.interval, '_INTERVAL')
+    config.add(args.once, '_ONCE')
+    return config
+
+
+def process_local_args(argv=None):
+    arg_flags = ArgFlag()
+    arg = Arg(arg_flags)
+    flags = arg_flags.STD_WRITE | arg_flags.WALLET
+
+    argparser = chainlib.eth.cli.ArgumentParser(arg_flags)
+    argparser = process_args(argparser, arg, flags)
+    argparser.add_argument('--gas-budget', dest='gas_budget', type=int, default=3000000, help='Total gas of the transactions sent per tick')
+    argparser.add_argument('--change-period-gas', dest='change_period_gas', type=int, default=DEFAULT_CHANGE_PERIOD_GAS, help='Gas estimate of a changePeriod call')
+    argparser.add_argument('--apply-demurrage-gas', dest='apply_demurrage_gas', type=int, default=DEFAULT_APPLY_DEMURRAGE_GAS, help='Gas estimate of an applyDemurrageLimited call')
+    argparser.add_argument('--apply-demurrage-round-gas', dest='apply_demurrage_round_gas', type=int, default=0, help='Additional gas estimate of an applyDemurrageLimited call per round')
+    argparser.add_argument('--max-rounds', dest='max_rounds', type=int, default=DEFAULT_MAX_ROUNDS, help='Maximum minutes of demurrage to apply in a single call')
+    argparser.add_argument('--min-minutes', dest='min_minutes', type=int, default=60, help='Minimum due minutes before demurrage is applied outside of a period change')
+    argparser.add_argument('--interval', type=int, default=60, help='Seconds between ticks')
+    argparser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+    argparser.add_argument('tokens', type=str, help='Token contract addresses')
+    if argv == None:
+        argv = sys.argv[1:]
+    args = argparser.parse_args(argv)
+
+    logg_local = process_log(args, logg)
+
+    config = Config()
+    config = process_config(config, arg, args, flags)
+    config = process_config_local(config, arg, args, flags)
+    logg_local.debug('config loaded:\n{}'.format(config))
+
+    settings = ChainSettings()
+    settings = process_settings(settings, config)
+    logg_local.debug('settings loaded:\n{}'.format(settings))
+
+    return (config, settings,)
+
+
+def main(argv=None):
+    (config, settings) = process_local_args(argv)
+    if len(config.get('_TOKENS')) == 0:
+        sys.stderr.write('no token addresses given\n')
+        sys.exit(1)
+
+    conn = settings.get('CONN')
+    c = DemurrageToken(
+            settings.get('CHAIN_SPEC'),
+            signer=settings.get('SIGNER'),
+            gas_oracle=settings.get('FEE_ORACLE'),
+            nonce_oracle=settings.get('NONCE_ORACLE'),
+            )
+    keeper = DemurrageTokenKeeper(
+            settings.get('CHAIN_SPEC'),
+            c,
+            settings.get('SENDER_ADDRESS'),
+            config.get('_TOKENS'),
+            config.get('_GAS_BUDGET'),
+            change_period_gas=config.get('_CHANGE_PERIOD_GAS'),
+            apply_demurrage_gas=config.get('_APPLY_DEMURRAGE_GAS'),
+            apply_demurrage_round_gas=config.get('_APPLY_DEMURRAGE_ROUND_GAS'),
+            max_rounds=config.get('_MAX_ROUNDS'),
+            min_minutes=config.get('_MIN_MINUTES'),
+            )
+
+    send = settings.get('RPC_SEND')
+    while True:
+        txs = keeper.tick(conn, send=send)
+        for (tx_hash_hex, o) in txs:
+            if send:
+                print(tx_hash_hex)
+            else:
+                print(o)
+
+        # wait for the last transaction so the next tick reads the updated state
+        if send and len(txs) > 0 and (config.true('_WAIT') or not config.get('_ONCE')):
+            r = conn.wait(txs[-1][0])
+            if r['status'] == 0:
+                logg.error('transaction {} reverted'.format(txs[-1][0]))
+
+        if config.get('_ONCE'):
+            break
+        time.sleep(config.get('_INTERVAL'))
+
+
+if __name__ == '__main__':
+    main()
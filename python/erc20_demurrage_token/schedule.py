@@ -0,0 +1,155 @@
+# standard imports
+import logging
+
+# external imports
+from chainlib.eth.constant import ZERO_ADDRESS
+
+# local imports
+from .batch import DemurrageTokenBatch
+from . import abdk
+
+logg = logging.getLogger(__name__)
+
+DEFAULT_PERIODS = 1024
+
+# the demurrage word of a redistribution item holds the fractional part of the 64x64 modifier only
+REDISTRIBUTION_DEMURRAGE_MASK = 0xffffffffffffffff
+
+
+class DemurragePeriodSchedule:
+    """Period boundaries and redistribution demurrage modifiers of a DemurrageToken contract, computed offline from its immutable periodStart, periodDuration and decayLevel.
+
+    Period numbering follows actualPeriod in the contract; the period starting at periodStart is period 1. The modifier of period p is the one changePeriod stores in the redistribution item for period p when closing period p - 1, exp(decayLevel * (periodDuration * (p - 1) / 60)), calculated with the same 64x64 math as the contract. Period 1 has the modifier 1 set in the constructor.
+
+    Modifiers for the first periods periods are precomputed, so that lookups by period or timestamp are constant time. Later periods are calculated on demand.
+
+    :param period_start: Unix timestamp of the start of period 1
+    :type period_start: int
+    :param period_duration: Period duration, in seconds
+    :type period_duration: int
+    :param decay_level: 64x64 decay level, as stored by the contract
+    :type decay_level: int
+    :param periods: Number of periods to precompute
+    :type periods: int
+    :raises ValueError: Period duration is not positive
+    """
+
+    def __init__(self, period_start, period_duration, decay_level, periods=DEFAULT_PERIODS):
+        if period_duration <= 0:
+            raise ValueError('period duration must be positive, got {}'.format(period_duration))
+        self.period_start = period_start
+        self.period_duration = period_duration
+        self.decay_level = decay_level
+        # index 0 is unused, so that the list is indexed by period
+        self.modifiers = [None] * (periods + 1)
+        for i in range(1, periods + 1):
+            self.modifiers[i] = self.__modifier(i)
+        logg.debug('precomputed demurrage schedule for {} periods of {} seconds from {}'.format(periods, period_duration, period_start))
+
+
+    def __modifier(self, period):
+        if period == 1:
+            return abdk.ONE_64X64
+        minutes = (self.period_duration * (period - 1)) // 60
+        return abdk.exp(abdk.mul(self.decay_level, abdk.from_uint(minutes)))
+
+
+    def __len__(self):
+        return len(self.modifiers) - 1
+
+
+    def period_at(self, timestamp):
+        """Period the given timestamp is in, as returned by actualPeriod for a block with that timestamp.
+
+        :param timestamp: Unix timestamp
+        :type timestamp: int
+        :raises ValueError: Timestamp is before the start of period 1
+        :rtype: int
+        """
+        if timestamp < self.period_start:
+            raise ValueError('timestamp {} before period start {}'.format(timestamp, self.period_start))
+        return (timestamp - self.period_start) // self.period_duration + 1
+
+
+    def start_of(self, period):
+        """Unix timestamp of the first second of the given period.
+
+        :param period: Period
+        :type period: int
+        :rtype: int
+        """
+        return self.period_start + ((period - 1) * self.period_duration)
+
+
+    def end_of(self, period):
+        """Unix timestamp of the first second after the given period.
+
+        :param period: Period
+        :type period: int
+        :rtype: int
+        """
+        return self.period_start + (period * self.period_duration)
+
+
+    def modifier(self, period):
+        """64x64 demurrage modifier of the given period.
+
+        :param period: Period
+        :type period: int
+        :raises ValueError: Period is less than 1
+        :rtype: int
+        """
+        if period < 1:
+            raise ValueError('invalid period {}'.format(period))
+        if period < len(self.modifiers):
+            return self.modifiers[period]
+        return self.__modifier(period)
+
+
+    def modifier_at(self, timestamp):
+        """64x64 demurrage modifier of the period the given timestamp is in.
+
+        :param timestamp: Unix timestamp
+        :type timestamp: int
+        :rtype: int
+        """
+        return self.modifier(self.period_at(timestamp))
+
+
+    def redistribution_demurrage(self, period):
+        """Demurrage word of the redistribution item for the given period, as in DemurrageRedistribution.demurrage_fixed.
+
+        :param period: Period
+        :type period: int
+        :rtype: int
+        """
+        if period == 1:
+            return 0
+        return self.modifier(period) & REDISTRIBUTION_DEMURRAGE_MASK
+
+
+    @staticmethod
+    def from_contract(rpc, chain_spec, contract_address, sender_address=ZERO_ADDRESS, periods=DEFAULT_PERIODS):
+        """Read the schedule parameters from a contract in one batch.
+
+        The parameters are immutable, so the returned schedule stays valid for the lifetime of the contract.
+
+        :param rpc: RPC connection
+        :type rpc: chainlib.connection.RPCConnection
+        :param chain_spec: Chain spec
+        :type chain_spec: chainlib.chain.ChainSpec
+        :param contract_address: Token contract address
+        :type contract_address: str
+        :param sender_address: Address to make calls with
+        :type sender_address: str
+        :param periods: Number of periods to precompute
+        :type periods: int
+        :rtype: DemurragePeriodSchedule
+        """
+        batch = DemurrageTokenBatch(chain_spec, contract_address, sender_address=sender_address)
+        token = batch.token
+        batch.add(token.period_start(contract_address, sender_address=sender_address), token.parse_period_start)
+        batch.add(token.period_duration(contract_address, sender_address=sender_address), token.parse_period_duration)
+        batch.add(token.decay_level(contract_address, sender_address=sender_address), lambda v: abdk.to_int128(token.parse_decay_level(v)))
+        (period_start, period_duration, decay_level,) = batch.do(rpc)
+        return DemurragePeriodSchedule(period_start, period_duration, decay_level, periods=periods)
@@ -0,0 +1,376 @@
+# standard imports
+import time
+import logging
+
+# external imports
+from chainlib.eth.address import to_checksum_address
+from hexathon import add_0x
+
+# local imports
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token.sim.error import TxLimitException
+
+logg = logging.getLogger(__name__)
+
+# bit masks of the redistributionItem struct members
+REDISTRIBUTION_PERIOD_MASK = (1 << 32) - 1
+REDISTRIBUTION_VALUE_MASK = (1 << 72) - 1
+REDISTRIBUTION_DEMURRAGE_MASK = (1 << 64) - 1
+
+
+class DemurrageTokenOfflineSimulation:
+    """In-memory simulation of the DemurrageTokenSingleNocap contract, with the same interface as DemurrageTokenSimulation.
+
+    Contract state changes are replicated with the same 64x64 integer math as the contract, so balances and supply match those of the EVM backed simulation exactly.
+
+    As with the EVM backed simulation, every mint and transfer is mined in a separate block one second after the previous one, unless transactions are batched with start_batch and commit.
+
+    :param settings: Token settings. The demurrage level is the 64x64 remainder per minute, as passed to the contract constructor
+    :type settings: erc20_demurrage_token.DemurrageTokenSettings
+    :param actors: Number of actor accounts to create
+    :type actors: int
+    :param start_timestamp: Timestamp of the contract deployment block. If not set, the current time is used.
+    :type start_timestamp: int
+    :param cap: Maximum token supply, as set with setMaxSupply. 0 means no cap.
+    :type cap: int
+    :raises ValueError: Invalid demurrage level
+    """
+
+    def __init__(self, settings, actors=1, start_timestamp=None, cap=0):
+        if settings.demurrage_level >= (1 << 64):
+            raise ValueError('demurrage level must be less than 1 in 64x64')
+        if start_timestamp == None:
+            start_timestamp = int(time.time())
+
+        self.accounts = [self.__make_address(0)]
+        settings.sink_address = self.accounts[0]
+        self.actors = []
+        for i in range(actors):
+            address = self.__make_address(i + 1)
+            self.actors.append(address)
+            self.accounts.append(address)
+
+        self.last_block = 1
+        self.last_timestamp = start_timestamp
+        self.start_block = self.last_block
+        self.start_timestamp = self.last_timestamp
+        self.decimals = settings.decimals
+        self.period_seconds = settings.period_minutes * 60
+        self.period = 1
+        self.period_txs = []
+        self.period_blocks = 0
+        self.period_tx_limit = self.period_seconds - 1
+        self.queued = False
+        self.queue = []
+        self.sink_address = settings.sink_address
+        self.tx_count = 0
+
+        # contract state
+        self.account = {}
+        self.supply = 0
+        self.burned = 0
+        self.max_supply = cap
+        self.total_sink = 0
+        self.last_period = 0
+        self.demurrage_timestamp = start_timestamp
+        self.period_start = start_timestamp
+        self.period_duration = self.period_seconds
+        self.demurrage_amount = abdk.from_uint(1)
+        self.decay_level = abdk.ln(settings.demurrage_level)
+        self.redistributions = [self.to_redistribution(self.demurrage_amount, 0, 1)]
+
+        logg.info('intialized at block {} timestamp {} period {} demurrage level {} sink address {}'.format(
+                self.last_block,
+                self.last_timestamp,
+                settings.period_minutes,
+                settings.demurrage_level,
+                settings.sink_address,
+                )
+            )
+
+
+    @staticmethod
+    def __make_address(i):
+        return add_0x(to_checksum_address(i.to_bytes(20, byteorder='big').hex()))
+
+
+    def __check_limit(self):
+        if len(self.queue) > 0:
+            return
+        if self.period_tx_limit == self.period_blocks:
+            raise TxLimitException('reached period tx limit {}'.format(self.period_tx_limit))
+
+
+    # returns the state a failing transaction must be reverted to with __revert_tx
+    def __open_tx(self):
+        self.__check_limit()
+        state = (
+            self.last_block,
+            self.last_timestamp,
+            self.period_blocks,
+            self.demurrage_amount,
+            self.demurrage_timestamp,
+            self.last_period,
+            self.total_sink,
+            len(self.redistributions),
+            self.account.get(self.sink_address),
+                )
+        if len(self.queue) == 0:
+            self.__next_block()
+            self.period_blocks += 1
+        return state
+
+
+    def __revert_tx(self, state):
+        (
+            self.last_block,
+            self.last_timestamp,
+            self.period_blocks,
+            self.demurrage_amount,
+            self.demurrage_timestamp,
+            self.last_period,
+            self.total_sink,
+            redistribution_count,
+            sink_balance,
+        ) = state
+        del self.redistributions[redistribution_count:]
+        if sink_balance == None:
+            self.account.pop(self.sink_address, None)
+        else:
+            self.account[self.sink_address] = sink_balance
+
+
+    def __close_tx(self):
+        tx_hash = self.__tx_hash()
+        self.period_txs.append(tx_hash)
+        if self.queued:
+            self.queue.append(tx_hash)
+        return tx_hash
+
+
+    def __next_block(self, timestamp=None):
+        if timestamp == None:
+            timestamp = self.last_timestamp + 1
+        self.last_block += 1
+        self.last_timestamp = timestamp
+
+
+    def __tx_hash(self):
+        self.tx_count += 1
+        return add_0x(self.tx_count.to_bytes(32, byteorder='big').hex())
+
+
+    # contract methods
+
+    def to_redistribution(self, demurrage_modifier, value, period):
+        return [
+            period & REDISTRIBUTION_PERIOD_MASK,
+            value & REDISTRIBUTION_VALUE_MASK,
+            demurrage_modifier & REDISTRIBUTION_DEMURRAGE_MASK,
+                ]
+
+
+    def to_redistribution_demurrage_modifier(self, redistribution):
+        r = redistribution[2]
+        if r == 0:
+            r = abdk.from_uint(1)
+        return r
+
+
+    def to_base_amount(self, value):
+        r = abdk.div(abdk.from_uint(value), self.demurrage_amount)
+        return abdk.to_uint(r)
+
+
+    def decay_by(self, value, period):
+        v = abdk.mul(self.decay_level, abdk.from_uint(period))
+        v = abdk.exp(v)
+        v = abdk.mul(abdk.from_uint(value), v)
+        return abdk.to_uint(v)
+
+
+    def get_distribution(self, supply, demurrage_amount):
+        difference = abdk.mul(abdk.from_uint(supply), abdk.sub(abdk.from_uint(1), demurrage_amount))
+        return supply - abdk.to_uint(difference)
+
+
+    def actual_period(self):
+        return (self.last_timestamp - self.period_start) // self.period_duration + 1
+
+
+    def total_supply(self):
+        return self.supply - self.burned
+
+
+    def apply_demurrage(self, rounds=0):
+        period_count = (self.last_timestamp - self.demurrage_timestamp) // 60
+        if period_count == 0:
+            return 0
+        if rounds > 0 and rounds < period_count:
+            period_count = rounds
+        v = abdk.mul(self.decay_level, abdk.from_uint(period_count))
+        v = abdk.exp(v)
+        self.demurrage_amount = abdk.mul(self.demurrage_amount, v)
+        self.demurrage_timestamp += period_count * 60
+        return period_count
+
+
+    def __increase_base_balance(self, address, delta):
+        if delta == 0:
+            return False
+        self.account[address] = self.account.get(address, 0) + delta
+        return True
+
+
+    def __decrease_base_balance(self, address, delta):
+        if delta == 0:
+            return False
+        old_balance = self.account.get(address, 0)
+        if old_balance < delta:
+            raise RuntimeError('tx (block {}) failed: ERR_OVERSPEND'.format(self.last_block))
+        self.account[address] = old_balance - delta
+        return True
+
+
+    def __save_redistribution_supply(self):
+        self.redistributions[-1][1] = self.total_supply() & REDISTRIBUTION_VALUE_MASK
+
+
+    def __apply_default_redistribution(self, redistribution):
+        distribution = self.get_distribution(redistribution[1], self.to_redistribution_demurrage_modifier(redistribution))
+        unit = self.total_supply() - distribution
+        base_unit = self.to_base_amount(unit) - self.total_sink
+        self.__increase_base_balance(self.sink_address, base_unit)
+        self.last_period += 1
+        self.total_sink += base_unit
+        return unit
+
+
+    def change_period(self):
+        self.apply_demurrage()
+        current_redistribution = self.redistributions[self.last_period]
+        if self.actual_period() <= current_redistribution[0]:
+            return False
+
+        current_period = current_redistribution[0]
+        demurrage_counts = (self.period_duration * current_period) // 60
+        next_redistribution_demurrage = abdk.exp(abdk.mul(self.decay_level, abdk.from_uint(demurrage_counts)))
+        next_redistribution = self.to_redistribution(next_redistribution_demurrage, self.total_supply(), current_period + 1)
+        self.redistributions.append(next_redistribution)
+
+        self.__apply_default_redistribution(next_redistribution)
+        return True
+
+
+    # simulation interface
+
+    def get_now(self):
+        return self.last_timestamp
+
+
+    def get_minutes(self):
+        t = self.get_now()
+        return int((t - self.start_timestamp) / 60)
+
+
+    def get_start(self):
+        return self.start_timestamp
+
+
+    def get_period(self):
+        return self.actual_period()
+
+
+    def get_demurrage(self):
+        return self.demurrage_amount / abdk.ONE_64X64
+
+
+    def get_supply(self):
+        return self.total_supply()
+
+
+    def from_units(self, v):
+        return v * (10 ** self.decimals)
+
+
+    def start_batch(self):
+        """Execute subsequent mint and transfer transactions in the same block, until commit is called."""
+        self.queued = True
+
+
+    def commit(self):
+        txs = self.queue
+        self.queued = False
+        self.queue = []
+        return txs
+
+
+    def mint(self, recipient, value):
+        # the period change does not alter the supply, so the cap is checked before any state is changed
+        if self.max_supply > 0 and self.supply + value > self.max_supply:
+            raise RuntimeError('tx failed: supply cap {} exceeded'.format(self.max_supply))
+        self.__open_tx()
+        self.change_period()
+        self.supply += value
+        self.__increase_base_balance(recipient, self.to_base_amount(value))
+        self.__save_redistribution_supply()
+        tx_hash = self.__close_tx()
+        logg.info('mint {} tokens to {} - {}'.format(value, recipient, tx_hash))
+        return tx_hash
+
+
+    def transfer(self, sender, recipient, value):
+        state = self.__open_tx()
+        # the base value depends on the demurrage applied by the period change, so the balance can only be checked after it
+        try:
+            self.change_period()
+            base_value = self.to_base_amount(value)
+            self.__decrease_base_balance(sender, base_value)
+        except RuntimeError:
+            self.__revert_tx(state)
+            raise
+        self.__increase_base_balance(recipient, base_value)
+        tx_hash = self.__close_tx()
+        logg.info('transfer {} tokens from {} to {} - {}'.format(value, sender, recipient, tx_hash))
+        return tx_hash
+
+
+    def balance(self, holder, base=False):
+        base_balance = self.account.get(holder, 0)
+        if base:
+            return base_balance
+        period_count = (self.last_timestamp - self.demurrage_timestamp) // 60
+        v = abdk.mul(abdk.from_uint(base_balance), self.demurrage_amount)
+        return self.decay_by(abdk.to_uint(v), period_count)
+
+
+    def next(self, precise=False):
+        """Advance to the start of the next period, and execute the period change.
+
+        :param precise: If set, demurrage is applied in hourly steps up to the period boundary, as with the EVM backed simulation.
+        :type precise: bool
+        :rtype: tuple
+        :returns: Block number and timestamp of the block concluding the period change
+        """
+        self.commit()
+
+        target_timestamp = self.start_timestamp + (self.period * self.period_seconds)
+        logg.info('warping to {}, {} from start {}'.format(target_timestamp, target_timestamp - self.start_timestamp, self.start_timestamp))
+
+        if precise:
+            cursor_timestamp = self.last_timestamp + 1
+            while cursor_timestamp < target_timestamp:
+                self.__next_block(min(cursor_timestamp + 60, target_timestamp))
+                self.apply_demurrage()
+                cursor_timestamp += 60*60
+
+        self.__next_block(target_timestamp + 1)
+        self.apply_demurrage()
+        self.change_period()
+
+        logg.debug('next concludes at block {} timestamp {}, {} after start'.format(self.last_block, self.last_timestamp, self.last_timestamp - self.start_timestamp))
+        self.period += 1
+        self.period_txs = []
+        self.period_blocks = 0
+
+        return (self.last_block, self.last_timestamp)
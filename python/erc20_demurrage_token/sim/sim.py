@@ -44,8 +44,12 @@ class DemurrageTokenSimulation:
         self.signer = EIP155Signer(self.keystore)
         self.eth_helper = create_tester_signer(self.keystore)
         self.eth_backend = self.eth_helper.backend
-        self.gas_oracle = OverrideGasOracle(limit=100000, price=1)
+        # a transaction executing the period change uses more than 150000 gas
+        self.gas_oracle = OverrideGasOracle(limit=1000000, price=1)
         self.rpc = TestRPCConnection(None, self.eth_helper, self.signer)
+        self.nonce_oracles = {}
+        self.clients = {}
+        self.gas_clients = {}
         for a in self.keystore.list():
             self.accounts.append(add_0x(to_checksum_address(a)))
         settings.sink_address = self.accounts[0]
@@ -57,19 +61,17 @@ class DemurrageTokenSimulation:
             self.actors.append(address)
             self.accounts.append(address)
 
-            nonce_oracle = RPCNonceOracle(self.accounts[idx], conn=self.rpc)
-            c = Gas(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=self.gas_oracle)
-            (tx_hash, o) = c.create(self.accounts[idx], address, 100000 * 1000000)
-            self.rpc.do(o)
+            c = self.__gas_client(self.accounts[idx])
+            tx_hash = self.__send(self.accounts[idx], c.create(self.accounts[idx], address, 100000 * 1000000))
             o = receipt(tx_hash)
             r = self.rpc.do(o)
             if r['status'] != 1:
                 raise RuntimeError('failed gas transfer to account #{}: {} from {}'.format(i, address, self.accounts[idx]))
             logg.info('added actor account #{}: {} block {}'.format(i, address, r['block_number']))
 
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
-        (tx_hash, o) = c.constructor(self.accounts[0], settings, redistribute=redistribute, cap=cap)
-        self.rpc.do(o)
+        # deployment needs more gas than the simulation gas oracle allows
+        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=self.__nonce_oracle(self.accounts[0]))
+        tx_hash = self.__send(self.accounts[0], c.constructor(self.accounts[0], settings))
         o = receipt(tx_hash)
         r = self.rpc.do(o)
         if (r['status'] != 1):
@@ -87,7 +89,6 @@ class DemurrageTokenSimulation:
         self.last_timestamp = r['timestamp']
         self.start_timestamp = self.last_timestamp
 
-        nonce_oracle = RPCNonceOracle(self.accounts[0], conn=self.rpc)
         o = c.decimals(self.address, sender_address=self.accounts[0])
         r = self.rpc.do(o)
         self.decimals = c.parse_decimals(r)
@@ -96,7 +97,10 @@ class DemurrageTokenSimulation:
 
         self.period = 1
         self.period_txs = []
+        self.period_blocks = 0
         self.period_tx_limit = self.period_seconds - 1
+        self.queued = False
+        self.queue = []
         self.sink_address = settings.sink_address
 
         logg.info('intialized at block {} timestamp {} period {} demurrage level {} sink address {} (first address in keystore)'.format(
@@ -114,17 +118,93 @@ class DemurrageTokenSimulation:
         self.caller_address = self.accounts[0]
 
 
+    def __nonce_oracle(self, address):
+        nonce_oracle = self.nonce_oracles.get(address)
+        if nonce_oracle == None:
+            nonce_oracle = RPCNonceOracle(address, conn=self.rpc)
+            self.nonce_oracles[address] = nonce_oracle
+        return nonce_oracle
+
+
+    def __client(self, address):
+        c = self.clients.get(address)
+        if c == None:
+            c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=self.__nonce_oracle(address), gas_oracle=self.gas_oracle)
+            self.clients[address] = c
+        return c
+
+
+    def __gas_client(self, address):
+        c = self.gas_clients.get(address)
+        if c == None:
+            c = Gas(self.chain_spec, signer=self.signer, nonce_oracle=self.__nonce_oracle(address), gas_oracle=self.gas_oracle)
+            self.gas_clients[address] = c
+        return c
+
+
+    def __resync(self, address=None):
+        # nonces are otherwise only counted locally, so reload them from the node after a failure
+        if address == None:
+            addresses = list(self.nonce_oracles.keys())
+        else:
+            addresses = [address]
+        for address in addresses:
+            nonce_oracle = self.nonce_oracles.get(address)
+            if nonce_oracle != None:
+                nonce_oracle.nonce = nonce_oracle.get_nonce()
+                logg.debug('resynced nonce for {} to {}'.format(address, nonce_oracle.nonce))
+
+
+    def __send(self, sender, tx):
+        (tx_hash, o) = tx
+        try:
+            self.rpc.do(o)
+        except Exception:
+            self.__resync(sender)
+            raise
+        return tx_hash
+
+
     def __check_limit(self):
-        if self.period_tx_limit == len(self.period_txs):
+        # every block advances time by one second, txs joining an already queued block do not
+        if len(self.queue) > 0:
+            return
+        if self.period_tx_limit == self.period_blocks:
             raise TxLimitException('reached period tx limit {}'.format(self.period_tx_limit))
 
 
-    def __check_tx(self, tx_hash):
-        o = receipt(tx_hash)
-        rcpt = self.rpc.do(o)
-        if rcpt['status'] == 0:
-            raise RuntimeError('tx {} (block {} index {}) failed'.format(tx_hash, self.last_block, rcpt['transaction_index']))
-        logg.debug('tx {} block {} index {} verified'.format(tx_hash, self.last_block, rcpt['transaction_index']))
+    def __submit(self, tx_hash):
+        self.period_txs.append(tx_hash)
+        if self.queued:
+            self.queue.append(tx_hash)
+            return
+        self.__next_block()
+        self.period_blocks += 1
+
+
+    def start_batch(self):
+        """Queue subsequent mint and transfer transactions instead of mining each in a separate block.
+
+        The queued transactions are mined together in a single block by commit.
+        """
+        self.queued = True
+
+
+    def commit(self):
+        """Mine all queued transactions in one block, verify their receipts, and leave queued mode.
+
+        :raises RuntimeError: A queued transaction failed
+        :rtype: list of str
+        :returns: Hashes of the mined transactions
+        """
+        txs = self.queue
+        self.queued = False
+        self.queue = []
+        if len(txs) > 0:
+            self.__next_block()
+            self.period_blocks += 1
+            logg.info('mined batch of {} txs in block {}'.format(len(txs), self.last_block))
+        return txs
 
 
     def get_now(self):
@@ -153,8 +233,8 @@ class DemurrageTokenSimulation:
     def get_demurrage(self):
         o = self.caller_contract.demurrage_amount(self.address, sender_address=self.caller_address)
         r = self.rpc.do(o)
-        logg.info('demrrage amount {}'.format(r))
-        return float(self.caller_contract.parse_demurrage_amount(r) / (10 ** 38))
+        logg.info('demurrage amount {}'.format(r))
+        return self.caller_contract.parse_demurrage_amount(r)
 
 
     def get_supply(self):
@@ -170,25 +250,18 @@ class DemurrageTokenSimulation:
 
     def mint(self, recipient, value):
         self.__check_limit()
-        nonce_oracle = RPCNonceOracle(self.accounts[0], conn=self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=self.gas_oracle)
-        (tx_hash, o) = c.mint_to(self.address, self.accounts[0], recipient, value)
-        self.rpc.do(o)
-        self.__next_block()
-        self.__check_tx(tx_hash)
-        self.period_txs.append(tx_hash)
+        c = self.__client(self.accounts[0])
+        tx_hash = self.__send(self.accounts[0], c.mint_to(self.address, self.accounts[0], recipient, value))
+        self.__submit(tx_hash)
         logg.info('mint {} tokens to {} - {}'.format(value, recipient, tx_hash))
         return tx_hash
 
 
     def transfer(self, sender, recipient, value):
-        nonce_oracle = RPCNonceOracle(sender, conn=self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=self.gas_oracle)
-        (tx_hash, o) = c.transfer(self.address, sender, recipient, value)
-        self.rpc.do(o)
-        self.__next_block()
-        self.__check_tx(tx_hash)
-        self.period_txs.append(tx_hash)
+        self.__check_limit()
+        c = self.__client(sender)
+        tx_hash = self.__send(sender, c.transfer(self.address, sender, recipient, value))
+        self.__submit(tx_hash)
         logg.info('transfer {} tokens from {} to {} - {}'.format(value, sender, recipient, tx_hash))
         return tx_hash
 
@@ -207,80 +280,70 @@ class DemurrageTokenSimulation:
         hsh = self.eth_helper.mine_block()
         o = block_by_hash(hsh)
         r = self.rpc.do(o)
+        self.last_block = r['number']
 
         for tx_hash in r['transactions']:
             o = receipt(tx_hash)
             rcpt = self.rpc.do(o)
             if rcpt['status'] == 0:
+                self.__resync()
                 raise RuntimeError('tx {} (block {} index {}) failed'.format(tx_hash, self.last_block, rcpt['transaction_index']))
             logg.debug('tx {} (block {} index {}) verified'.format(tx_hash, self.last_block, rcpt['transaction_index']))
 
         logg.debug('now at block {} timestamp {}'.format(r['number'], r['timestamp']))
 
 
-    def next(self):
-        target_timestamp = self.start_timestamp + (self.period * self.period_seconds)
-        logg.info('warping to {}, {} from start {}'.format(target_timestamp, target_timestamp - self.start_timestamp, self.start_timestamp))
-        self.last_timestamp = target_timestamp 
-
+    def __catch_up(self, c, target_timestamp):
         o = block_latest()
         r = self.rpc.do(o)
-        self.last_block = r
         o = block_by_number(r)
         r = self.rpc.do(o)
         cursor_timestamp = r['timestamp'] + 1
 
-        nonce_oracle = RPCNonceOracle(self.accounts[2], conn=self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=self.gas_oracle)
-
         i = 0
         while cursor_timestamp < target_timestamp:
             logg.info('mining block on {}'.format(cursor_timestamp))
-            (tx_hash, o) = c.apply_demurrage(self.address, self.accounts[2])
-            self.rpc.do(o)
-            self.eth_helper.time_travel(cursor_timestamp + 60)
+            tx_hash = self.__send(self.accounts[2], c.apply_demurrage(self.address, self.accounts[2]))
+            self.eth_helper.time_travel(min(cursor_timestamp + 60, target_timestamp))
             self.__next_block()
             o = receipt(tx_hash)
             r = self.rpc.do(o)
             if r['status'] == 0:
-                raise RuntimeError('demurrage fast-forward failed on step {} timestamp {} block timestamp {} target {}'.format(i, cursor_timestamp, target_timestamp))
+                raise RuntimeError('demurrage fast-forward failed on step {} timestamp {} target {}'.format(i, cursor_timestamp, target_timestamp))
             cursor_timestamp += 60*60 # 1 hour
             o = block_by_number(r['block_number'])
             b = self.rpc.do(o)
             logg.info('block mined on timestamp {} (delta {}) block number {}'.format(b['timestamp'], b['timestamp'] - self.start_timestamp, b['number']))
             i += 1
 
-        
-        (tx_hash, o) = c.apply_demurrage(self.address, self.accounts[2])
-        self.rpc.do(o)
 
-        nonce_oracle = RPCNonceOracle(self.accounts[3], conn=self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=self.gas_oracle)
-        (tx_hash, o) = c.change_period(self.address, self.accounts[3])
-        self.rpc.do(o)
-        self.eth_helper.time_travel(target_timestamp + 1)
-        self.__next_block()
-    
-        o = block_latest()
-        r = self.rpc.do(o)
-        o = block_by_number(self.last_block)
-        r = self.rpc.do(o)
-        self.last_block = r['number']
-        block_base = self.last_block
-        logg.info('block before demurrage execution {} {}'.format(r['timestamp'], r['number']))
-
-        if self.redistribute:
-            for actor in self.actors:
-                nonce_oracle = RPCNonceOracle(actor, conn=self.rpc)
-                c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=self.gas_oracle)
-                (tx_hash, o) = c.apply_redistribution_on_account(self.address, actor, actor)
-                self.rpc.do(o)
-
-            nonce_oracle = RPCNonceOracle(self.sink_address, conn=self.rpc)
-            c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=self.gas_oracle)
-            (tx_hash, o) = c.apply_redistribution_on_account(self.address, self.sink_address, self.sink_address)
-            self.rpc.do(o)
+    def next(self, precise=False):
+        """Advance to the start of the next period, and execute the period change.
 
+        By default time is moved to the period boundary in one step, and the full demurrage for the elapsed time is applied by a single applyDemurrage call in the same block as the period change.
+
+        :param precise: If set, demurrage is instead applied in hourly steps, each mined in a separate block, for comparison of precision with the single step calculation.
+        :type precise: bool
+        :rtype: tuple
+        :returns: Block number and timestamp of the block concluding the period change
+        """
+        self.commit()
+
+        target_timestamp = self.start_timestamp + (self.period * self.period_seconds)
+        logg.info('warping to {}, {} from start {}'.format(target_timestamp, target_timestamp - self.start_timestamp, self.start_timestamp))
+        self.last_timestamp = target_timestamp 
+
+        c = self.__client(self.accounts[2])
+
+        if precise:
+            self.__catch_up(c, target_timestamp)
+
+        # automine is off, so both transactions are queued before the jump and executed in the block mined after it
+        self.__send(self.accounts[2], c.apply_demurrage(self.address, self.accounts[2]))
+
+        c = self.__client(self.accounts[3])
+        self.__send(self.accounts[3], c.change_period(self.address, self.accounts[3]))
+        self.eth_helper.time_travel(target_timestamp + 1)
         self.__next_block()
 
         o = block_latest()
@@ -288,15 +351,10 @@ class DemurrageTokenSimulation:
 
         o = block_by_number(self.last_block)
         r = self.rpc.do(o)
-        for tx_hash in r['transactions']:
-            o = receipt(tx_hash)
-            rcpt = self.rpc.do(o)
-            if rcpt['status'] == 0:
-                raise RuntimeError('demurrage step failed on block {}'.format(self.last_block))
-
         self.last_timestamp = r['timestamp']
         logg.debug('next concludes at block {} timestamp {}, {} after start'.format(self.last_block, self.last_timestamp, self.last_timestamp - self.start_timestamp))
         self.period += 1
         self.period_txs = []
+        self.period_blocks = 0
 
         return (self.last_block, self.last_timestamp)
@@ -0,0 +1,201 @@
+# standard imports
+import random
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+# local imports
+from erc20_demurrage_token import DemurrageTokenSettings
+from erc20_demurrage_token.sim.offline import DemurrageTokenOfflineSimulation
+
+logg = logging.getLogger(__name__)
+
+
+class SweepRun:
+    """Parameters of a single simulation run in a sweep.
+
+    :param settings: Token settings. The demurrage level is the 64x64 remainder per minute
+    :type settings: erc20_demurrage_token.DemurrageTokenSettings
+    :param seed: Seed for the random transfer workload
+    :type seed: int
+    :param cap: Maximum token supply, 0 for no cap
+    :type cap: int
+    :param actors: Number of actor accounts
+    :type actors: int
+    :param periods: Number of periods to simulate
+    :type periods: int
+    :param transfers: Number of random transfers per period
+    :type transfers: int
+    :param mint_units: Whole token units to mint to every actor at start
+    :type mint_units: int
+    """
+
+    def __init__(self, settings, seed=0, cap=0, actors=10, periods=52, transfers=100, mint_units=100):
+        self.settings = settings
+        self.seed = seed
+        self.cap = cap
+        self.actors = actors
+        self.periods = periods
+        self.transfers = transfers
+        self.mint_units = mint_units
+
+
+    def __str__(self):
+        return 'demurrage level {} period minutes {} cap {} seed {}'.format(
+                self.settings.demurrage_level,
+                self.settings.period_minutes,
+                self.cap,
+                self.seed,
+                )
+
+
+class SweepResult:
+    """Summary metrics of a single simulation run.
+
+    :param run: Parameters of the run
+    :type run: erc20_demurrage_token.sim.sweep.SweepRun
+    """
+
+    def __init__(self, run):
+        self.run = run
+        self.supply = 0
+        # share of the total supply held by the sink
+        self.sink_share = 0.0
+        # gini coefficient of the actor balances
+        self.gini = 0.0
+        # demurraged balance of actors minus the same under the float model
+        self.supply_drift = 0
+        self.demurrage = 0.0
+        self.model_demurrage = 0.0
+
+
+    def __str__(self):
+        return '{} supply {} sink share {:.6f} gini {:.6f} supply drift {} demurrage {:.12f} model {:.12f}'.format(
+                self.run,
+                self.supply,
+                self.sink_share,
+                self.gini,
+                self.supply_drift,
+                self.demurrage,
+                self.model_demurrage,
+                )
+
+
+def gini(values):
+    """Gini coefficient of a list of non-negative values.
+
+    :param values: Values
+    :type values: list of int
+    :rtype: float
+    :returns: Gini coefficient, 0 for an empty or all-zero list
+    """
+    values = sorted(values)
+    n = len(values)
+    total = sum(values)
+    if n == 0 or total == 0:
+        return 0.0
+    weighted = 0
+    for (i, v) in enumerate(values):
+        weighted += (i + 1) * v
+    return (2 * weighted) / (n * total) - (n + 1) / n
+
+
+def decay_per_minute(settings):
+    return 1 - (settings.demurrage_level / (1 << 64))
+
+
+def run_simulation(run):
+    """Execute a single simulation run with the offline simulation engine.
+
+    Every actor is minted the same amount at start, skipping mints that would exceed the cap. Each period then executes the given number of transfers between random actors, of a random part of the sender balance, in a single block.
+
+    The float model is the one used in examples/sim.py, where a minted amount decays by (1 - decay per minute) to the power of the minutes since it was minted.
+
+    :param run: Run parameters
+    :type run: erc20_demurrage_token.sim.sweep.SweepRun
+    :rtype: erc20_demurrage_token.sim.sweep.SweepResult
+    """
+    rnd = random.Random(run.seed)
+    sim = DemurrageTokenOfflineSimulation(run.settings, actors=run.actors, start_timestamp=0, cap=run.cap)
+
+    mints = []
+    sim.start_batch()
+    for actor in sim.actors:
+        value = sim.from_units(run.mint_units)
+        if run.cap > 0 and sim.get_supply() + value > run.cap:
+            break
+        sim.mint(actor, value)
+        mints.append((sim.get_now(), value,))
+    sim.commit()
+
+    for i in range(run.periods):
+        sim.start_batch()
+        for j in range(run.transfers):
+            (sender, recipient) = rnd.sample(sim.actors, 2)
+            balance = sim.balance(sender)
+            if balance == 0:
+                continue
+            sim.transfer(sender, recipient, rnd.randint(1, max(balance // 2, 1)))
+        sim.commit()
+        sim.next()
+
+    r = SweepResult(run)
+    r.supply = sim.get_supply()
+    balances = [sim.balance(actor) for actor in sim.actors]
+    if r.supply > 0:
+        r.sink_share = sim.balance(sim.sink_address) / r.supply
+    r.gini = gini(balances)
+
+    decay = decay_per_minute(run.settings)
+    now = sim.get_now()
+    model = 0.0
+    for (timestamp, value) in mints:
+        model += value * ((1 - decay) ** ((now - timestamp) // 60))
+    r.supply_drift = sum(balances) - int(model)
+    r.demurrage = sim.get_demurrage()
+    r.model_demurrage = (1 - decay) ** sim.get_minutes()
+    logg.debug('run done: {}'.format(r))
+    return r
+
+
+def sweep(runs, processes=None):
+    """Execute simulation runs in parallel in a process pool.
+
+    :param runs: Run parameters
+    :type runs: list of erc20_demurrage_token.sim.sweep.SweepRun
+    :param processes: Number of worker processes. If not set, one per cpu is used.
+    :type processes: int
+    :rtype: list of erc20_demurrage_token.sim.sweep.SweepResult
+    :returns: Results, in the same order as runs
+    """
+    if processes == 1:
+        return [run_simulation(run) for run in runs]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(run_simulation, runs))
+
+
+def grid(demurrage_levels, period_minutes, caps=(0,), seeds=(0,), decimals=6, **kwargs):
+    """Generate runs for all combinations of the given parameters.
+
+    Remaining keyword arguments are passed to every SweepRun.
+
+    :param demurrage_levels: 64x64 remainders per minute
+    :type demurrage_levels: list of int
+    :param period_minutes: Period lengths in minutes
+    :type period_minutes: list of int
+    :param caps: Supply caps, 0 for no cap
+    :type caps: list of int
+    :param seeds: Workload seeds
+    :type seeds: list of int
+    :rtype: list of erc20_demurrage_token.sim.sweep.SweepRun
+    """
+    runs = []
+    for (demurrage_level, minutes, cap, seed) in itertools.product(demurrage_levels, period_minutes, caps, seeds):
+        settings = DemurrageTokenSettings()
+        settings.name = 'Simulated Demurrage Token'
+        settings.symbol = 'SIM'
+        settings.decimals = decimals
+        settings.demurrage_level = demurrage_level
+        settings.period_minutes = minutes
+        runs.append(SweepRun(settings, seed=seed, cap=cap, **kwargs))
+    return runs
@@ -0,0 +1,338 @@
+# standard imports
+import os
+import mmap
+import struct
+import bisect
+import logging
+
+# external imports
+from chainlib.eth.constant import ZERO_ADDRESS
+from chainlib.eth.address import to_checksum_address
+from chainlib.eth.block import block_latest
+from chainlib.eth.contract import (
+        ABIContractType,
+        abi_decode_single,
+        )
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token.token import DemurrageRedistribution
+from erc20_demurrage_token.batch import DemurrageTokenBatch
+from erc20_demurrage_token import abdk
+
+logg = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'DMRSNAP\x00'
+SNAPSHOT_VERSION = 1
+
+# magic, version, reserved, block number, holder count, redistribution count
+_HEADER_FORMAT = '<8sIIQQQ'
+_HEADER_STRUCT_SIZE = struct.calcsize(_HEADER_FORMAT)
+# followed by words for demurrage amount, demurrage timestamp, total sink, burned, supply
+SNAPSHOT_HEADER_SIZE = 256
+
+ADDRESS_SIZE = 20
+WORD_SIZE = 32
+
+# requests per json-rpc batch when exporting from chain
+SNAPSHOT_BATCH_SIZE = 1000
+
+
+def _align(v):
+    r = v % WORD_SIZE
+    if r == 0:
+        return v
+    return v + WORD_SIZE - r
+
+
+def _layout(holder_count, redistribution_count):
+    addresses = SNAPSHOT_HEADER_SIZE
+    base_balances = addresses + _align(holder_count * ADDRESS_SIZE)
+    redistributions = base_balances + holder_count * WORD_SIZE
+    end = redistributions + redistribution_count * WORD_SIZE * 3
+    return (addresses, base_balances, redistributions, end,)
+
+
+class DemurrageTokenState:
+    """Token state to write to a snapshot.
+
+    :param block_number: Block the state was read at
+    :type block_number: int
+    :param demurrage_amount: Signed 64x64 demurrage modifier, as the demurrageAmount value of the contract
+    :type demurrage_amount: int
+    :param demurrage_timestamp: Timestamp of demurrage modifier
+    :type demurrage_timestamp: int
+    :param total_sink: Total base amount redistributed to the sink
+    :type total_sink: int
+    :param burned: Total burned tokens
+    :type burned: int
+    :param supply: Total minted tokens
+    :type supply: int
+    """
+
+    def __init__(self, block_number, demurrage_amount, demurrage_timestamp, total_sink=0, burned=0, supply=0):
+        self.block_number = block_number
+        self.demurrage_amount = demurrage_amount
+        self.demurrage_timestamp = demurrage_timestamp
+        self.total_sink = total_sink
+        self.burned = burned
+        self.supply = supply
+        # address -> base balance
+        self.base_balances = {}
+        # raw redistribution items as returned by DemurrageToken.parse_redistributions
+        self.redistributions = []
+
+
+    @staticmethod
+    def from_store(store, block_number):
+        """Create state from an event index store.
+
+        The event index does not track the redistributions array, so it is left empty.
+
+        :param store: Indexer store
+        :type store: erc20_demurrage_token.index.DemurrageTokenStore
+        :param block_number: Last block applied to the store
+        :type block_number: int
+        :rtype: erc20_demurrage_token.snapshot.DemurrageTokenState
+        """
+        o = DemurrageTokenState(block_number, store.demurrage_amount, store.demurrage_timestamp, store.total_sink, store.burned, store.supply)
+        o.base_balances = dict(store.base_balances)
+        return o
+
+
+    @staticmethod
+    def from_chain(rpc, chain_spec, contract_address, accounts, sender_address=ZERO_ADDRESS, height=None, batch_size=SNAPSHOT_BATCH_SIZE):
+        """Read token state for the given accounts, with all values taken from the same block.
+
+        :param rpc: RPC connection
+        :type rpc: chainlib.connection.RPCConnection
+        :param chain_spec: Chain spec
+        :type chain_spec: chainlib.chain.ChainSpec
+        :param contract_address: Token contract address
+        :type contract_address: str
+        :param accounts: Accounts to read base balances for
+        :type accounts: list of str
+        :param height: Block number to read state at. If not set, the latest block is used.
+        :type height: int
+        :param batch_size: Maximum number of requests in each json-rpc batch
+        :type batch_size: int
+        :rtype: erc20_demurrage_token.snapshot.DemurrageTokenState
+        """
+        if height == None:
+            o = block_latest()
+            height = rpc.do(o)
+            if isinstance(height, str):
+                height = int(height, 16)
+
+        parse_uint = lambda v: abi_decode_single(ABIContractType.UINT256, v)
+        batch = DemurrageTokenBatch(chain_spec, contract_address, sender_address=sender_address, height=height)
+        token = batch.token
+        batch.add(token.demurrage_amount(contract_address, sender_address=sender_address), lambda v: abdk.to_int128(parse_uint(v)))
+        batch.demurrage_timestamp()
+        batch.add(token.call_noarg('totalSink', contract_address, sender_address=sender_address), parse_uint)
+        batch.add(token.total_burned(contract_address, sender_address=sender_address), token.parse_total_burned)
+        batch.add(token.total_supply(contract_address, sender_address=sender_address), token.parse_total_supply)
+        batch.redistribution_count()
+        (demurrage_amount, demurrage_timestamp, total_sink, burned, total_supply, redistribution_count,) = batch.do(rpc)
+
+        o = DemurrageTokenState(height, demurrage_amount, demurrage_timestamp, total_sink, burned, total_supply + burned)
+
+        for i in range(0, redistribution_count, batch_size):
+            batch = DemurrageTokenBatch(chain_spec, contract_address, sender_address=sender_address, height=height)
+            for j in range(i, min(i + batch_size, redistribution_count)):
+                batch.add(token.redistributions(contract_address, j, sender_address=sender_address), token.parse_redistributions)
+            o.redistributions += batch.do(rpc)
+
+        for i in range(0, len(accounts), batch_size):
+            batch = DemurrageTokenBatch(chain_spec, contract_address, sender_address=sender_address, height=height)
+            chunk = accounts[i:i+batch_size]
+            for account in chunk:
+                batch.base_balance_of(account)
+            for (account, v) in zip(chunk, batch.do(rpc)):
+                o.base_balances[account] = v
+
+        return o
+
+
+def write_snapshot(path, state):
+    """Write token state to a snapshot file.
+
+    The file consists of a fixed size header followed by fixed width columns:
+
+    - holder addresses, 20 bytes each, in ascending byte order
+    - base balances of the holders, uint256 little-endian
+    - redistribution periods, values and demurrage words, uint256 little-endian, in three consecutive columns
+
+    All integer header values are little-endian. Signed values are stored in two's complement. Columns start at 32 byte boundaries.
+
+    :param path: File path
+    :type path: str
+    :param state: Token state
+    :type state: erc20_demurrage_token.snapshot.DemurrageTokenState
+    """
+    holders = []
+    for (k, v) in state.base_balances.items():
+        holders.append((bytes.fromhex(strip_0x(k)), v,))
+    holders.sort()
+    holder_count = len(holders)
+    redistribution_count = len(state.redistributions)
+    (addresses_offset, base_balances_offset, redistributions_offset, end,) = _layout(holder_count, redistribution_count)
+
+    tmp_path = path + '.tmp'
+    f = open(tmp_path, 'wb')
+    b = struct.pack(_HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, state.block_number, holder_count, redistribution_count)
+    b += state.demurrage_amount.to_bytes(WORD_SIZE, byteorder='little', signed=True)
+    for v in [state.demurrage_timestamp, state.total_sink, state.burned, state.supply]:
+        b += v.to_bytes(WORD_SIZE, byteorder='little')
+    f.write(b.ljust(SNAPSHOT_HEADER_SIZE, b'\x00'))
+
+    f.write(b''.join([v[0] for v in holders]).ljust(base_balances_offset - addresses_offset, b'\x00'))
+    f.write(b''.join([v[1].to_bytes(WORD_SIZE, byteorder='little') for v in holders]))
+
+    items = [bytes.fromhex(strip_0x(v)) for v in state.redistributions]
+    for i in range(3):
+        for v in items:
+            word = v[i*WORD_SIZE:(i+1)*WORD_SIZE]
+            f.write(word[::-1])
+    f.close()
+    os.replace(tmp_path, path)
+    logg.debug('wrote snapshot of {} holders {} redistributions at block {} to {}'.format(holder_count, redistribution_count, state.block_number, path))
+
+
+class _AddressColumn:
+
+    def __init__(self, view, count):
+        self.view = view
+        self.count = count
+
+
+    def __len__(self):
+        return self.count
+
+
+    def __getitem__(self, i):
+        return bytes(self.view[i*ADDRESS_SIZE:(i+1)*ADDRESS_SIZE])
+
+
+class DemurrageTokenSnapshot:
+    """Read-only, memory-mapped view of a snapshot file written with write_snapshot.
+
+    Opening a snapshot only parses the header. Columns are read directly from the mapped file on access, and balance lookups by address are binary searches over the sorted address column.
+
+    :param path: File path
+    :type path: str
+    :raises ValueError: File is not a valid snapshot
+    """
+
+    def __init__(self, path):
+        self.f = open(path, 'rb')
+        try:
+            self.mmap = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.f.close()
+            raise ValueError('empty snapshot file {}'.format(path))
+        self.view = memoryview(self.mmap)
+        self.addresses = None
+
+        if len(self.view) < SNAPSHOT_HEADER_SIZE:
+            self.close()
+            raise ValueError('snapshot file {} too short'.format(path))
+        (magic, version, _, self.block_number, self.holder_count, self.redistribution_count,) = struct.unpack_from(_HEADER_FORMAT, self.view)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError('not a snapshot file: {}'.format(path))
+        if version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError('unsupported snapshot version {}'.format(version))
+
+        word = lambda i: bytes(self.view[_HEADER_STRUCT_SIZE+i*WORD_SIZE:_HEADER_STRUCT_SIZE+(i+1)*WORD_SIZE])
+        self.demurrage_amount = int.from_bytes(word(0), byteorder='little', signed=True)
+        self.demurrage_timestamp = int.from_bytes(word(1), byteorder='little')
+        self.total_sink = int.from_bytes(word(2), byteorder='little')
+        self.burned = int.from_bytes(word(3), byteorder='little')
+        self.supply = int.from_bytes(word(4), byteorder='little')
+
+        (self.addresses_offset, self.base_balances_offset, self.redistributions_offset, end,) = _layout(self.holder_count, self.redistribution_count)
+        if len(self.view) < end:
+            self.close()
+            raise ValueError('snapshot file {} truncated, expected {} bytes got {}'.format(path, end, len(self.view)))
+        self.addresses = _AddressColumn(self.view[self.addresses_offset:self.base_balances_offset], self.holder_count)
+
+
+    def __len__(self):
+        return self.holder_count
+
+
+    def __word(self, offset):
+        return int.from_bytes(self.view[offset:offset+WORD_SIZE], byteorder='little')
+
+
+    def address(self, i):
+        return to_checksum_address(self.addresses[i].hex())
+
+
+    def base_balance(self, i):
+        return self.__word(self.base_balances_offset + i * WORD_SIZE)
+
+
+    def base_balance_of(self, address):
+        """Base balance of account, as baseBalanceOf in the contract.
+
+        :param address: Account address
+        :type address: str
+        :rtype: int
+        :returns: Base balance, or 0 if the account is not in the snapshot
+        """
+        k = bytes.fromhex(strip_0x(address))
+        i = bisect.bisect_left(self.addresses, k)
+        if i == self.holder_count or self.addresses[i] != k:
+            return 0
+        return self.base_balance(i)
+
+
+    def base_balances(self):
+        """Iterate over all holders.
+
+        :rtype: generator of tuple
+        :returns: Address and base balance
+        """
+        for i in range(self.holder_count):
+            yield (self.address(i), self.base_balance(i),)
+
+
+    def redistribution_item(self, i):
+        """Raw redistribution item, as returned by DemurrageToken.parse_redistributions."""
+        v = ''
+        for j in range(3):
+            offset = self.redistributions_offset + (j * self.redistribution_count + i) * WORD_SIZE
+            v += self.view[offset:offset+WORD_SIZE][::-1].hex()
+        return v
+
+
+    def redistribution(self, i):
+        v = []
+        for j in range(3):
+            offset = self.redistributions_offset + (j * self.redistribution_count + i) * WORD_SIZE
+            v.append(int.from_bytes(self.view[offset:offset+WORD_SIZE], byteorder='little'))
+        return DemurrageRedistribution.from_words(v[0], v[1], v[2])
+
+
+    def total_supply(self):
+        return self.supply - self.burned
+
+
+    def close(self):
+        if self.addresses != None:
+            self.addresses.view.release()
+            self.addresses = None
+        self.view.release()
+        self.mmap.close()
+        self.f.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
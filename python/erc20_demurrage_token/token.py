@@ -1,5 +1,6 @@
 # standard imports
 import os
+import json
 import logging
 
 # external imports
@@ -10,7 +11,6 @@ from chainlib.eth.tx import (
 from chainlib.hash import keccak256_string_to_hex
 from chainlib.eth.contract import (
         ABIContractEncoder,
-        ABIContractDecoder,
         ABIContractType,
         abi_decode_single,
         )
@@ -27,30 +27,81 @@ from dexif import from_fixed
 from erc20_demurrage_token.data import data_dir
 from erc20_demurrage_token.seal import SealedContract
 from erc20_demurrage_token.expiry import ExpiryContract
+from erc20_demurrage_token.callspec import CallSpec
+from erc20_demurrage_token.decode import (
+        WORD_SIZE,
+        to_view,
+        decode_word,
+        decode_words,
+        )
 
 logg = logging.getLogger(__name__)
 
+# redistributionItem struct argument, passed as its three words
+REDISTRIBUTION_SIGNATURE = '((uint32,uint72,uint64))'
+
+
+def redistribution_words(v):
+    v = strip_0x(v)
+    return (v[:64], v[64:128], v[128:192],)
+
 
 class DemurrageRedistribution:
-    
+    """Redistribution item, as returned by the redistributions getter.
+
+    :param v: ABI encoded item, three words
+    :type v: str, bytes, bytearray or memoryview
+    """
+
+    __slots__ = ('period', 'value', 'demurrage', 'demurrage_fixed',)
+
     def __init__(self, v):
-        d = ABIContractDecoder()
-        v = strip_0x(v)
-        d.typ(ABIContractType.UINT256)
-        d.typ(ABIContractType.UINT256)
-        d.typ(ABIContractType.BYTES32)
-        d.val(v[:64])
-        d.val(v[64:128])
-        d.val(v[128:192])
-        r = d.decode()
+        (period, value, demurrage_fixed) = decode_words(v, count=3)
+        self.__set(period, value, demurrage_fixed)
+
 
-        self.period = r[0]
-        self.value = r[1]
-        self.demurrage = from_fixed(r[2])
+    def __set(self, period, value, demurrage_fixed):
+        self.period = period
+        self.value = value
+        # 64x64 fraction of the modifier, 0 in the first period
+        self.demurrage_fixed = demurrage_fixed
+        self.demurrage = demurrage_fixed / (1 << 64)
+
+
+    @classmethod
+    def from_words(cls, period, value, demurrage_fixed):
+        """Create an item from already decoded words.
+        """
+        o = cls.__new__(cls)
+        o.__set(period, value, demurrage_fixed)
+        return o
+
+
+    @classmethod
+    def decode_many(cls, v, count=None):
+        """Decode consecutive redistribution items in one pass.
+
+        :param v: ABI encoded items, three words each
+        :type v: str, bytes, bytearray or memoryview
+        :param count: Number of items. If not set, all items in the data are decoded
+        :type count: int
+        :raises ValueError: Data length does not match the item count
+        :rtype: list of erc20_demurrage_token.token.DemurrageRedistribution
+        """
+        v = to_view(v)
+        if count == None:
+            if len(v) % (WORD_SIZE * 3) > 0:
+                raise ValueError('data length {} not a multiple of item size'.format(len(v)))
+            count = len(v) // (WORD_SIZE * 3)
+        words = decode_words(v, count=count * 3)
+        r = []
+        for i in range(0, len(words), 3):
+            r.append(cls.from_words(words[i], words[i+1], words[i+2]))
+        return r
 
 
     def __str__(self):
-        return 'period {} value {} demurrage {}'.format(self.period, self.value, self.demurrage)
+        return 'period {} value {} demurrage {}'.format(self.period, self.value, self.demurrage)
 
 
 class DemurrageTokenSettings:
@@ -78,6 +129,35 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
     __abi = {}
     __bytecode = {}
 
+    # calldata of the methods with static arguments, with selectors hashed once at class load
+    spec_transfer = CallSpec('transfer', ['address', 'uint256'])
+    spec_transfer_from = CallSpec('transferFrom', ['address', 'address', 'uint256'])
+    spec_approve = CallSpec('approve', ['address', 'uint256'])
+    spec_increase_allowance = CallSpec('increaseAllowance', ['address', 'uint256'])
+    spec_decrease_allowance = CallSpec('decreaseAllowance', ['address', 'uint256'])
+    spec_add_writer = CallSpec('addWriter', ['address'])
+    spec_set_max_supply = CallSpec('setMaxSupply', ['uint256'])
+    spec_delete_writer = CallSpec('deleteWriter', ['address'])
+    spec_mint_to = CallSpec('mintTo', ['address', 'uint256'])
+    spec_burn = CallSpec('burn', ['uint256'])
+    spec_set_sink_address = CallSpec('setSinkAddress', ['address'])
+    spec_sweep = CallSpec('sweep', ['address'])
+    spec_apply_demurrage_limited = CallSpec('applyDemurrageLimited', ['uint256'])
+    spec_apply_redistribution_on_account = CallSpec('applyRedistributionOnAccount', ['address'])
+    spec_total_burned = CallSpec('totalBurned')
+    spec_to_base_amount = CallSpec('toBaseAmount', ['uint256'])
+    spec_remainder = CallSpec('remainder', ['uint256', 'uint256'])
+    spec_redistributions = CallSpec('redistributions', ['uint256'])
+    spec_account_period = CallSpec('accountPeriod', ['address'])
+    spec_to_redistribution = CallSpec('toRedistribution', ['uint256', 'uint256', 'uint256', 'uint256'], signature='(uint256,int128,uint256,uint256)')
+    spec_to_redistribution_period = CallSpec('toRedistributionPeriod', ['bytes32', 'bytes32', 'bytes32'], signature=REDISTRIBUTION_SIGNATURE)
+    spec_to_redistribution_supply = CallSpec('toRedistributionSupply', ['bytes32', 'bytes32', 'bytes32'], signature=REDISTRIBUTION_SIGNATURE)
+    spec_to_redistribution_demurrage_modifier = CallSpec('toRedistributionDemurrageModifier', ['bytes32', 'bytes32', 'bytes32'], signature=REDISTRIBUTION_SIGNATURE)
+    spec_get_distribution_from_redistribution = CallSpec('getDistributionFromRedistribution', ['bytes32', 'bytes32', 'bytes32'], signature=REDISTRIBUTION_SIGNATURE)
+    spec_base_balance_of = CallSpec('baseBalanceOf', ['address'])
+    spec_decay_by = CallSpec('decayBy', ['uint256', 'uint256'])
+    spec_get_distribution = CallSpec('getDistribution', ['uint256', 'uint256'], signature='(uint256,int128)')
+
     def constructor(self, sender_address, settings, tx_format=TxFormat.JSONRPC, version=None):
         code = self.cargs(settings.name, settings.symbol, settings.decimals, settings.demurrage_level, settings.period_minutes, settings.sink_address, version=version)
         tx = self.template(sender_address, None, use_nonce=True)
@@ -124,32 +204,55 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
         return DemurrageToken.__bytecode[name]
 
 
-    def increase_allowance(self, contract_address, sender_address, address, value, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('increaseAllowance')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.typ(ABIContractType.UINT256)
-        enc.address(address)
-        enc.uint256(value)
-        data = enc.get()
+    def transact_spec(self, spec, contract_address, sender_address, args, tx_format=TxFormat.JSONRPC, id_generator=None):
+        """Build a transaction with calldata encoded by a precompiled call spec.
+
+        :param spec: Call spec
+        :type spec: erc20_demurrage_token.callspec.CallSpec
+        :param args: Method arguments
+        :type args: tuple
+        """
         tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        tx = self.set_code(tx, spec.encode(*args))
+        return self.finalize(tx, tx_format, id_generator=id_generator)
+
+
+    def call_spec(self, spec, contract_address, args, sender_address=ZERO_ADDRESS, id_generator=None):
+        """Build an eth_call request with calldata encoded by a precompiled call spec.
+
+        :param spec: Call spec
+        :type spec: erc20_demurrage_token.callspec.CallSpec
+        :param args: Method arguments
+        :type args: tuple
+        """
+        j = JSONRPCRequest(id_generator)
+        o = j.template()
+        o['method'] = 'eth_call'
+        tx = self.template(sender_address, contract_address)
+        tx = self.set_code(tx, add_0x(spec.encode(*args)))
+        o['params'].append(self.normalize(tx))
+        o['params'].append('latest')
+        return j.finalize(o)
+
+
+    def transfer(self, contract_address, sender_address, recipient_address, value, tx_format=TxFormat.JSONRPC, id_generator=None):
+        return self.transact_spec(self.spec_transfer, contract_address, sender_address, (recipient_address, value,), tx_format=tx_format, id_generator=id_generator)
+
+
+    def transfer_from(self, contract_address, sender_address, holder_address, recipient_address, value, tx_format=TxFormat.JSONRPC, id_generator=None):
+        return self.transact_spec(self.spec_transfer_from, contract_address, sender_address, (holder_address, recipient_address, value,), tx_format=tx_format)
+
+
+    def approve(self, contract_address, sender_address, spender_address, value, tx_format=TxFormat.JSONRPC, id_generator=None):
+        return self.transact_spec(self.spec_approve, contract_address, sender_address, (spender_address, value,), tx_format=tx_format)
+
+
+    def increase_allowance(self, contract_address, sender_address, address, value, tx_format=TxFormat.JSONRPC):
+        return self.transact_spec(self.spec_increase_allowance, contract_address, sender_address, (address, value,), tx_format=tx_format)
 
 
     def decrease_allowance(self, contract_address, sender_address, address, value, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('decreaseAllowance')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.typ(ABIContractType.UINT256)
-        enc.address(address)
-        enc.uint256(value)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_decrease_allowance, contract_address, sender_address, (address, value,), tx_format=tx_format)
 
 
     # backwards compatibility
@@ -158,27 +261,11 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
 
 
     def add_writer(self, contract_address, sender_address, address, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('addWriter')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.address(address)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_add_writer, contract_address, sender_address, (address,), tx_format=tx_format)
 
 
     def set_max_supply(self, contract_address, sender_address, cap, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('setMaxSupply')
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(cap)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_set_max_supply, contract_address, sender_address, (cap,), tx_format=tx_format)
 
 
     # backwards compatibility
@@ -187,170 +274,44 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
 
 
     def delete_writer(self, contract_address, sender_address, address, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('deleteWriter')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.address(address)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_delete_writer, contract_address, sender_address, (address,), tx_format=tx_format)
 
 
     def mint_to(self, contract_address, sender_address, address, value, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('mintTo')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.typ(ABIContractType.UINT256)
-        enc.address(address)
-        enc.uint256(value)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_mint_to, contract_address, sender_address, (address, value,), tx_format=tx_format)
 
 
     def burn(self, contract_address, sender_address, value, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('burn')
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(value)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_burn, contract_address, sender_address, (value,), tx_format=tx_format)
 
 
     def total_burned(self, contract_address, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('totalBurned')
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_total_burned, contract_address, (), sender_address=sender_address, id_generator=id_generator)
 
 
     def to_base_amount(self, contract_address, value, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('toBaseAmount')
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(value)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_to_base_amount, contract_address, (value,), sender_address=sender_address, id_generator=id_generator)
 
 
     def remainder(self, contract_address, parts, whole, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('remainder')
-        enc.typ(ABIContractType.UINT256)
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(parts)
-        enc.uint256(whole)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_remainder, contract_address, (parts, whole,), sender_address=sender_address, id_generator=id_generator)
 
 
     def redistributions(self, contract_address, idx, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('redistributions')
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(idx)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_redistributions, contract_address, (idx,), sender_address=sender_address, id_generator=id_generator)
 
 
     def account_period(self, contract_address, address, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('accountPeriod')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.address(address)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_account_period, contract_address, (address,), sender_address=sender_address, id_generator=id_generator)
 
 
     def to_redistribution(self, contract_address, participants, demurrage_modifier, value, period, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('toRedistribution')
-        enc.typ(ABIContractType.UINT256)
-        enc.typ_literal('int128')
-        enc.typ(ABIContractType.UINT256)
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(participants)
-        enc.uint256(demurrage_modifier)
-        enc.uint256(value)
-        enc.uint256(period)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_to_redistribution, contract_address, (participants, demurrage_modifier, value, period,), sender_address=sender_address, id_generator=id_generator)
 
 
 
     def to_redistribution_period(self, contract_address, redistribution, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('toRedistributionPeriod')
-        v = strip_0x(redistribution)
-        enc.typ_literal('(uint32,uint72,uint64)')
-        enc.bytes32(v[:64])
-        enc.bytes32(v[64:128])
-        enc.bytes32(v[128:192])
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_to_redistribution_period, contract_address, redistribution_words(redistribution), sender_address=sender_address, id_generator=id_generator)
 
 
 #    def to_redistribution_participants(self, contract_address, redistribution, sender_address=ZERO_ADDRESS, id_generator=None):
@@ -375,84 +336,23 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
 #
 
     def to_redistribution_supply(self, contract_address, redistribution, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('toRedistributionSupply')
-        v = strip_0x(redistribution)
-        enc.typ_literal('(uint32,uint72,uint64)')
-        enc.bytes32(v[:64])
-        enc.bytes32(v[64:128])
-        enc.bytes32(v[128:192])
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_to_redistribution_supply, contract_address, redistribution_words(redistribution), sender_address=sender_address, id_generator=id_generator)
 
 
     def to_redistribution_demurrage_modifier(self, contract_address, redistribution, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('toRedistributionDemurrageModifier')
-        v = strip_0x(redistribution)
-        enc.typ_literal('(uint32,uint72,uint64)')
-        enc.bytes32(v[:64])
-        enc.bytes32(v[64:128])
-        enc.bytes32(v[128:192])
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_to_redistribution_demurrage_modifier, contract_address, redistribution_words(redistribution), sender_address=sender_address, id_generator=id_generator)
 
 
     def base_balance_of(self, contract_address, address, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('baseBalanceOf')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.address(address)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_base_balance_of, contract_address, (address,), sender_address=sender_address, id_generator=id_generator)
 
 
     def set_sink_address(self, contract_address, sender_address, address, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('setSinkAddress')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.address(address)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_set_sink_address, contract_address, sender_address, (address,), tx_format=tx_format)
 
 
     def sweep(self, contract_address, sender_address, recipient_address, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('sweep')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.address(recipient_address)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_sweep, contract_address, sender_address, (recipient_address,), tx_format=tx_format)
 
 
 
@@ -460,15 +360,7 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
         if limit == 0:
             return self.transact_noarg('applyDemurrage', contract_address, sender_address)
 
-        enc = ABIContractEncoder()
-        enc.method('applyDemurrageLimited')
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(limit)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_apply_demurrage_limited, contract_address, sender_address, (limit,), tx_format=tx_format)
 
 
     def change_period(self, contract_address, sender_address):
@@ -476,15 +368,7 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
 
 
     def apply_redistribution_on_account(self, contract_address, sender_address, address, tx_format=TxFormat.JSONRPC):
-        enc = ABIContractEncoder()
-        enc.method('applyRedistributionOnAccount')
-        enc.typ(ABIContractType.ADDRESS)
-        enc.address(address)
-        data = enc.get()
-        tx = self.template(sender_address, contract_address, use_nonce=True)
-        tx = self.set_code(tx, data)
-        tx = self.finalize(tx, tx_format)
-        return tx
+        return self.transact_spec(self.spec_apply_redistribution_on_account, contract_address, sender_address, (address,), tx_format=tx_format)
 
 
     def decay_level(self, contract_address, sender_address=ZERO_ADDRESS):
@@ -499,6 +383,14 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
         return self.call_noarg('actualPeriod', contract_address, sender_address=sender_address)
 
 
+    def last_period(self, contract_address, sender_address=ZERO_ADDRESS):
+        return self.call_noarg('lastPeriod', contract_address, sender_address=sender_address)
+
+
+    def redistribution_count(self, contract_address, sender_address=ZERO_ADDRESS):
+        return self.call_noarg('redistributionCount', contract_address, sender_address=sender_address)
+
+
     def period_start(self, contract_address, sender_address=ZERO_ADDRESS):
         return self.call_noarg('periodStart', contract_address, sender_address=sender_address)
 
@@ -539,77 +431,46 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
 #
 
     def decay_by(self, contract_address, value, period, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('decayBy')
-        enc.typ(ABIContractType.UINT256)
-        enc.typ(ABIContractType.UINT256)
-        enc.uint256(value)
-        enc.uint256(period)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_decay_by, contract_address, (value, period,), sender_address=sender_address, id_generator=id_generator)
 
 
     def get_distribution(self, contract_address, supply, demurrage_amount, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('getDistribution')
-        enc.typ(ABIContractType.UINT256)
-        enc.typ_literal('int128')
-        enc.uint256(supply)
-        enc.uint256(demurrage_amount)
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_get_distribution, contract_address, (supply, demurrage_amount,), sender_address=sender_address, id_generator=id_generator)
 
 
     def get_distribution_from_redistribution(self, contract_address, redistribution, sender_address=ZERO_ADDRESS, id_generator=None):
-        j = JSONRPCRequest(id_generator)
-        o = j.template()
-        o['method'] = 'eth_call'
-        enc = ABIContractEncoder()
-        enc.method('getDistributionFromRedistribution')
-        v = strip_0x(redistribution)
-        enc.typ_literal('(uint32,uint72,uint64)')
-        enc.bytes32(v[:64])
-        enc.bytes32(v[64:128])
-        enc.bytes32(v[128:192])
-        data = add_0x(enc.get())
-        tx = self.template(sender_address, contract_address)
-        tx = self.set_code(tx, data)
-        o['params'].append(self.normalize(tx))
-        o['params'].append('latest')
-        o = j.finalize(o)
-        return o
+        return self.call_spec(self.spec_get_distribution_from_redistribution, contract_address, redistribution_words(redistribution), sender_address=sender_address, id_generator=id_generator)
+
 
 
+    @classmethod
+    def parse_balance(self, v):
+        return decode_word(v)
+
 
     @classmethod
     def parse_actual_period(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
+
+
+    @classmethod
+    def parse_last_period(self, v):
+        return decode_word(v)
+
+
+    @classmethod
+    def parse_redistribution_count(self, v):
+        return decode_word(v)
 
 
     @classmethod
     def parse_period_start(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_period_duration(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
@@ -618,14 +479,19 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
         return from_fixed(v)
 
 
+    @classmethod
+    def parse_demurrage_timestamp(self, v):
+        return decode_word(v)
+
+
     @classmethod
     def parse_remainder(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_to_base_amount(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
     
     @classmethod
@@ -640,47 +506,47 @@ class DemurrageToken(ERC20, SealedContract, ExpiryContract):
 
     @classmethod
     def parse_to_redistribution_period(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_to_redistribution_item(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_supply_cap(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_grow_by(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_decay_by(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_get_distribution(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_decay_level(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_resolution_factor(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
     @classmethod
     def parse_total_burned(self, v):
-        return abi_decode_single(ABIContractType.UINT256, v)
+        return decode_word(v)
 
 
 def bytecode(**kwargs):
@@ -21,6 +21,7 @@ from erc20_demurrage_token import (
         DemurrageToken,
         )
 from dexif import *
+from .fixture import SnapshotFixture
 
 logg = logging.getLogger()
 
@@ -155,3 +156,11 @@ class TestDemurrageDefault(TestDemurrage):
 
         self.default_supply = 10**12
         self.default_supply_cap = self.default_supply
+
+
+class TestDemurrageDefaultFixture(SnapshotFixture, TestDemurrageDefault):
+    """TestDemurrageDefault with the token deployed once per test class.
+
+    Every test starts from the chain state right after deployment, restored with an EVM snapshot revert.
+    """
+    pass
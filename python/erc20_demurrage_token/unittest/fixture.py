@@ -0,0 +1,85 @@
+# standard imports
+import copy
+import logging
+
+logg = logging.getLogger(__name__)
+
+# fixture key -> (saved test case attributes, snapshot id)
+_fixtures = {}
+
+
+def clear_fixtures():
+    """Discard all saved fixtures, so the next test sets up its fixture from scratch.
+    """
+    _fixtures.clear()
+
+
+def _copy_value(v):
+    # containers are copied so tests cannot change the saved fixture, other objects like the backend are shared
+    if isinstance(v, (list, dict, set,)):
+        return copy.copy(v)
+    return v
+
+
+def _get_fixture(k):
+    return _fixtures.get(k)
+
+
+def _set_fixture(k, v):
+    _fixtures[k] = v
+
+
+class SnapshotFixture:
+    """Mixin for EthTesterCase based test cases, which runs the test setUp chain only once and restores its resulting chain state for every subsequent test with an EVM snapshot revert.
+
+    It must be placed before the EthTesterCase based class in the list of base classes. Any setUp code in subclasses that comes after the super setUp call is still run for every test.
+
+    The fixture_scope class attribute selects how fixtures are shared:
+
+    - 'class': once per test class (default)
+    - 'session': once for all test classes with the same fixture_key
+    - None: no sharing, setUp runs in full for every test
+    """
+
+    fixture_scope = 'class'
+
+
+    def fixture_key(self):
+        """Key identifying tests that can share the same fixture.
+
+        For session scope the key is the first base class after the mixin, and the demurrage period if set.
+        """
+        if self.fixture_scope == 'session':
+            mro = type(self).__mro__
+            base = mro[mro.index(SnapshotFixture) + 1]
+            return (base, getattr(self, 'period', None),)
+        return type(self)
+
+
+    def setUp(self):
+        if self.fixture_scope == None:
+            super(SnapshotFixture, self).setUp()
+            return
+
+        k = self.fixture_key()
+        v = _get_fixture(k)
+        if v != None:
+            (attrs, snapshot_id,) = v
+            for (kk, vv) in attrs.items():
+                setattr(self, kk, _copy_value(vv))
+            self.helper.revert_to_snapshot(snapshot_id)
+            self.helper.enable_auto_mine_transactions()
+            logg.debug('reverted to fixture snapshot {} for {}'.format(snapshot_id, k))
+            return
+
+        keys = set(self.__dict__.keys())
+        super(SnapshotFixture, self).setUp()
+        attrs = {}
+        for kk in self.__dict__.keys():
+            # accounts is created in the test case constructor, and filled in setUp
+            if kk in keys and kk != 'accounts':
+                continue
+            attrs[kk] = _copy_value(self.__dict__[kk])
+        snapshot_id = self.helper.take_snapshot()
+        _set_fixture(k, (attrs, snapshot_id,))
+        logg.debug('saved fixture snapshot {} for {}'.format(snapshot_id, k))
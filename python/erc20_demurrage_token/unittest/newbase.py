@@ -21,6 +21,7 @@ from erc20_demurrage_token import (
         DemurrageToken,
         )
 from dexif import *
+from .fixture import SnapshotFixture
 
 logg = logging.getLogger()
 
@@ -144,3 +145,11 @@ class TestDemurrageDefault(TestDemurrage):
         c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
 
         self.deploy(c)
+
+
+class TestDemurrageDefaultFixture(SnapshotFixture, TestDemurrageDefault):
+    """TestDemurrageDefault with the token deployed once per test class.
+
+    Every test starts from the chain state right after deployment, restored with an EVM snapshot revert.
+    """
+    pass
@@ -0,0 +1,37 @@
+# standard imports
+import logging
+
+# external imports
+from dexif import to_fixed
+
+# local imports
+from erc20_demurrage_token.sim.sweep import (
+        grid,
+        sweep,
+        )
+
+logging.basicConfig(level=logging.WARNING)
+logg = logging.getLogger()
+
+# demurrage per minute equivalent to approx 1%, 2% and 5% per month
+decay_per_minute = [
+    0.00000023265,
+    0.00000046765,
+    0.00000118731,
+    ]
+
+# the process pool needs the main module to be importable without side effects
+if __name__ == '__main__':
+    runs = grid(
+        [to_fixed(1 - v) for v in decay_per_minute],
+        [60*24, 60*24*7], # 1 day and 1 week in minutes
+        caps=[0, 10 ** 12],
+        seeds=[1, 2, 3],
+        actors=20,
+        periods=52,
+        transfers=50,
+        )
+
+    # every run is independent, and is executed in a process pool on all cores
+    for r in sweep(runs):
+        print(r)
@@ -0,0 +1,63 @@
+# standard imports
+import os
+import json
+import timeit
+import unittest
+import logging
+
+# external imports
+from chainlib.chain import ChainSpec
+from chainlib.eth.contract import (
+        ABIContractEncoder,
+        ABIContractType,
+        )
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+
+logging.basicConfig(level=logging.INFO)
+logg = logging.getLogger()
+
+# BENCH_CALLSPEC_NUMBER: encodings per measurement
+number = int(os.environ.get('BENCH_CALLSPEC_NUMBER', 10000))
+
+contract_address = '0x' + '01' * 20
+recipient_address = '0x' + '02' * 20
+
+
+def encode_transfer_encoder():
+    enc = ABIContractEncoder()
+    enc.method('transfer')
+    enc.typ(ABIContractType.ADDRESS)
+    enc.typ(ABIContractType.UINT256)
+    enc.address(recipient_address)
+    enc.uint256(1024)
+    return enc.get()
+
+
+def encode_transfer_spec():
+    return DemurrageToken.spec_transfer.encode(recipient_address, 1024)
+
+
+class BenchCallSpec(unittest.TestCase):
+
+    def test_bench_encode(self):
+        # chainlib debug logs every encoded word
+        logging.getLogger('chainlib').setLevel(logging.INFO)
+        c = DemurrageToken(ChainSpec('evm', 'foochain', 42))
+        scenarios = {
+            'transfer_encoder': encode_transfer_encoder,
+            'transfer_spec': encode_transfer_spec,
+            'to_base_amount_call': lambda: c.to_base_amount(contract_address, 1024),
+                }
+        results = {}
+        for (k, fn) in scenarios.items():
+            t = min(timeit.repeat(fn, number=number, repeat=5))
+            # microseconds per call
+            results[k] = (t / number) * 1000000
+            logg.info('{} {:.3f}us'.format(k, results[k]))
+        print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
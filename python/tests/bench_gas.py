@@ -1,21 +1,23 @@
 # standard imports
 import os
 import unittest
-import json
 import logging
-import datetime
+import functools
 
 # external imports
-from chainlib.eth.constant import ZERO_ADDRESS
 from chainlib.eth.nonce import RPCNonceOracle
 from chainlib.eth.tx import receipt
-from chainlib.eth.block import (
-        block_latest,
-        block_by_number,
-    )
 
 # local imports
 from erc20_demurrage_token import DemurrageToken
+from erc20_demurrage_token.bench import (
+        GasBenchmark,
+        DEFAULT_THRESHOLD,
+        bytecode_hash,
+        save_baseline,
+        load_baseline,
+        compare,
+        )
 
 # test imports
 from erc20_demurrage_token.unittest import TestDemurrageDefault
@@ -25,143 +27,140 @@ logg = logging.getLogger()
 
 testdir = os.path.dirname(__file__)
 
+# BENCH_GAS_BASELINE: baseline file path
+# BENCH_GAS_UPDATE: if set, overwrite the baseline with the results of this run
+# BENCH_GAS_THRESHOLD: allowed relative increase of median gas per scenario
+# BENCH_GAS_ROUNDS: rounds per scenario
+# BENCH_GAS_SCENARIOS: comma separated scenario names to run, default all
+baseline_path = os.environ.get('BENCH_GAS_BASELINE', os.path.join(testdir, 'bench_gas_baseline.json'))
+update_baseline = os.environ.get('BENCH_GAS_UPDATE') != None
+threshold = float(os.environ.get('BENCH_GAS_THRESHOLD', DEFAULT_THRESHOLD))
+rounds = int(os.environ.get('BENCH_GAS_ROUNDS', 5))
+scenario_names = None
+if os.environ.get('BENCH_GAS_SCENARIOS') != None:
+    scenario_names = os.environ['BENCH_GAS_SCENARIOS'].split(',')
 
+PERIOD_CATCHUP_GAPS = [1, 10, 100]
+APPLY_DEMURRAGE_ROUNDS = [1, 10, 100, 1000]
 
-class BenchBasic(TestDemurrageDefault):
-
-    def setUp(self):
-        super(BenchBasic, self).setUp()
-        self.bench = {
-    'mint': None,
-    'transfer_light': None,
-    'transfer_heavy': None,
-    'approve': None,
-    'transfer_from': None,
-    'period_light': None,
-    'period_heavy': None,
-    'period_catchup': None,
-    'demurrage': None,
-        }
-
-
-    def test_bench_min(self):
-        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
-        (tx_hash, o) = c.mint_to(self.address, self.accounts[0], self.accounts[1], 1024)
-        r = self.rpc.do(o)
-        o = receipt(tx_hash)
-        r = self.rpc.do(o)
-        self.assertEqual(r['status'], 1)
-        self.bench['mint'] = r['gas_used']
-        
-        nonce_oracle = RPCNonceOracle(self.accounts[1], self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
-        (tx_hash, o) = c.transfer(self.address, self.accounts[1], self.accounts[2], 512)
-        r = self.rpc.do(o)
-        o = receipt(tx_hash)
-        r = self.rpc.do(o)
-        self.assertEqual(r['status'], 1)
-        self.bench['transfer_light'] = r['gas_used']
-
-        (tx_hash, o) = c.approve(self.address, self.accounts[1], self.accounts[0], 512)
-        r = self.rpc.do(o)
-        o = receipt(tx_hash)
-        r = self.rpc.do(o)
-        self.assertEqual(r['status'], 1)
-        self.bench['approve'] = r['gas_used']
-
-        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
-        (tx_hash, o) = c.transfer_from(self.address, self.accounts[0], self.accounts[1], self.accounts[3], 256)
-        r = self.rpc.do(o)
-        o = receipt(tx_hash)
-        r = self.rpc.do(o)
-        self.assertEqual(r['status'], 1)
-        self.bench['transfer_from'] = r['gas_used']
-
-        z = 0
-        for i in range(100):
-            self.backend.time_travel(self.start_time + int(self.period_seconds / 2) + (10 * (i * (i + 1))))
-            (tx_hash, o) = c.apply_demurrage(self.address, self.accounts[0])
-            r = self.rpc.do(o)
-            o = receipt(tx_hash)
-            r = self.rpc.do(o)
-            self.assertEqual(r['status'], 1)
-            z += r['gas_used']
-            logg.info('demurrage round {} gas {}'.format(i, r['gas_used']))
-        z /= 100
-        self.bench['demurrage'] = int(z)
-
-        z = 0
-        for i in range(100):
-            self.backend.time_travel(self.start_time + (self.period_seconds * (i + 1)))
-            (tx_hash, o) = c.change_period(self.address, self.accounts[0])
-            r = self.rpc.do(o)
-            o = receipt(tx_hash)
-            r = self.rpc.do(o)
-            self.assertEqual(r['status'], 1)
-            z += r['gas_used']
-            logg.info('period with demurrage round {} gas {}'.format(i, r['gas_used']))
-
-        z /= 100
-        self.bench['period_heavy'] = int(z)
-
-        z = 0
-        for i in range(100):
-            self.backend.time_travel(self.start_time + (self.period_seconds * ((i + 101))))
-            (tx_hash, o) = c.apply_demurrage(self.address, self.accounts[0])
-            r = self.rpc.do(o)
-            o = receipt(tx_hash)
-            r = self.rpc.do(o)
-            self.assertEqual(r['status'], 1)
-
-            (tx_hash, o) = c.change_period(self.address, self.accounts[0])
-            r = self.rpc.do(o)
-            o = receipt(tx_hash)
-            r = self.rpc.do(o)
-            self.assertEqual(r['status'], 1)
-            z += r['gas_used']
-            logg.info('period without demurrage round {} gas {}'.format(i, r['gas_used']))
-
-        z /= 100
-        self.bench['period_light'] = int(z)
-
-        z = 0
-        self.backend.time_travel(self.start_time + (self.period_seconds * 401))
-        for i in range(100):
-            (tx_hash, o) = c.change_period(self.address, self.accounts[0])
-            r = self.rpc.do(o)
-            o = receipt(tx_hash)
-            r = self.rpc.do(o)
-            self.assertEqual(r['status'], 1)
-            z += r['gas_used']
-            logg.info('period catchup round {} gas {}'.format(i, r['gas_used']))
-
-        z /= 100
-        self.bench['period_catchup'] = int(z)
-
-        self.backend.time_travel(self.start_time + (self.period_seconds * 501))
-        (tx_hash, o) = c.mint_to(self.address, self.accounts[0], self.accounts[2], 1024)
-        r = self.rpc.do(o)
-        o = receipt(tx_hash)
-        r = self.rpc.do(o)
-        self.assertEqual(r['status'], 1)
-        self.backend.time_travel(self.start_time + (self.period_seconds * 502))
-
-        nonce_oracle = RPCNonceOracle(self.accounts[2], self.rpc)
-        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
-        (tx_hash, o) = c.transfer(self.address, self.accounts[2], self.accounts[4], 1)
-        r = self.rpc.do(o)
-        o = receipt(tx_hash)
-        r = self.rpc.do(o)
-        self.assertEqual(r['status'], 1)
-        self.bench['transfer_heavy'] = r['gas_used']
-
-        print(json.dumps(self.bench))
+bench = GasBenchmark()
 
 
+def send(case, sender, fn):
+    nonce_oracle = RPCNonceOracle(sender, case.rpc)
+    c = DemurrageToken(case.chain_spec, signer=case.signer, nonce_oracle=nonce_oracle)
+    (tx_hash, o) = fn(c)
+    case.rpc.do(o)
+    o = receipt(tx_hash)
+    r = case.rpc.do(o)
+    case.assertEqual(r['status'], 1)
+    return r['gas_used']
 
 
+# seconds into the first period for round i, so every round decays a different number of minutes
+def offset(case, i):
+    return 3600 + (i * 7 * 60)
+
+
+def mint(case, recipient, value=1024):
+    return send(case, case.accounts[0], lambda c: c.mint_to(case.address, case.accounts[0], recipient, value))
+
+
+@bench.scenario('mint')
+def bench_mint(case, i):
+    case.backend.time_travel(case.start_time + offset(case, i))
+    return mint(case, case.accounts[1])
+
+
+@bench.scenario('transfer_light')
+def bench_transfer_light(case, i):
+    mint(case, case.accounts[1])
+    case.backend.time_travel(case.start_time + offset(case, i))
+    return send(case, case.accounts[1], lambda c: c.transfer(case.address, case.accounts[1], case.accounts[2], 512))
+
+
+# the transfer crosses a period boundary, and executes the period change
+@bench.scenario('transfer_heavy')
+def bench_transfer_heavy(case, i):
+    mint(case, case.accounts[1])
+    case.backend.time_travel(case.start_time + case.period_seconds + offset(case, i))
+    return send(case, case.accounts[1], lambda c: c.transfer(case.address, case.accounts[1], case.accounts[2], 512))
+
+
+@bench.scenario('approve')
+def bench_approve(case, i):
+    case.backend.time_travel(case.start_time + offset(case, i))
+    return send(case, case.accounts[1], lambda c: c.approve(case.address, case.accounts[1], case.accounts[0], 512))
+
+
+@bench.scenario('transfer_from')
+def bench_transfer_from(case, i):
+    mint(case, case.accounts[1])
+    send(case, case.accounts[1], lambda c: c.approve(case.address, case.accounts[1], case.accounts[0], 512))
+    case.backend.time_travel(case.start_time + offset(case, i))
+    return send(case, case.accounts[0], lambda c: c.transfer_from(case.address, case.accounts[0], case.accounts[1], case.accounts[3], 256))
+
+
+# total gas of the changePeriod calls needed to catch up with a gap of periods
+def bench_period_catchup(case, i, gap=1):
+    mint(case, case.accounts[1])
+    case.backend.time_travel(case.start_time + (case.period_seconds * gap) + offset(case, i))
+    z = 0
+    for j in range(gap):
+        z += send(case, case.accounts[0], lambda c: c.change_period(case.address, case.accounts[0]))
+    return z
+
+
+def bench_apply_demurrage_limited(case, i, limit=1):
+    case.backend.time_travel(case.start_time + (limit * 2 * 60) + offset(case, i))
+    return send(case, case.accounts[0], lambda c: c.apply_demurrage(case.address, case.accounts[0], limit=limit))
+
+
+for gap in PERIOD_CATCHUP_GAPS:
+    bench.register('period_catchup_{}'.format(gap), functools.partial(bench_period_catchup, gap=gap))
+
+for limit in APPLY_DEMURRAGE_ROUNDS:
+    bench.register('apply_demurrage_limited_{}'.format(limit), functools.partial(bench_apply_demurrage_limited, limit=limit))
+
+
+@bench.scenario('sweep')
+def bench_sweep(case, i):
+    mint(case, case.accounts[1])
+    case.backend.time_travel(case.start_time + offset(case, i))
+    return send(case, case.accounts[1], lambda c: c.sweep(case.address, case.accounts[1], case.accounts[2]))
+
+
+@bench.scenario('burn')
+def bench_burn(case, i):
+    mint(case, case.accounts[0])
+    case.backend.time_travel(case.start_time + offset(case, i))
+    return send(case, case.accounts[0], lambda c: c.burn(case.address, case.accounts[0], 512))
+
+
+class BenchGas(TestDemurrageDefault):
+
+    def test_bench(self):
+        results = bench.run(self, rounds=rounds, names=scenario_names)
+        for k in sorted(results.keys()):
+            print('{}: {}'.format(k, results[k]))
+
+        contract_hash = bytecode_hash(DemurrageToken.bytecode())
+        if update_baseline:
+            save_baseline(baseline_path, results, contract_hash=contract_hash)
+            logg.info('saved baseline to {}'.format(baseline_path))
+            return
+
+        baseline = load_baseline(baseline_path)
+        if baseline == None:
+            self.fail('no baseline at {}, set BENCH_GAS_UPDATE to record one'.format(baseline_path))
+
+        if baseline['contract'] != contract_hash:
+            logg.warning('baseline was recorded for contract {}, benchmarked contract is {}'.format(baseline['contract'], contract_hash))
+
+        regressions = compare(results, baseline, threshold=threshold)
+        if len(regressions) > 0:
+            self.fail('gas regressions past threshold {}:\n{}'.format(threshold, '\n'.join([str(r) for r in regressions])))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,138 @@
+# standard imports
+import os
+import sys
+import unittest
+import logging
+
+# external imports
+from chainlib.eth.nonce import RPCNonceOracle
+from chainlib.eth.tx import receipt
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+from erc20_demurrage_token.bench import (
+        GasStats,
+        dump_curve,
+        write_curve,
+        )
+
+# test imports
+from erc20_demurrage_token.unittest import TestDemurrageDefault
+
+logging.basicConfig(level=logging.INFO)
+logg = logging.getLogger()
+
+# BENCH_GAS_SCALING_DIR: directory to write curves to, default standard output
+# BENCH_GAS_SCALING_FORMAT: json or csv
+# BENCH_GAS_GAPS: comma separated period gaps for the catch-up curve, e.g. 1,10,100,1000,10000 for the full sweep
+# BENCH_GAS_LIMITS: comma separated round limits for the applyDemurrageLimited curve
+output_dir = os.environ.get('BENCH_GAS_SCALING_DIR')
+output_format = os.environ.get('BENCH_GAS_SCALING_FORMAT', 'json')
+
+
+def int_list(k, default):
+    v = os.environ.get(k)
+    if v == None:
+        return default
+    return [int(x) for x in v.split(',')]
+
+
+gaps = int_list('BENCH_GAS_GAPS', [1, 2, 5, 10, 20, 50])
+limits = int_list('BENCH_GAS_LIMITS', [1, 10, 100, 1000, 10000, 100000, 1000000])
+
+CATCHUP_FIELDS = ['gap', 'calls', 'first', 'min', 'median', 'max', 'total', 'reverted_at']
+LIMIT_FIELDS = ['limit', 'minutes', 'gas', 'status']
+
+
+class BenchGasScaling(TestDemurrageDefault):
+
+    def setUp(self):
+        super(BenchGasScaling, self).setUp()
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
+        (tx_hash, o) = c.mint_to(self.address, self.accounts[0], self.accounts[1], self.default_supply)
+        self.rpc.do(o)
+        o = receipt(tx_hash)
+        r = self.rpc.do(o)
+        self.assertEqual(r['status'], 1)
+        self.snapshot_id = self.helper.take_snapshot()
+
+
+    def revert(self):
+        self.helper.revert_to_snapshot(self.snapshot_id)
+        self.helper.enable_auto_mine_transactions()
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        return DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
+
+
+    def send(self, o):
+        (tx_hash, o) = o
+        self.rpc.do(o)
+        o = receipt(tx_hash)
+        return self.rpc.do(o)
+
+
+    def output(self, name, rows, fields):
+        if output_dir == None:
+            sys.stdout.write('{}:\n'.format(name))
+            dump_curve(sys.stdout, rows, fields, fmt=output_format)
+            return
+        path = os.path.join(output_dir, '{}.{}'.format(name, output_format))
+        write_curve(path, rows, fields)
+        logg.info('wrote {} points to {}'.format(len(rows), path))
+
+
+    # A gap of n periods takes n changePeriod calls to catch up, the first of which also applies the demurrage of all minutes since the last update.
+    # Catch-up stops at the first reverted call, which happens when the demurrage modifier has decayed to zero.
+    def test_period_catchup(self):
+        rows = []
+        for gap in gaps:
+            c = self.revert()
+            self.backend.time_travel(self.start_time + (self.period_seconds * gap) + 1)
+            samples = []
+            reverted_at = None
+            for i in range(gap):
+                r = self.send(c.change_period(self.address, self.accounts[0]))
+                if r['status'] == 0:
+                    reverted_at = i
+                    break
+                samples.append(r['gas_used'])
+
+            row = {
+                'gap': gap,
+                'calls': len(samples),
+                'total': sum(samples),
+                'reverted_at': reverted_at,
+                    }
+            if len(samples) > 0:
+                s = GasStats(samples)
+                row['first'] = samples[0]
+                row.update(s.serialize())
+            rows.append(row)
+            logg.info('period catchup {}'.format(row))
+
+        self.output('bench_gas_period_catchup', rows, CATCHUP_FIELDS)
+
+
+    # The exp calculation in applyDemurrageLimited is done once per call regardless of the number of minutes, but the exponent grows with the limit.
+    def test_apply_demurrage_limited(self):
+        rows = []
+        minutes = max(limits) * 2
+        for limit in limits:
+            c = self.revert()
+            self.backend.time_travel(self.start_time + (minutes * 60))
+            r = self.send(c.apply_demurrage(self.address, self.accounts[0], limit=limit))
+            row = {
+                'limit': limit,
+                'minutes': minutes,
+                'gas': r['gas_used'],
+                'status': r['status'],
+                    }
+            rows.append(row)
+            logg.info('apply demurrage limited {}'.format(row))
+
+        self.output('bench_gas_apply_demurrage_limited', rows, LIMIT_FIELDS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# standard imports
+import os
+import sys
+import time
+import json
+import unittest
+import logging
+import statistics
+import subprocess
+
+logging.basicConfig(level=logging.INFO)
+logg = logging.getLogger()
+
+testdir = os.path.dirname(__file__)
+rootdir = os.path.join(testdir, '..')
+
+# BENCH_STARTUP_ROUNDS: process starts per scenario
+rounds = int(os.environ.get('BENCH_STARTUP_ROUNDS', 10))
+
+scenarios = {
+    'import': ['-c', 'import erc20_demurrage_token.runnable.publish'],
+    'help': ['-m', 'erc20_demurrage_token.runnable.publish', '--help'],
+    'import_token': ['-c', 'from erc20_demurrage_token import DemurrageToken'],
+        }
+
+
+def run(argv):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([rootdir, env.get('PYTHONPATH', '')])
+    t = time.perf_counter()
+    subprocess.run([sys.executable] + argv, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - t
+
+
+class BenchStartup(unittest.TestCase):
+
+    def test_bench_startup(self):
+        results = {}
+        for (k, argv) in scenarios.items():
+            samples = [run(argv) for i in range(rounds)]
+            results[k] = {
+                'min': min(samples),
+                'median': statistics.median(samples),
+                'max': max(samples),
+                'rounds': rounds,
+                    }
+            logg.info('{} {}'.format(k, results[k]))
+        print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from dexif import to_fixed
+
+# local imports
+from erc20_demurrage_token import DemurrageTokenSettings
+from erc20_demurrage_token.sim import DemurrageTokenSimulation
+
+logging.basicConfig(level=logging.INFO)
+logg = logging.getLogger()
+
+
+decay_per_minute = 0.00000046765515 # equals approx 2% per month
+
+
+class TestSimNext(unittest.TestCase):
+
+    def setUp(self):
+        settings = DemurrageTokenSettings()
+        settings.name = 'Simulated Demurrage Token'
+        settings.symbol = 'SIM'
+        settings.decimals = 6
+        settings.demurrage_level = to_fixed(1 - decay_per_minute)
+        settings.period_minutes = 10800 # 1 week in minutes
+        self.sim = DemurrageTokenSimulation('evm:foochain:42', settings, actors=2)
+
+
+    def last_period(self):
+        c = self.sim.caller_contract
+        o = c.last_period(self.sim.address, sender_address=self.sim.caller_address)
+        r = self.sim.rpc.do(o)
+        return c.parse_last_period(r)
+
+
+    def test_next(self):
+        self.sim.mint(self.sim.actors[0], self.sim.from_units(100))
+        for i in range(1, 4):
+            (block_number, timestamp) = self.sim.next()
+            # both transactions are mined in the block after the period boundary
+            self.assertEqual(timestamp, self.sim.start_timestamp + (i * self.sim.period_seconds) + 1)
+            self.assertEqual(self.sim.get_now(), timestamp)
+            self.assertEqual(self.sim.get_period(), i + 1)
+            self.assertEqual(self.last_period(), i)
+        self.assertLess(self.sim.balance(self.sim.actors[0]), self.sim.from_units(100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from dexif import to_fixed
+
+# local imports
+from erc20_demurrage_token import DemurrageTokenSettings
+from erc20_demurrage_token.sim import (
+        DemurrageTokenOfflineSimulation,
+        TxLimitException,
+        )
+
+logging.basicConfig(level=logging.INFO)
+logg = logging.getLogger()
+
+
+decay_per_minute = 0.00000046765515 # equals approx 2% per month
+
+
+def create_settings():
+    settings = DemurrageTokenSettings()
+    settings.name = 'Simulated Demurrage Token'
+    settings.symbol = 'SIM'
+    settings.decimals = 6
+    settings.demurrage_level = to_fixed(1 - decay_per_minute)
+    settings.period_minutes = 10800 # 1 week in minutes
+    return settings
+
+
+def sim_state(sim):
+    return (
+        sim.last_block,
+        sim.last_timestamp,
+        sim.period_blocks,
+        sim.demurrage_amount,
+        sim.demurrage_timestamp,
+        sim.last_period,
+        sim.total_sink,
+        sim.supply,
+        [list(v) for v in sim.redistributions],
+        dict(sim.account),
+            )
+
+
+class TestSimOffline(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = DemurrageTokenOfflineSimulation(create_settings(), actors=10, start_timestamp=1000000)
+
+
+    def test_mint(self):
+        self.sim.mint(self.sim.actors[0], 1024)
+        self.assertEqual(self.sim.balance(self.sim.actors[0]), 1024)
+        self.sim.next()
+        self.assertEqual(self.sim.get_period(), 2)
+        balance = self.sim.balance(self.sim.actors[0])
+        self.assertEqual(balance, 1018)
+        self.assertEqual(self.sim.get_supply(), 1024)
+
+
+    def test_transfer(self):
+        self.sim.mint(self.sim.actors[0], 1024)
+        self.sim.transfer(self.sim.actors[0], self.sim.actors[1], 500)
+        self.assertEqual(self.sim.balance(self.sim.actors[0]), 524)
+        self.assertEqual(self.sim.balance(self.sim.actors[1]), 500)
+        with self.assertRaises(RuntimeError):
+            self.sim.transfer(self.sim.actors[1], self.sim.actors[0], 501)
+
+
+    def test_transfer_fail(self):
+        self.sim.mint(self.sim.actors[0], self.sim.from_units(100))
+        self.sim.mint(self.sim.actors[1], self.sim.from_units(100))
+        # the failing transfer is the first one in the next period, so it would also change the period
+        self.sim.last_timestamp += self.sim.period_duration
+        state = sim_state(self.sim)
+        with self.assertRaises(RuntimeError):
+            self.sim.transfer(self.sim.actors[2], self.sim.actors[0], 1)
+        self.assertEqual(sim_state(self.sim), state)
+
+        self.sim.transfer(self.sim.actors[0], self.sim.actors[2], 1)
+        self.assertEqual(self.sim.last_block, state[0] + 1)
+        self.assertEqual(len(self.sim.redistributions), 2)
+        self.assertGreater(self.sim.balance(self.sim.sink_address), 0)
+
+
+    def test_cap(self):
+        sim = DemurrageTokenOfflineSimulation(create_settings(), actors=1, start_timestamp=1000000, cap=1024)
+        sim.mint(sim.actors[0], 1000)
+        sim.last_timestamp += sim.period_duration
+        state = sim_state(sim)
+        with self.assertRaises(RuntimeError):
+            sim.mint(sim.actors[0], 25)
+        self.assertEqual(sim_state(sim), state)
+        sim.mint(sim.actors[0], 24)
+        self.assertEqual(sim.get_supply(), 1024)
+
+
+    def test_sink(self):
+        self.sim.mint(self.sim.actors[0], self.sim.from_units(100))
+        self.sim.mint(self.sim.actors[1], self.sim.from_units(100))
+        for i in range(52):
+            self.sim.next()
+        self.assertEqual(self.sim.get_period(), 53)
+        self.assertEqual(self.sim.last_period, 52)
+
+        # the sink collects the demurrage of all periods, up to rounding
+        total = 0
+        for account in self.sim.accounts:
+            total += self.sim.balance(account)
+        self.assertLessEqual(total, self.sim.get_supply())
+        self.assertGreater(total, self.sim.get_supply() - 100)
+        self.assertGreater(self.sim.balance(self.sim.sink_address), self.sim.from_units(40))
+        self.assertAlmostEqual(self.sim.get_demurrage(), (1 - decay_per_minute) ** (52 * 10800), places=6)
+
+
+    def test_precise(self):
+        precise_sim = DemurrageTokenOfflineSimulation(create_settings(), actors=1, start_timestamp=1000000)
+        for sim in [self.sim, precise_sim]:
+            sim.mint(sim.actors[0], sim.from_units(100))
+        self.sim.next()
+        precise_sim.next(precise=True)
+        self.assertEqual(precise_sim.get_period(), self.sim.get_period())
+        self.assertAlmostEqual(precise_sim.balance(precise_sim.actors[0]), self.sim.balance(self.sim.actors[0]), delta=100)
+
+
+    def test_batch(self):
+        self.sim.mint(self.sim.actors[0], 1024)
+        block = self.sim.last_block
+        self.sim.start_batch()
+        for i in range(1, 10):
+            self.sim.transfer(self.sim.actors[0], self.sim.actors[i], 100)
+        self.assertEqual(len(self.sim.commit()), 9)
+        self.assertEqual(self.sim.last_block, block + 1)
+        self.assertEqual(self.sim.period_blocks, 2)
+        self.assertEqual(len(self.sim.period_txs), 10)
+        self.assertEqual(self.sim.balance(self.sim.actors[0]), 124)
+
+
+    def test_batch_limit(self):
+        settings = create_settings()
+        settings.period_minutes = 1
+        sim = DemurrageTokenOfflineSimulation(settings, actors=1)
+        sim.start_batch()
+        for i in range(100):
+            sim.mint(sim.actors[0], i)
+        sim.commit()
+        for i in range(58):
+            sim.mint(sim.actors[0], i)
+        with self.assertRaises(TxLimitException):
+            sim.mint(sim.actors[0], i)
+
+
+    def test_limit(self):
+        settings = create_settings()
+        settings.period_minutes = 1
+        sim = DemurrageTokenOfflineSimulation(settings, actors=1)
+        with self.assertRaises(TxLimitException):
+            for i in range(60):
+                sim.mint(sim.actors[0], i)
+
+
+class TestSimDifferential(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            from erc20_demurrage_token.sim import DemurrageTokenSimulation
+        except ImportError as e:
+            self.skipTest('evm simulation not available: {}'.format(e))
+        self.sim = DemurrageTokenSimulation('evm:foochain:42', create_settings(), actors=3)
+        self.offline_sim = DemurrageTokenOfflineSimulation(create_settings(), actors=3, start_timestamp=self.sim.start_timestamp)
+
+
+    def test_periods(self):
+        for sim in [self.sim, self.offline_sim]:
+            sim.mint(sim.actors[0], sim.from_units(100))
+            sim.mint(sim.actors[1], sim.from_units(100))
+            sim.transfer(sim.actors[0], sim.actors[2], sim.from_units(10))
+            for i in range(3):
+                sim.next()
+                sim.transfer(sim.actors[1], sim.actors[2], sim.from_units(1))
+            sim.start_batch()
+            sim.transfer(sim.actors[2], sim.actors[0], sim.from_units(2))
+            sim.mint(sim.actors[1], sim.from_units(5))
+            self.assertEqual(len(sim.commit()), 2)
+
+        self.assertEqual(self.offline_sim.get_now(), self.sim.get_now())
+        self.assertEqual(self.offline_sim.get_period(), self.sim.get_period())
+        self.assertEqual(self.offline_sim.get_supply(), self.sim.get_supply())
+        for i in range(3):
+            for base in [True, False]:
+                self.assertEqual(
+                        self.offline_sim.balance(self.offline_sim.actors[i], base=base),
+                        self.sim.balance(self.sim.actors[i], base=base),
+                        )
+        self.assertEqual(self.offline_sim.balance(self.offline_sim.sink_address, base=True), self.sim.balance(self.sim.sink_address, base=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from dexif import to_fixed
+
+# local imports
+from erc20_demurrage_token.sim.sweep import (
+        gini,
+        grid,
+        sweep,
+        )
+
+logging.basicConfig(level=logging.WARNING)
+logg = logging.getLogger()
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_gini(self):
+        self.assertEqual(gini([]), 0.0)
+        self.assertEqual(gini([5, 5, 5, 5]), 0.0)
+        self.assertAlmostEqual(gini([0, 0, 0, 100]), 0.75)
+
+
+    def test_sweep(self):
+        runs = grid(
+                [to_fixed(1 - 0.00000046765), to_fixed(1 - 0.00000118731)],
+                [60*24],
+                caps=[0, 500 * (10 ** 6)],
+                seeds=[1],
+                actors=10,
+                periods=10,
+                transfers=20,
+                )
+        self.assertEqual(len(runs), 4)
+
+        results = sweep(runs, processes=2)
+        self.assertEqual([str(r.run) for r in results], [str(r) for r in runs])
+        self.assertEqual(results[1].supply, 500 * (10 ** 6))
+        for r in results:
+            self.assertGreater(r.sink_share, 0)
+            self.assertLess(r.sink_share, 0.1)
+            self.assertLess(abs(r.supply_drift), r.supply / 1000)
+        # stronger demurrage moves more to the sink
+        self.assertGreater(results[2].sink_share, results[0].sink_share)
+
+        serial_results = sweep(runs, processes=1)
+        for (a, b) in zip(results, serial_results):
+            self.assertEqual(str(a), str(b))
+
+
+if __name__ == '__main__':
+    unittest.main()
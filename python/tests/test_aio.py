@@ -0,0 +1,293 @@
+# standard imports
+import unittest
+import logging
+import asyncio
+import json
+
+# external imports
+try:
+    import aiohttp
+    from aiohttp import web
+    from aiohttp import test_utils
+except ImportError:
+    aiohttp = None
+from chainlib.chain import ChainSpec
+from chainlib.hash import keccak256_string_to_hex
+from chainlib.eth.nonce import OverrideNonceOracle
+from chainlib.eth.gas import OverrideGasOracle
+from chainlib.eth.error import RevertEthException
+from chainlib.error import RPCException
+from funga.eth.keystore.dict import DictKeystore
+from funga.eth.signer import EIP155Signer
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token.aio import (
+        AsyncDemurrageTokenClient,
+        AsyncHTTPConnection,
+        AsyncWebSocketConnection,
+        )
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+contract_address = '0x' + '01' * 20
+holders = ['0x' + i.to_bytes(20, byteorder='big').hex() for i in range(1, 101)]
+
+selector_balance_of = keccak256_string_to_hex('balanceOf(address)')[:8]
+selector_actual_period = keccak256_string_to_hex('actualPeriod()')[:8]
+
+
+class AsyncRPC:
+
+    def __init__(self, receipt_after=1, status=1):
+        self.receipt_after = receipt_after
+        self.status = status
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.sent = []
+        self.polls = {}
+        self.closed = False
+
+
+    async def do(self, o):
+        self.in_flight += 1
+        self.max_in_flight = max(self.in_flight, self.max_in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            return self.result(o)
+        finally:
+            self.in_flight -= 1
+
+
+    def result(self, o):
+        if o['method'] == 'eth_call':
+            data = strip_0x(o['params'][0]['data'])
+            if data[:8] == selector_balance_of:
+                return '0x' + (int(data[8:], 16) * 1000).to_bytes(32, byteorder='big').hex()
+            if data[:8] == selector_actual_period:
+                return '0x' + (42).to_bytes(32, byteorder='big').hex()
+        if o['method'] == 'eth_sendRawTransaction':
+            self.sent.append(o['params'][0])
+            return '0x' + '00' * 32
+        if o['method'] == 'eth_getTransactionReceipt':
+            tx_hash = o['params'][0]
+            i = self.polls.get(tx_hash, 0)
+            self.polls[tx_hash] = i + 1
+            if i < self.receipt_after:
+                return None
+            return {
+                'transactionHash': tx_hash,
+                'blockHash': '0x' + '02' * 32,
+                'blockNumber': '0x2a',
+                'status': hex(self.status),
+                    }
+        raise ValueError('unexpected request {}'.format(o))
+
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAio(unittest.TestCase):
+
+    def setUp(self):
+        self.chain_spec = ChainSpec('evm', 'foochain', 42)
+        keystore = DictKeystore()
+        self.sender_address = keystore.new()
+        self.signer = EIP155Signer(keystore)
+
+
+    def client(self, rpc, concurrency=8):
+        return AsyncDemurrageTokenClient(
+                self.chain_spec,
+                rpc,
+                sender_address=self.sender_address,
+                signer=self.signer,
+                gas_oracle=OverrideGasOracle(price=1, limit=100000),
+                nonce_oracle=OverrideNonceOracle(self.sender_address, 42),
+                concurrency=concurrency,
+                )
+
+
+    def test_calls(self):
+        rpc = AsyncRPC()
+        c = self.client(rpc)
+
+        async def run():
+            balances = await c.balances_of(contract_address, holders)
+            period = await c.actual_period(contract_address)
+            return (balances, period,)
+
+        (balances, period,) = asyncio.run(run())
+        self.assertEqual(balances, [(i + 1) * 1000 for i in range(100)])
+        self.assertEqual(period, 42)
+        self.assertEqual(rpc.max_in_flight, 8)
+
+
+    def test_transactions(self):
+        rpc = AsyncRPC(receipt_after=2)
+        c = self.client(rpc)
+
+        async def run():
+            async with c:
+                return await asyncio.gather(
+                    c.mint_to(contract_address, holders[0], 1024, delay=0.001),
+                    c.transfer(contract_address, holders[1], 512, delay=0.001),
+                    c.change_period(contract_address, delay=0.001),
+                    c.apply_demurrage(contract_address, limit=100, wait=False),
+                    )
+
+        r = asyncio.run(run())
+        self.assertTrue(rpc.closed)
+        self.assertEqual(len(rpc.sent), 4)
+        # nonces are assigned in call order, so every transaction is distinct
+        self.assertEqual(len(set(v[0] for v in r)), 4)
+        for (tx_hash_hex, rcpt) in r[:3]:
+            self.assertEqual(rcpt['transaction_hash'], tx_hash_hex)
+            self.assertEqual(rpc.polls[tx_hash_hex], 3)
+        self.assertIsNone(r[3][1])
+
+
+    def test_wait_errors(self):
+        c = self.client(AsyncRPC(status=0))
+        with self.assertRaises(RevertEthException):
+            asyncio.run(c.change_period(contract_address, delay=0.001))
+
+        c = self.client(AsyncRPC(receipt_after=1000))
+        with self.assertRaises(TimeoutError):
+            asyncio.run(c.apply_demurrage(contract_address, delay=0.001, timeout=0.01))
+
+
+# json-rpc node answering eth_echo with its first param, after the number of seconds in its second param
+class EchoNode:
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = web.Application()
+        self.app.router.add_post('/', self.http)
+        self.app.router.add_get('/ws', self.ws)
+
+
+    async def echo(self, o):
+        self.in_flight += 1
+        self.max_in_flight = max(self.in_flight, self.max_in_flight)
+        try:
+            await asyncio.sleep(o['params'][1])
+        finally:
+            self.in_flight -= 1
+        return {
+            'jsonrpc': '2.0',
+            'id': o['id'],
+            'result': o['params'][0],
+                }
+
+
+    async def http(self, request):
+        o = await request.json()
+        return web.json_response(await self.echo(o))
+
+
+    async def ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async def reply(o):
+            r = await self.echo(o)
+            if not ws.closed:
+                await ws.send_str(json.dumps(r))
+
+        tasks = []
+        async for msg in ws:
+            o = json.loads(msg.data)
+            if o['method'] == 'close':
+                await ws.close()
+                break
+            tasks.append(asyncio.ensure_future(reply(o)))
+        for task in tasks:
+            task.cancel()
+        return ws
+
+
+def echo(v, delay=0.0):
+    return {
+        'jsonrpc': '2.0',
+        'id': 0,
+        'method': 'eth_echo',
+        'params': [v, delay],
+            }
+
+
+@unittest.skipIf(aiohttp == None, 'aiohttp not installed')
+class TestAioTransport(unittest.TestCase):
+
+    def run_node(self, fn):
+        node = EchoNode()
+
+        async def run():
+            server = test_utils.TestServer(node.app)
+            await server.start_server()
+            try:
+                return await fn(server)
+            finally:
+                await server.close()
+
+        return (node, asyncio.run(run()),)
+
+
+    def test_http_pool(self):
+        async def run(server):
+            async with AsyncHTTPConnection(str(server.make_url('/')), pool_size=2) as conn:
+                return await asyncio.gather(*[conn.do(echo(i, 0.01)) for i in range(10)])
+
+        (node, r) = self.run_node(run)
+        self.assertEqual(r, list(range(10)))
+        self.assertEqual(node.max_in_flight, 2)
+
+
+    def test_ws_ids(self):
+        async def run(server):
+            async with AsyncWebSocketConnection(str(server.make_url('/ws'))) as conn:
+                # every request has the same id, and responses arrive in reverse order
+                r = await asyncio.gather(*[conn.do(echo(i, 0.01 * (10 - i))) for i in range(10)])
+                self.assertEqual(conn.pending, {})
+                return r
+
+        (node, r) = self.run_node(run)
+        self.assertEqual(r, list(range(10)))
+        self.assertEqual(node.max_in_flight, 10)
+
+
+    def test_ws_close(self):
+        async def run(server):
+            async with AsyncWebSocketConnection(str(server.make_url('/ws'))) as conn:
+                pending = asyncio.ensure_future(conn.do(echo(1, 10.0)))
+                await asyncio.sleep(0.01)
+                await conn.ws.send_str(json.dumps({'jsonrpc': '2.0', 'id': 0, 'method': 'close', 'params': []}))
+                with self.assertRaises(RPCException):
+                    await asyncio.wait_for(pending, 1.0)
+                self.assertIsNone(conn.ws)
+                self.assertEqual(conn.pending, {})
+
+                # the socket is opened again on the next request
+                return await conn.do(echo(2))
+
+        (node, r) = self.run_node(run)
+        self.assertEqual(r, 2)
+
+
+    def test_ws_not_connected(self):
+        async def run(server):
+            async with AsyncWebSocketConnection(str(server.make_url('/ws'))) as conn:
+                async def connect():
+                    pass
+                conn.connect = connect
+                with self.assertRaises(RPCException):
+                    await conn.do(echo(1))
+
+        self.run_node(run)
+
+
+if __name__ == '__main__':
+    unittest.main()
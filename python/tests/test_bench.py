@@ -0,0 +1,140 @@
+# standard imports
+import os
+import csv
+import json
+import unittest
+import tempfile
+import shutil
+import logging
+import io
+
+# local imports
+from erc20_demurrage_token.bench import (
+        GasBenchmark,
+        GasStats,
+        BASELINE_VERSION,
+        bytecode_hash,
+        save_baseline,
+        load_baseline,
+        compare,
+        dump_curve,
+        write_curve,
+        )
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class TestBench(unittest.TestCase):
+
+    def setUp(self):
+        self.d = tempfile.mkdtemp()
+        self.path = os.path.join(self.d, 'baseline.json')
+
+
+    def tearDown(self):
+        shutil.rmtree(self.d)
+
+
+    def test_stats(self):
+        s = GasStats([300, 100, 200, 500])
+        self.assertEqual(s.min, 100)
+        self.assertEqual(s.median, 250)
+        self.assertEqual(s.max, 500)
+        self.assertEqual(s.serialize()['rounds'], 4)
+
+        with self.assertRaises(ValueError):
+            GasStats([])
+
+
+    def test_register(self):
+        bench = GasBenchmark()
+
+        @bench.scenario('foo')
+        def foo(case, i):
+            return i
+
+        bench.register('bar', foo, rounds=2)
+        self.assertEqual(list(bench.scenarios.keys()), ['foo', 'bar'])
+        with self.assertRaises(ValueError):
+            bench.register('foo', foo)
+
+
+    def test_baseline(self):
+        self.assertIsNone(load_baseline(self.path))
+
+        h = bytecode_hash('6080604052\n')
+        self.assertEqual(h, bytecode_hash('6080604052'))
+        results = {
+            'mint': GasStats([100, 110, 120]),
+            'burn': GasStats([50]),
+                }
+        save_baseline(self.path, results, contract_hash=h)
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+        baseline = load_baseline(self.path)
+        self.assertEqual(baseline['version'], BASELINE_VERSION)
+        self.assertEqual(baseline['contract'], h)
+        self.assertEqual(baseline['scenarios']['mint']['median'], 110)
+        self.assertEqual(baseline['scenarios']['burn']['max'], 50)
+
+        baseline['version'] = BASELINE_VERSION + 1
+        f = open(self.path, 'w')
+        json.dump(baseline, f)
+        f.close()
+        with self.assertRaises(ValueError):
+            load_baseline(self.path)
+
+
+    def test_compare(self):
+        baseline = {
+            'version': BASELINE_VERSION,
+            'contract': None,
+            'scenarios': {
+                'mint': {'min': 100, 'median': 1000, 'max': 1000, 'rounds': 1},
+                'burn': {'min': 100, 'median': 1000, 'max': 1000, 'rounds': 1},
+                },
+            }
+        results = {
+            'mint': GasStats([1050]),
+            'burn': GasStats([1051]),
+            'sweep': GasStats([1000000]),
+                }
+        regressions = compare(results, baseline, threshold=0.05)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0].name, 'burn')
+        self.assertEqual(regressions[0].baseline, 1000)
+        self.assertEqual(regressions[0].current, 1051)
+
+        regressions = compare(results, baseline, threshold=0.01)
+        self.assertEqual([r.name for r in regressions], ['burn', 'mint'])
+
+
+    def test_curve(self):
+        rows = [
+            {'gap': 1, 'total': 100, 'reverted_at': None},
+            {'gap': 10, 'total': 900, 'reverted_at': 7, 'extra': True},
+                ]
+        fields = ['gap', 'total', 'reverted_at']
+
+        path = os.path.join(self.d, 'curve.json')
+        write_curve(path, rows, fields)
+        f = open(path, 'r')
+        r = json.load(f)
+        f.close()
+        self.assertEqual(r[1], {'gap': 10, 'total': 900, 'reverted_at': 7})
+
+        path = os.path.join(self.d, 'curve.csv')
+        write_curve(path, rows, fields)
+        f = open(path, 'r')
+        r = list(csv.reader(f))
+        f.close()
+        self.assertEqual(r, [fields, ['1', '100', ''], ['10', '900', '7']])
+
+        f = io.StringIO()
+        dump_curve(f, rows, fields)
+        self.assertEqual(json.loads(f.getvalue())[0], {'gap': 1, 'total': 100, 'reverted_at': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from chainlib.chain import ChainSpec
+from chainlib.eth.block import block_latest
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+from erc20_demurrage_token.cache import DemurrageTokenCache
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+contract_address = '0x' + '01' * 20
+holder_address = '0x' + '02' * 20
+
+
+class CountingRPC:
+
+    def __init__(self):
+        self.requests = []
+
+
+    def do(self, o):
+        self.requests.append(o)
+        return '0x' + (len(self.requests)).to_bytes(32, byteorder='big').hex()
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.chain_spec = ChainSpec('evm', 'foochain', 42)
+        self.rpc = CountingRPC()
+        self.c = DemurrageToken(self.chain_spec)
+
+
+    def test_immutable(self):
+        conn = DemurrageTokenCache(self.rpc)
+        o = self.c.period_duration(contract_address)
+        r = conn.do(o)
+        o = self.c.period_duration(contract_address)
+        self.assertEqual(conn.do(o), r)
+        o = self.c.decimals(contract_address)
+        conn.do(o)
+        conn.do(o)
+        self.assertEqual(len(self.rpc.requests), 2)
+
+
+    def test_latest_passthrough(self):
+        conn = DemurrageTokenCache(self.rpc)
+        o = self.c.demurrage_amount(contract_address)
+        r_one = conn.do(o)
+        r_two = conn.do(o)
+        self.assertNotEqual(r_one, r_two)
+        o = block_latest()
+        conn.do(o)
+        self.assertEqual(len(self.rpc.requests), 3)
+
+
+    def test_pinned(self):
+        conn = DemurrageTokenCache(self.rpc, height=42)
+        o = self.c.base_balance_of(contract_address, holder_address)
+        r = conn.do(o)
+        self.assertEqual(self.rpc.requests[0]['params'][1], '0x000000000000002a')
+        self.assertEqual(o['params'][1], 'latest')
+        self.assertEqual(conn.do(o), r)
+        self.assertEqual(len(self.rpc.requests), 1)
+
+        conn.set_height(43)
+        self.assertNotEqual(conn.do(o), r)
+        conn.set_height(42)
+        self.assertEqual(conn.do(o), r)
+        self.assertEqual(len(self.rpc.requests), 2)
+
+        conn.set_height('0x' + 'ff' * 32)
+        conn.do(o)
+        self.assertEqual(self.rpc.requests[2]['params'][1], {'blockHash': '0x' + 'ff' * 32})
+
+
+    def test_max_entries(self):
+        conn = DemurrageTokenCache(self.rpc, height=42, max_entries=1)
+        o_one = self.c.base_balance_of(contract_address, holder_address)
+        o_two = self.c.account_period(contract_address, holder_address)
+        conn.do(o_one)
+        conn.do(o_two)
+        conn.do(o_one)
+        self.assertEqual(len(self.rpc.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# standard imports
+import unittest
+import logging
+import math
+import time
+
+# external imports
+from dexif import to_fixed
+
+# local imports
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token import demurrage
+from erc20_demurrage_token.demurrage import DemurrageCalculator
+from erc20_demurrage_token.clock import FixedClock
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+TAX_LEVEL = int(10000 * 2) # 2%
+PERIOD = 43200
+
+
+class TestCalculator(unittest.TestCase):
+
+    def setUp(self):
+        self.r_min = 1 - ((1 - (TAX_LEVEL / 1000000)) ** (1 / PERIOD))
+        self.calculator = DemurrageCalculator(self.r_min)
+
+
+    def test_abdk_conversion(self):
+        self.assertEqual(abdk.from_uint(42), 42 << 64)
+        self.assertEqual(abdk.to_uint(abdk.from_uint(42) + 1), 42)
+        with self.assertRaises(OverflowError):
+            abdk.from_uint(1 << 63)
+        with self.assertRaises(ValueError):
+            abdk.to_uint(-1)
+        self.assertEqual(abdk.to_int128((1 << 256) - 1), -1)
+
+
+    def test_abdk_div_truncates(self):
+        v = abdk.div(abdk.from_uint(1), -abdk.from_uint(3))
+        self.assertEqual(v, -(abdk.ONE_64X64 // 3))
+        with self.assertRaises(ZeroDivisionError):
+            abdk.div(abdk.ONE_64X64, 0)
+
+
+    def test_abdk_exp_ln(self):
+        self.assertEqual(abdk.exp(0), abdk.ONE_64X64)
+        self.assertEqual(abdk.ln(abdk.ONE_64X64), 0)
+        self.assertEqual(abdk.log_2(abdk.from_uint(8)), abdk.from_uint(3))
+        self.assertEqual(abdk.exp_2(abdk.from_uint(3)), abdk.from_uint(8))
+        self.assertEqual(abdk.exp(-0x400000000000000001), 0)
+        with self.assertRaises(OverflowError):
+            abdk.exp(0x400000000000000000)
+
+        for f in [0.5, 0.98, 0.99999995]:
+            x = to_fixed(f)
+            v = abdk.ln(x)
+            self.assertAlmostEqual(v / abdk.ONE_64X64, math.log(f), places=12)
+            self.assertAlmostEqual(abdk.exp(v) / abdk.ONE_64X64, f, places=12)
+
+
+    def test_decay_level(self):
+        v = self.calculator.decay_level / abdk.ONE_64X64
+        self.assertAlmostEqual(math.exp(v * PERIOD), 1 - (TAX_LEVEL / 1000000), places=6)
+
+
+    def test_decay_by(self):
+        self.assertEqual(self.calculator.decay_by(1000000, 0), 1000000)
+        v = self.calculator.decay_by(1000000, PERIOD)
+        self.assertLessEqual(v, 980000)
+        self.assertGreaterEqual(v, 979999)
+
+
+    def test_balance_of(self):
+        demurrage_amount = self.calculator.decay_modifier(PERIOD)
+        base_amount = self.calculator.to_base_amount(980000, demurrage_amount)
+        self.assertGreaterEqual(base_amount, 999999)
+
+        balance = self.calculator.balance_of(base_amount, demurrage_amount, 0, 59)
+        self.assertLessEqual(abs(balance - 980000), 1)
+
+        balance = self.calculator.balance_of(base_amount, demurrage_amount, 0, PERIOD * 60)
+        self.assertLessEqual(abs(balance - 960400), 1)
+
+
+    def test_decay_factor(self):
+        for minutes in [0, 1, 59, 1440, PERIOD - 1, PERIOD, (PERIOD * 13) + 7, 1 << 42]:
+            v = (1 - self.r_min) ** minutes
+            self.assertAlmostEqual(self.calculator.decay_factor(minutes), v, delta=v * 1e-10)
+        self.assertAlmostEqual(self.calculator.decay_factor(-PERIOD), 1 / 0.98)
+
+
+    def test_clock(self):
+        now = int(time.time())
+        clock = FixedClock(now)
+        calculator = DemurrageCalculator(self.r_min, clock=clock)
+        v = calculator.amount_at(1000000, now - (PERIOD * 60), now)
+        self.assertAlmostEqual(v, 980000, delta=1)
+        self.assertEqual(calculator.amount_since(1000000, now - (PERIOD * 60)), v)
+        self.assertAlmostEqual(calculator.amount_since_slow(1000000, now - (PERIOD * 60)), v)
+
+        clock.set(now + 59)
+        self.assertEqual(calculator.amount_since(1000000, now), 1000000)
+        clock.set(now + 60)
+        self.assertEqual(calculator.amount_since(1000000, now), 1000000 * (1 - self.r_min))
+
+        r = calculator.amounts_since([1000000, 2000000], now, exact=True)
+        self.assertEqual(r, [999999, 1999999])
+        r = calculator.amounts_since([1000000, 2000000], now, now=now, exact=True)
+        self.assertEqual(r, [1000000, 2000000])
+
+
+    def test_amounts_since_exact(self):
+        now = int(time.time())
+        amounts = [1000000, 2000000, (1 << 64) * 1000000]
+        timestamps = [now, now - (PERIOD * 60), now - (PERIOD * 60)]
+        r = self.calculator.amounts_since(amounts, timestamps, exact=True)
+        self.assertIsInstance(r, list)
+        self.assertEqual(r[0], 1000000)
+        self.assertLessEqual(abs(r[1] - 1960000), 1)
+        self.assertEqual(r[2] >> 64, r[1] // 2)
+
+        r_exact = self.calculator.amounts_since(amounts[:2], timestamps[:2], exact=True)
+        self.assertEqual(r_exact, r[:2])
+
+        with self.assertRaises(ValueError):
+            self.calculator.amounts_since(amounts, now + 60, now=now, exact=True)
+        with self.assertRaises(ValueError):
+            self.calculator.amounts_since(amounts, timestamps[:2], exact=True)
+
+
+    @unittest.skipIf(demurrage.numpy == None, 'numpy not available')
+    def test_amounts_since_numpy(self):
+        numpy = demurrage.numpy
+        now = int(time.time())
+        amounts = numpy.array([1000000, 2000000, 3000000])
+        r = self.calculator.amounts_since(amounts, now - (PERIOD * 60))
+        self.assertIsInstance(r, numpy.ndarray)
+        for i, v in enumerate(r):
+            self.assertAlmostEqual(v, amounts[i] * 0.98, delta=1)
+
+        r = self.calculator.amounts_since([1000000, 1000000], [now, now - 60])
+        self.assertEqual(r[0], 1000000.0)
+        self.assertAlmostEqual(r[1], 1000000 * (1 - self.r_min))
+
+        # the float model is used whatever the size of the amounts
+        r = self.calculator.amounts_since([10 ** 18, 2 * 10 ** 18], numpy.int64(now - 60), now=now)
+        self.assertIsInstance(r, numpy.ndarray)
+        self.assertEqual(r.dtype, numpy.float64)
+        self.assertAlmostEqual(r[1] / r[0], 2.0)
+
+        # scalar numpy timestamps in the exact model
+        r = self.calculator.amounts_since([10 ** 18, 2 * 10 ** 18], numpy.int64(now), now=now, exact=True)
+        self.assertEqual(r, [10 ** 18, 2 * 10 ** 18])
+
+        with self.assertRaises(ValueError):
+            self.calculator.amounts_since(amounts, numpy.array([now, now, now + 60]), now=now)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# standard imports
+import unittest
+import logging
+import random
+import copy
+
+# external imports
+from chainlib.eth.nonce import RPCNonceOracle
+from chainlib.eth.tx import receipt
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token.demurrage import DemurrageCalculator
+
+# test imports
+from erc20_demurrage_token.unittest import TestDemurrageDefault
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+ROUNDS = 20
+
+
+class TestCalculatorContract(TestDemurrageDefault):
+
+    def setUp(self):
+        super(TestCalculatorContract, self).setUp()
+        self.random = random.Random(42)
+        self.c = DemurrageToken(self.chain_spec)
+
+
+    def decay_level(self, address):
+        o = self.c.decay_level(address, sender_address=self.accounts[0])
+        r = self.rpc.do(o)
+        return abdk.to_int128(self.c.parse_decay_level(r))
+
+
+    def test_ln(self):
+        self.assertEqual(self.decay_level(self.address), abdk.ln(self.publisher.settings.demurrage_level))
+
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
+        for i in range(5):
+            settings = copy.copy(self.publisher.settings)
+            settings.demurrage_level = self.random.randrange(1 << 63, 1 << 64)
+            (tx_hash, o) = c.constructor(self.accounts[0], settings)
+            self.rpc.do(o)
+            o = receipt(tx_hash)
+            r = self.rpc.do(o)
+            self.assertEqual(r['status'], 1)
+            self.assertEqual(self.decay_level(r['contract_address']), abdk.ln(settings.demurrage_level))
+
+
+    def test_decay_by(self):
+        calculator = DemurrageCalculator.from_contract(self.rpc, self.chain_spec, self.address, sender_address=self.accounts[0])
+        self.assertEqual(calculator.decay_level, self.decay_level(self.address))
+
+        cases = [(0, 0), ((1 << 63) - 1, 0), ((1 << 63) - 1, 1)]
+        for i in range(ROUNDS):
+            value = self.random.randrange(1 << self.random.randrange(1, 64))
+            # up to 20 years of minutes, past which the modifier truncates to zero
+            period = self.random.randrange(60 * 24 * 365 * 20)
+            cases.append((value, period,))
+
+        for (value, period) in cases:
+            o = self.c.decay_by(self.address, value, period, sender_address=self.accounts[0])
+            r = self.rpc.do(o)
+            self.assertEqual(calculator.decay_by(value, period), self.c.parse_decay_by(r), 'value {} period {}'.format(value, period))
+            # decayBy is exp of decayLevel times period, applied to the value
+            v = abdk.exp(abdk.mul(calculator.decay_level, abdk.from_uint(period)))
+            self.assertEqual(abdk.to_uint(abdk.mul(abdk.from_uint(value), v)), self.c.parse_decay_by(r))
+
+
+if __name__ == '__main__':
+    unittest.main()
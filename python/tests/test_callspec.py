@@ -0,0 +1,155 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from chainlib.chain import ChainSpec
+from chainlib.eth.nonce import OverrideNonceOracle
+from chainlib.eth.gas import OverrideGasOracle
+from chainlib.eth.tx import TxFormat
+from chainlib.eth.contract import (
+        ABIContractEncoder,
+        ABIContractType,
+        )
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+from erc20_demurrage_token.callspec import CallSpec
+
+logging.basicConfig(level=logging.INFO)
+logg = logging.getLogger()
+
+contract_address = '0x' + '01' * 20
+sender_address = '0x' + '11' * 20
+address = '0x' + 'Ab' * 20
+redistribution = '0x' + (
+    (3).to_bytes(32, byteorder='big').hex() +
+    (1000000).to_bytes(32, byteorder='big').hex() +
+    (18446744073709551615).to_bytes(32, byteorder='big').hex()
+    )
+
+
+def reference(method, args, literals={}):
+    enc = ABIContractEncoder()
+    enc.method(method)
+    for (i, (typ, v)) in enumerate(args):
+        if literals.get(i) != None:
+            enc.typ_literal(literals[i])
+        else:
+            enc.typ(typ)
+    for (typ, v) in args:
+        if typ == ABIContractType.ADDRESS:
+            enc.address(v)
+        elif typ == ABIContractType.BYTES32:
+            enc.bytes32(v)
+        else:
+            enc.uint256(v)
+    # the reference encoder keeps the case of checksum addresses
+    return enc.get().lower()
+
+
+def reference_redistribution(method):
+    enc = ABIContractEncoder()
+    enc.method(method)
+    enc.typ_literal('(uint32,uint72,uint64)')
+    v = strip_0x(redistribution)
+    enc.bytes32(v[:64])
+    enc.bytes32(v[64:128])
+    enc.bytes32(v[128:192])
+    return enc.get()
+
+
+class TestCallSpec(unittest.TestCase):
+
+    def setUp(self):
+        self.c = DemurrageToken(
+                ChainSpec('evm', 'foochain', 42),
+                nonce_oracle=OverrideNonceOracle(sender_address, 42),
+                gas_oracle=OverrideGasOracle(price=1, limit=100000),
+                )
+
+
+    def call_data(self, o):
+        return strip_0x(o['params'][0]['data'])
+
+
+    def test_encode(self):
+        spec = CallSpec('transfer', ['address', 'uint256'])
+        self.assertEqual(spec.selector, 'a9059cbb')
+        self.assertEqual(spec.encode(address, 1024), reference('transfer', [(ABIContractType.ADDRESS, address), (ABIContractType.UINT256, 1024)]))
+        # the template buffer is not changed by encoding
+        self.assertEqual(spec.encode(address, 1), reference('transfer', [(ABIContractType.ADDRESS, address), (ABIContractType.UINT256, 1)]))
+
+        spec = CallSpec('foo', ['int128'])
+        self.assertEqual(spec.encode(-1)[8:], 'ff' * 32)
+        with self.assertRaises(ValueError):
+            spec.encode(1 << 127)
+
+        spec = CallSpec('foo', ['bytes32'])
+        self.assertEqual(spec.encode('0x2a')[8:], '2a'.rjust(64, '0'))
+
+        spec = CallSpec('totalBurned')
+        self.assertEqual(spec.encode(), 'd89135cd')
+
+
+    def test_encode_invalid(self):
+        with self.assertRaises(ValueError):
+            CallSpec('foo', ['string'])
+        spec = CallSpec('foo', ['address'])
+        with self.assertRaises(ValueError):
+            spec.encode('0x' + '01' * 19)
+        with self.assertRaises(ValueError):
+            spec.encode()
+
+
+    def test_transactions(self):
+        a = (ABIContractType.ADDRESS, address)
+        v = (ABIContractType.UINT256, 1024)
+        cases = [
+            (self.c.transfer(contract_address, sender_address, address, 1024, tx_format=TxFormat.DICT), reference('transfer', [a, v])),
+            (self.c.transfer_from(contract_address, sender_address, address, address, 1024, tx_format=TxFormat.DICT), reference('transferFrom', [a, a, v])),
+            (self.c.approve(contract_address, sender_address, address, 1024, tx_format=TxFormat.DICT), reference('approve', [a, v])),
+            (self.c.increase_allowance(contract_address, sender_address, address, 1024, tx_format=TxFormat.DICT), reference('increaseAllowance', [a, v])),
+            (self.c.decrease_allowance(contract_address, sender_address, address, 1024, tx_format=TxFormat.DICT), reference('decreaseAllowance', [a, v])),
+            (self.c.add_writer(contract_address, sender_address, address, tx_format=TxFormat.DICT), reference('addWriter', [a])),
+            (self.c.delete_writer(contract_address, sender_address, address, tx_format=TxFormat.DICT), reference('deleteWriter', [a])),
+            (self.c.set_max_supply(contract_address, sender_address, 1024, tx_format=TxFormat.DICT), reference('setMaxSupply', [v])),
+            (self.c.mint_to(contract_address, sender_address, address, 1024, tx_format=TxFormat.DICT), reference('mintTo', [a, v])),
+            (self.c.burn(contract_address, sender_address, 1024, tx_format=TxFormat.DICT), reference('burn', [v])),
+            (self.c.set_sink_address(contract_address, sender_address, address, tx_format=TxFormat.DICT), reference('setSinkAddress', [a])),
+            (self.c.sweep(contract_address, sender_address, address, tx_format=TxFormat.DICT), reference('sweep', [a])),
+            (self.c.apply_demurrage(contract_address, sender_address, limit=1024, tx_format=TxFormat.DICT), reference('applyDemurrageLimited', [v])),
+            (self.c.apply_redistribution_on_account(contract_address, sender_address, address, tx_format=TxFormat.DICT), reference('applyRedistributionOnAccount', [a])),
+                ]
+        for (tx, data) in cases:
+            self.assertEqual(strip_0x(tx['data']), data)
+
+
+    def test_calls(self):
+        a = (ABIContractType.ADDRESS, address)
+        v = (ABIContractType.UINT256, 1024)
+        u = (ABIContractType.UINT256, 13)
+        cases = [
+            (self.c.total_burned(contract_address), reference('totalBurned', [])),
+            (self.c.to_base_amount(contract_address, 1024), reference('toBaseAmount', [v])),
+            (self.c.remainder(contract_address, 1024, 13), reference('remainder', [v, u])),
+            (self.c.redistributions(contract_address, 1024), reference('redistributions', [v])),
+            (self.c.account_period(contract_address, address), reference('accountPeriod', [a])),
+            (self.c.base_balance_of(contract_address, address), reference('baseBalanceOf', [a])),
+            (self.c.decay_by(contract_address, 1024, 13), reference('decayBy', [v, u])),
+            (self.c.get_distribution(contract_address, 1024, 13), reference('getDistribution', [v, u], literals={1: 'int128'})),
+            (self.c.to_redistribution(contract_address, 0, 13, 1024, 13), reference('toRedistribution', [(ABIContractType.UINT256, 0), u, v, u], literals={1: 'int128'})),
+            (self.c.to_redistribution_period(contract_address, redistribution), reference_redistribution('toRedistributionPeriod')),
+            (self.c.to_redistribution_supply(contract_address, redistribution), reference_redistribution('toRedistributionSupply')),
+            (self.c.to_redistribution_demurrage_modifier(contract_address, redistribution), reference_redistribution('toRedistributionDemurrageModifier')),
+            (self.c.get_distribution_from_redistribution(contract_address, redistribution), reference_redistribution('getDistributionFromRedistribution')),
+                ]
+        for (o, data) in cases:
+            self.assertEqual(o['method'], 'eth_call')
+            self.assertEqual(o['params'][1], 'latest')
+            self.assertEqual(self.call_data(o), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from dexif import from_fixed
+
+# local imports
+from erc20_demurrage_token import (
+        DemurrageToken,
+        DemurrageRedistribution,
+        )
+from erc20_demurrage_token.decode import (
+        to_view,
+        decode_word,
+        decode_words,
+        )
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+def to_word(v):
+    return v.to_bytes(32, byteorder='big')
+
+
+def item(period, value, demurrage):
+    return to_word(period) + to_word(value) + to_word(demurrage)
+
+
+class TestDecode(unittest.TestCase):
+
+    def test_word(self):
+        b = to_word(42) + to_word(13) + (-1).to_bytes(32, byteorder='big', signed=True)
+        self.assertEqual(decode_word(b), 42)
+        self.assertEqual(decode_word('0x' + b.hex(), 1), 13)
+        self.assertEqual(decode_word(memoryview(b), 2, signed=True), -1)
+        self.assertEqual(decode_words(b, count=2), [42, 13])
+        self.assertEqual(decode_words(bytearray(b), offset=1), [13, (1 << 256) - 1])
+        with self.assertRaises(ValueError):
+            decode_word(b, 3)
+        with self.assertRaises(ValueError):
+            decode_words(b[:40])
+        with self.assertRaises(ValueError):
+            decode_words(b, count=3, offset=1)
+
+
+    def test_view(self):
+        b = bytearray(item(1, 2, 3))
+        v = to_view(b)
+        # wraps the buffer without copying
+        b[31] = 7
+        self.assertEqual(decode_word(v), 7)
+        self.assertIs(to_view(v), v)
+
+
+    def test_parse(self):
+        self.assertEqual(DemurrageToken.parse_actual_period('0x' + to_word(42).hex()), 42)
+        self.assertEqual(DemurrageToken.parse_balance_of(to_word(1024).hex()), 1024)
+
+
+    def test_redistribution(self):
+        demurrage = 0xfae147ae147ae147
+        b = item(3, 1000000, demurrage)
+        for v in [b.hex(), '0x' + b.hex(), b, memoryview(b)]:
+            r = DemurrageRedistribution(v)
+            self.assertEqual(r.period, 3)
+            self.assertEqual(r.value, 1000000)
+            self.assertEqual(r.demurrage_fixed, demurrage)
+            self.assertAlmostEqual(r.demurrage, from_fixed(b[64:].hex()), places=15)
+
+        with self.assertRaises(AttributeError):
+            r.foo = 1
+
+        r = DemurrageRedistribution(item(1, 0, 0))
+        self.assertEqual(r.demurrage, 0.0)
+
+
+    def test_redistribution_many(self):
+        items = [item(i + 1, 1000 * i, i << 60) for i in range(100)]
+        b = b''.join(items)
+        r = DemurrageRedistribution.decode_many(b)
+        self.assertEqual(len(r), 100)
+        for i in range(100):
+            self.assertEqual(r[i].period, i + 1)
+            self.assertEqual(r[i].value, 1000 * i)
+            self.assertEqual(r[i].demurrage_fixed, i << 60)
+
+        r = DemurrageRedistribution.decode_many(b.hex(), count=2)
+        self.assertEqual([v.period for v in r], [1, 2])
+
+        with self.assertRaises(ValueError):
+            DemurrageRedistribution.decode_many(b[:-32])
+        with self.assertRaises(ValueError):
+            DemurrageRedistribution.decode_many(b[:64], count=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
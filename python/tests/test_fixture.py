@@ -0,0 +1,55 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from chainlib.eth.nonce import RPCNonceOracle
+from chainlib.eth.tx import receipt
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+
+# test imports
+from erc20_demurrage_token.unittest import TestDemurrageDefaultFixture
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+deployed = []
+
+
+class TestFixture(TestDemurrageDefaultFixture):
+
+    def setUp(self):
+        super(TestFixture, self).setUp()
+        deployed.append(self.address)
+
+
+    def mint_and_check(self):
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
+
+        o = c.total_supply(self.address, sender_address=self.accounts[0])
+        r = self.rpc.do(o)
+        self.assertEqual(c.parse_total_supply(r), 0)
+
+        (tx_hash, o) = c.mint_to(self.address, self.accounts[0], self.accounts[1], 1024)
+        self.rpc.do(o)
+        o = receipt(tx_hash)
+        r = self.rpc.do(o)
+        self.assertEqual(r['status'], 1)
+
+        # all tests share the same deployment
+        self.assertEqual(len(set(deployed)), 1)
+
+
+    def test_one(self):
+        self.mint_and_check()
+
+
+    def test_two(self):
+        self.mint_and_check()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from chainlib.chain import ChainSpec
+from chainlib.hash import keccak256_string_to_hex
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token.history import DemurrageRedistributionHistory
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+tokens = [
+    '0x' + '01' * 20,
+    '0x' + '02' * 20,
+        ]
+
+selector_count = keccak256_string_to_hex('redistributionCount()')[:8]
+selector_item = keccak256_string_to_hex('redistributions(uint256)')[:8]
+
+
+def to_word(v):
+    return v.to_bytes(32, byteorder='big').hex()
+
+
+class RedistributionRPC:
+
+    def __init__(self, state):
+        self.state = state
+        self.calls = []
+
+
+    def do(self, o):
+        self.calls.append(o)
+        tx = o['params'][0]
+        items = self.state[tx['to'].lower()]
+        data = strip_0x(tx['data'])
+        if data[:8] == selector_count:
+            return '0x' + to_word(len(items))
+        i = int(data[8:], 16)
+        (period, value,) = items[i]
+        return '0x' + to_word(period) + to_word(value) + to_word(i << 60)
+
+
+    def item_calls(self):
+        return [int(strip_0x(o['params'][0]['data'])[8:], 16) for o in self.calls if strip_0x(o['params'][0]['data'])[:8] == selector_item]
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.state = {
+            tokens[0]: [(i + 1, 1000 * i) for i in range(25)],
+            tokens[1]: [(1, 0)],
+                }
+        self.rpc = RedistributionRPC(self.state)
+        self.history = DemurrageRedistributionHistory(ChainSpec('evm', 'foochain', 42), batch_size=10)
+
+
+    def test_initial(self):
+        r = self.history.get(self.rpc, tokens[0])
+        self.assertEqual(len(r), 25)
+        self.assertEqual([v.period for v in r], list(range(1, 26)))
+        self.assertEqual(r[24].value, 24000)
+        self.assertEqual(r[3].demurrage_fixed, 3 << 60)
+        self.assertEqual(self.rpc.item_calls(), list(range(25)))
+        self.assertEqual(self.history.count(tokens[0]), 25)
+        self.assertEqual(self.history.count(tokens[1]), 0)
+
+
+    def test_tail(self):
+        self.history.get(self.rpc, tokens[0])
+        self.rpc.calls = []
+
+        # nothing appended, only the last item is refetched
+        self.state[tokens[0]][24] = (25, 42)
+        r = self.history.get(self.rpc, tokens[0])
+        self.assertEqual(self.rpc.item_calls(), [24])
+        self.assertEqual(r[24].value, 42)
+        self.rpc.calls = []
+
+        self.state[tokens[0]].append((26, 13))
+        self.state[tokens[0]].append((27, 0))
+        r = self.history.get(self.rpc, tokens[0])
+        self.assertEqual(self.rpc.item_calls(), [24, 25, 26])
+        self.assertEqual(len(r), 27)
+        self.assertEqual(r[25].value, 13)
+
+
+    def test_contracts(self):
+        self.history.get(self.rpc, tokens[0])
+        r = self.history.get(self.rpc, tokens[1].upper().replace('0X', '0x'))
+        self.assertEqual(len(r), 1)
+        self.assertEqual(len(self.history.cached(tokens[0])), 25)
+
+        self.history.flush(tokens[0])
+        self.assertEqual(self.history.cached(tokens[0]), [])
+        self.assertEqual(len(self.history.cached(tokens[1])), 1)
+
+        self.history.flush()
+        self.assertEqual(self.history.count(tokens[1]), 0)
+
+
+    def test_shrink(self):
+        self.history.get(self.rpc, tokens[0])
+        self.rpc.calls = []
+        del self.state[tokens[0]][20:]
+        r = self.history.get(self.rpc, tokens[0])
+        self.assertEqual(len(r), 20)
+        self.assertEqual(self.rpc.item_calls(), [19])
+        self.assertEqual(len(self.history.items), 20)
+
+
+    def test_height(self):
+        self.history.get(self.rpc, tokens[0], height=42)
+        for o in self.rpc.calls:
+            self.assertEqual(int(o['params'][1], 16), 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
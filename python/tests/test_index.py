@@ -0,0 +1,282 @@
+# standard imports
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+# external imports
+from chainlib.hash import keccak256_string_to_hex
+from chainlib.eth.address import to_checksum_address
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token.index import (
+        DemurrageTokenIndexer,
+        DemurrageTokenStore,
+        FileCheckpoint,
+        ReorgError,
+        decode_log,
+        )
+from erc20_demurrage_token.index.event import EVENT_SIGNATURES
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+contract_address = '0x' + '01' * 20
+minter = to_checksum_address('02' * 20)
+alice = to_checksum_address('03' * 20)
+bob = to_checksum_address('04' * 20)
+sink = to_checksum_address('05' * 20)
+
+
+def to_word(v):
+    return '0x' + (v % (1 << 256)).to_bytes(32, byteorder='big').hex()
+
+
+def address_word(v):
+    return '0x' + strip_0x(v).lower().rjust(64, '0')
+
+
+def make_log(name, block_number, log_index, topics, value):
+    return {
+        'address': contract_address,
+        'blockNumber': hex(block_number),
+        'blockHash': '0x' + block_number.to_bytes(32, byteorder='big').hex(),
+        'transactionHash': '0x' + (block_number * 1000 + log_index).to_bytes(32, byteorder='big').hex(),
+        'logIndex': hex(log_index),
+        'topics': ['0x' + keccak256_string_to_hex(EVENT_SIGNATURES[name])] + topics,
+        'data': to_word(value),
+        }
+
+
+class LogRPC:
+
+    def __init__(self, lgs, head=None):
+        self.lgs = lgs
+        self.requests = []
+        self.fork = 0
+        self.fork_block = 0
+        if head == None:
+            head = max([int(lg['blockNumber'], 16) for lg in self.lgs])
+        self.head = head
+
+
+    def block_hash(self, block_number):
+        if block_number < self.fork_block:
+            return '0x' + block_number.to_bytes(32, byteorder='big').hex()
+        return '0x' + (block_number + self.fork).to_bytes(32, byteorder='big').hex()
+
+
+    def do(self, o):
+        self.requests.append(o)
+        if o['method'] == 'eth_blockNumber':
+            return hex(self.head)
+        if o['method'] == 'eth_getBlockByNumber':
+            block_number = int(o['params'][0], 16)
+            return {'number': hex(block_number), 'hash': self.block_hash(block_number)}
+        q = o['params'][0]
+        from_block = int(q['fromBlock'], 16)
+        to_block = int(q['toBlock'], 16)
+        return [lg for lg in self.lgs if from_block <= int(lg['blockNumber'], 16) <= to_block]
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.half = abdk.ONE_64X64 >> 1
+        self.lgs = [
+            make_log('Mint', 1, 0, [address_word(minter), address_word(alice)], 1000),
+            make_log('Transfer', 2, 0, [address_word(alice), address_word(bob)], 400),
+            make_log('Decayed', 5, 0, [to_word(600), to_word(10), to_word(abdk.ONE_64X64)], self.half),
+            make_log('Redistribution', 5, 1, [address_word(sink), to_word(1)], 100),
+            make_log('Period', 5, 2, [], 2),
+            make_log('Burn', 5, 3, [address_word(bob)], 100),
+            # sweep moves the full base balance of alice
+            make_log('Transfer', 7, 0, [address_word(alice), address_word(bob)], 600),
+            ]
+
+
+    def test_decode(self):
+        e = decode_log(self.lgs[2])
+        self.assertEqual(e.name, 'Decayed')
+        self.assertEqual(e.block_number, 5)
+        self.assertEqual(e.log_index, 0)
+        self.assertEqual(e.args['timestamp'], 600)
+        self.assertEqual(e.args['period_count'], 10)
+        self.assertEqual(e.args['old_amount'], abdk.ONE_64X64)
+        self.assertEqual(e.args['new_amount'], self.half)
+
+        e = decode_log(self.lgs[1])
+        self.assertEqual(e.args['from'], alice)
+        self.assertEqual(e.args['to'], bob)
+        self.assertEqual(e.args['value'], 400)
+
+        lg = dict(self.lgs[1])
+        lg['topics'] = ['0x' + '00' * 32]
+        self.assertIsNone(decode_log(lg))
+
+
+    def test_store(self):
+        store = DemurrageTokenStore()
+        for lg in self.lgs:
+            store.apply(decode_log(lg))
+        self.assertEqual(store.demurrage_amount, self.half)
+        self.assertEqual(store.demurrage_timestamp, 600)
+        self.assertEqual(store.period, 2)
+        self.assertEqual(store.base_balance_of(alice), 0)
+        self.assertEqual(store.base_balance_of(bob), 400 - 200 + 600)
+        self.assertEqual(store.base_balance_of(sink), 200)
+        self.assertEqual(store.total_sink, 200)
+        self.assertEqual(store.total_supply(), 900)
+
+
+    def test_indexer_chunks(self):
+        rpc = LogRPC(self.lgs)
+        indexer = DemurrageTokenIndexer(contract_address, 1, chunk_size=3)
+        c = indexer.sync(rpc, to_block=5)
+        self.assertEqual(c, 6)
+        self.assertEqual(len([o for o in rpc.requests if o['method'] == 'eth_getLogs']), 2)
+        self.assertEqual(indexer.next_block, 6)
+
+        c = indexer.sync(rpc)
+        self.assertEqual(c, 1)
+        self.assertEqual(indexer.next_block, 8)
+        self.assertEqual(indexer.store.base_balance_of(bob), 800)
+
+
+    def test_rollback(self):
+        store = DemurrageTokenStore()
+        for lg in self.lgs[:2]:
+            store.apply(decode_log(lg))
+        state = store.serialize()
+        for lg in self.lgs[2:]:
+            store.apply(decode_log(lg))
+        self.assertEqual(store.rollback(2), 2)
+        self.assertEqual(store.serialize(), state)
+
+        store.prune(2)
+        with self.assertRaises(ValueError):
+            store.rollback(1)
+
+
+    def test_reorg(self):
+        rpc = LogRPC(self.lgs)
+        indexer = DemurrageTokenIndexer(contract_address, 1, reorg_depth=10)
+        indexer.sync(rpc)
+        self.assertEqual(indexer.store.base_balance_of(bob), 800)
+
+        # blocks from 6 are replaced, and the sweep is not in the new branch
+        rpc.lgs = self.lgs[:-1]
+        rpc.fork = 1000
+        rpc.fork_block = 6
+        rpc.head = 9
+        c = indexer.sync(rpc)
+        self.assertEqual(c, 0)
+        self.assertEqual(indexer.store.base_balance_of(bob), 200)
+        self.assertEqual(indexer.cursor(), (9, rpc.block_hash(9),))
+
+        rpc.fork = 2000
+        indexer.reorg_depth = 0
+        indexer.sync(rpc)
+        rpc.fork = 3000
+        rpc.fork_block = 0
+        with self.assertRaises(ReorgError):
+            indexer.sync(rpc)
+
+
+    def test_checkpoint(self):
+        d = tempfile.mkdtemp()
+        checkpoint = FileCheckpoint(os.path.join(d, 'checkpoint.json'))
+        rpc = LogRPC(self.lgs)
+        indexer = DemurrageTokenIndexer(contract_address, 1, checkpoint=checkpoint)
+        indexer.sync(rpc, to_block=5)
+
+        indexer = DemurrageTokenIndexer(contract_address, 1, checkpoint=checkpoint)
+        self.assertEqual(indexer.next_block, 6)
+        self.assertEqual(indexer.store.base_balance_of(sink), 200)
+        rpc.requests = []
+        c = indexer.sync(rpc)
+        self.assertEqual(c, 1)
+        q = [o for o in rpc.requests if o['method'] == 'eth_getLogs']
+        self.assertEqual(int(q[0]['params'][0]['fromBlock'], 16), 6)
+        self.assertEqual(indexer.store.base_balance_of(bob), 800)
+
+        with self.assertRaises(ValueError):
+            DemurrageTokenIndexer(bob, 1, checkpoint=checkpoint)
+        shutil.rmtree(d)
+
+
+    def test_checkpoint_log(self):
+        d = tempfile.mkdtemp()
+        path = os.path.join(d, 'checkpoint.json')
+        checkpoint = FileCheckpoint(path)
+        rpc = LogRPC(self.lgs)
+        indexer = DemurrageTokenIndexer(contract_address, 1, chunk_size=1, checkpoint=checkpoint, snapshot_interval=100)
+        indexer.sync(rpc)
+
+        # only the first chunk is saved in full, the others are logged
+        self.assertEqual(checkpoint.load()['block_number'], 1)
+        self.assertEqual([v['block_number'] for v in checkpoint.load_log()], [2, 3, 4, 5, 6, 7])
+
+        resumed = DemurrageTokenIndexer(contract_address, 1, checkpoint=checkpoint)
+        self.assertEqual(resumed.next_block, 8)
+        self.assertEqual(resumed.hashes, indexer.hashes)
+        self.assertEqual(resumed.store.serialize(), indexer.store.serialize())
+
+        # an entry cut short by a crash is discarded
+        f = open(checkpoint.log_path, 'a')
+        f.write('{"block_number": 8, "blo')
+        f.close()
+        resumed = DemurrageTokenIndexer(contract_address, 1, checkpoint=checkpoint)
+        self.assertEqual(resumed.next_block, 8)
+
+        resumed.save()
+        self.assertEqual(checkpoint.load()['block_number'], 7)
+        self.assertEqual(checkpoint.load_log(), [])
+        self.assertFalse(os.path.exists(checkpoint.log_path))
+
+        rpc.head = 200
+        resumed.sync(rpc)
+        self.assertEqual(checkpoint.load()['block_number'], 7)
+        self.assertEqual([v['block_number'] for v in checkpoint.load_log()], [200])
+        shutil.rmtree(d)
+
+
+    def test_checkpoint_reorg(self):
+        d = tempfile.mkdtemp()
+        checkpoint = FileCheckpoint(os.path.join(d, 'checkpoint.json'))
+        rpc = LogRPC(self.lgs)
+        indexer = DemurrageTokenIndexer(contract_address, 1, chunk_size=1, checkpoint=checkpoint, reorg_depth=10)
+        indexer.sync(rpc)
+
+        rpc.lgs = self.lgs[:-1]
+        rpc.fork = 1000
+        rpc.fork_block = 6
+        rpc.head = 9
+        indexer.sync(rpc)
+
+        resumed = DemurrageTokenIndexer(contract_address, 1, checkpoint=checkpoint)
+        self.assertEqual(resumed.cursor(), (9, rpc.block_hash(9),))
+        self.assertEqual(resumed.store.base_balance_of(bob), 200)
+        self.assertEqual(resumed.store.serialize(), indexer.store.serialize())
+        shutil.rmtree(d)
+
+
+    def test_history_trim(self):
+        store = DemurrageTokenStore(max_history=2)
+        for i in range(10):
+            store.apply(decode_log(make_log('Decayed', i + 1, 0, [to_word(60 * i), to_word(i), to_word(abdk.ONE_64X64)], self.half)))
+        store.prune(6)
+        # two final entries kept, blocks 7 - 10 can still be rolled back
+        self.assertEqual([e[0] for e in store.demurrage_history], [5, 6, 7, 8, 9, 10])
+        self.assertEqual(store.rollback(8), 2)
+        self.assertEqual([e[0] for e in store.demurrage_history], [5, 6, 7, 8])
+        self.assertEqual(store.demurrage_timestamp, 60 * 7)
+        store.prune(8)
+        self.assertEqual([e[0] for e in store.demurrage_history], [7, 8])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+# standard imports
+import io
+import unittest
+import logging
+from unittest.mock import patch
+
+# external imports
+from chainlib.chain import ChainSpec
+from chainlib.hash import keccak256_string_to_hex
+from chainlib.eth.gas import OverrideGasOracle
+from funga.eth.keystore.dict import DictKeystore
+from funga.eth.signer import EIP155Signer
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token.keeper import (
+        DemurrageTokenKeeperState,
+        KeeperAction,
+        read_state,
+        plan,
+        )
+try:
+    from erc20_demurrage_token.runnable import keeper as keeper_runnable
+except ImportError:
+    keeper_runnable = None
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+tokens = [
+    '0x' + '01' * 20,
+    '0x' + '02' * 20,
+        ]
+
+selectors = {
+    keccak256_string_to_hex('actualPeriod()')[:8]: 'actual_period',
+    keccak256_string_to_hex('lastPeriod()')[:8]: 'last_period',
+    keccak256_string_to_hex('demurrageTimestamp()')[:8]: 'demurrage_timestamp',
+        }
+
+
+class StateRPC:
+
+    def __init__(self, timestamp, state):
+        self.timestamp = timestamp
+        self.state = state
+        self.calls = []
+
+
+    def do(self, o):
+        if o['method'] == 'eth_blockNumber':
+            return '0x2a'
+        if o['method'] == 'eth_getBlockByNumber':
+            return {'number': o['params'][0], 'timestamp': hex(self.timestamp)}
+        self.calls.append(o)
+        tx = o['params'][0]
+        k = selectors[strip_0x(tx['data'])[:8]]
+        v = self.state[tx['to'].lower()][k]
+        return '0x' + v.to_bytes(32, byteorder='big').hex()
+
+
+def state(contract_address, periods_behind, minutes_behind):
+    timestamp = 1000000
+    return DemurrageTokenKeeperState(contract_address, timestamp, 10 + periods_behind, 9, timestamp - (minutes_behind * 60))
+
+
+class TestKeeper(unittest.TestCase):
+
+    def test_state(self):
+        s = DemurrageTokenKeeperState(tokens[0], 600, 4, 1, 10)
+        self.assertEqual(s.periods_behind(), 2)
+        self.assertEqual(s.minutes_behind(), 9)
+
+        s = DemurrageTokenKeeperState(tokens[0], 600, 1, 0, 600)
+        self.assertEqual(s.periods_behind(), 0)
+        self.assertEqual(s.minutes_behind(), 0)
+
+
+    def test_read_state(self):
+        rpc = StateRPC(6000, {
+            tokens[0]: {'actual_period': 5, 'last_period': 1, 'demurrage_timestamp': 60},
+            tokens[1]: {'actual_period': 2, 'last_period': 1, 'demurrage_timestamp': 5940},
+            })
+        r = read_state(rpc, ChainSpec('evm', 'foochain', 42), tokens)
+        self.assertEqual(len(rpc.calls), 6)
+        for o in rpc.calls:
+            self.assertEqual(o['params'][1], '0x000000000000002a')
+        self.assertEqual(r[0].contract_address, tokens[0])
+        self.assertEqual(r[0].periods_behind(), 3)
+        self.assertEqual(r[0].minutes_behind(), 99)
+        self.assertEqual(r[1].periods_behind(), 0)
+        self.assertEqual(r[1].minutes_behind(), 1)
+
+
+    def test_plan_idle(self):
+        states = [state(tokens[0], 0, 0), state(tokens[1], 0, 59)]
+        self.assertEqual(plan(states, 1000000), [])
+
+        r = plan(states, 1000000, min_minutes=30)
+        self.assertEqual(len(r), 1)
+        self.assertEqual(r[0].contract_address, tokens[1])
+        self.assertEqual(r[0].method, KeeperAction.APPLY_DEMURRAGE)
+        self.assertEqual(r[0].rounds, 59)
+
+
+    def test_plan_catchup(self):
+        states = [state(tokens[0], 3, 500)]
+        r = plan(states, 1000, change_period_gas=100, apply_demurrage_gas=50, max_rounds=200)
+        self.assertEqual([(v.method, v.rounds) for v in r], [
+            (KeeperAction.APPLY_DEMURRAGE, 200),
+            (KeeperAction.APPLY_DEMURRAGE, 200),
+            (KeeperAction.CHANGE_PERIOD, 0),
+            (KeeperAction.CHANGE_PERIOD, 0),
+            (KeeperAction.CHANGE_PERIOD, 0),
+            ])
+
+
+    def test_plan_budget(self):
+        states = [state(tokens[0], 1, 0), state(tokens[1], 5, 0)]
+        r = plan(states, 350, change_period_gas=100)
+        # most behind first, then round-robin
+        self.assertEqual([v.contract_address for v in r], [tokens[1], tokens[0], tokens[1]])
+        self.assertEqual(sum([v.gas for v in r]), 300)
+
+
+    def test_plan_rounds_gas(self):
+        states = [state(tokens[0], 0, 1000)]
+        r = plan(states, 600, apply_demurrage_gas=100, apply_demurrage_round_gas=1)
+        self.assertEqual(len(r), 1)
+        self.assertEqual(r[0].rounds, 500)
+        self.assertEqual(r[0].gas, 600)
+
+
+@unittest.skipIf(keeper_runnable == None, 'chainlib cli dependencies not available')
+class TestKeeperRunnable(unittest.TestCase):
+
+    def setUp(self):
+        self.argv = ['--once', '-z', '-p', 'http://localhost:8545', '-i', 'evm:foochain:42', '--nonce', '42', '--fee-price', '1', '--fee-limit', '100000', '--gas-budget', '1000000'] + tokens
+
+
+    def test_args(self):
+        (config, settings) = keeper_runnable.process_local_args(self.argv)
+        self.assertEqual([strip_0x(v).lower() for v in config.get('_TOKENS')], [strip_0x(v) for v in tokens])
+        self.assertTrue(config.get('_ONCE'))
+        self.assertEqual(config.get('_GAS_BUDGET'), 1000000)
+
+
+    def test_main_once(self):
+        rpc = StateRPC(6000, {
+            tokens[0]: {'actual_period': 5, 'last_period': 1, 'demurrage_timestamp': 60},
+            tokens[1]: {'actual_period': 1, 'last_period': 0, 'demurrage_timestamp': 6000},
+            })
+        keystore = DictKeystore()
+        sender_address = keystore.new()
+        process_local_args = keeper_runnable.process_local_args
+
+        def process_local_args_fake(argv):
+            (config, settings) = process_local_args(argv)
+            settings.set('CONN', rpc)
+            settings.set('SIGNER', EIP155Signer(keystore))
+            settings.set('SENDER_ADDRESS', sender_address)
+            settings.set('FEE_ORACLE', OverrideGasOracle(price=1, limit=100000))
+            settings.set('RPC_SEND', False)
+            return (config, settings,)
+
+        out = io.StringIO()
+        with patch.object(keeper_runnable, 'process_local_args', process_local_args_fake), patch('sys.stdout', out):
+            keeper_runnable.main(self.argv)
+
+        # one tick only, reading state of both tokens
+        self.assertEqual(len(rpc.calls), 6)
+        # three period changes for the token behind, none for the one caught up
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# standard imports
+import unittest
+import logging
+from unittest.mock import patch
+
+# external imports
+from chainlib.chain import ChainSpec
+from chainlib.hash import keccak256_string_to_hex
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token import batch as batch_module
+from erc20_demurrage_token.multicall import balances_of
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+token_address = '0x' + '02' * 20
+
+
+def to_word(v):
+    return (v % (1 << 256)).to_bytes(32, byteorder='big').hex()
+
+selectors = {
+    keccak256_string_to_hex('balanceOf(address)')[:8]: 'balance_of',
+    keccak256_string_to_hex('baseBalanceOf(address)')[:8]: 'base_balance_of',
+    keccak256_string_to_hex('demurrageAmount()')[:8]: 'demurrage_amount',
+    keccak256_string_to_hex('demurrageTimestamp()')[:8]: 'demurrage_timestamp',
+        }
+
+demurrage_amount = abdk.exp(-abdk.ONE_64X64 // 100)
+
+
+class BalancesRPC:
+
+    def __init__(self):
+        self.heights = []
+        self.calls = 0
+
+
+    def do(self, o):
+        if o['method'] == 'eth_blockNumber':
+            return '0x2a'
+        if o['method'] == 'eth_getBlockByNumber':
+            return {'number': o['params'][0], 'timestamp': hex(1000000)}
+        self.calls += 1
+        self.heights.append(o['params'][1])
+        data = strip_0x(o['params'][0]['data'])
+        k = selectors[data[:8]]
+        if k == 'balance_of':
+            return '0x' + to_word(int(data[8:], 16) % 1000)
+        elif k == 'base_balance_of':
+            return '0x' + to_word(int(data[8:], 16) % 1000 + 1)
+        elif k == 'demurrage_amount':
+            return '0x' + to_word(demurrage_amount)
+        elif k == 'demurrage_timestamp':
+            return '0x' + to_word(999960)
+
+
+class TestMulticall(unittest.TestCase):
+
+    def setUp(self):
+        self.chain_spec = ChainSpec('evm', 'foochain', 42)
+
+
+    def check_balances(self, r, accounts):
+        self.assertEqual(r.block_number, 42)
+        self.assertEqual(r.timestamp, 1000000)
+        self.assertEqual(r.demurrage_amount, demurrage_amount)
+        self.assertEqual(r.demurrage_timestamp, 999960)
+        self.assertEqual(r.balances, [int(a, 16) % 1000 for a in accounts])
+        self.assertEqual(r.base_balances, [int(a, 16) % 1000 + 1 for a in accounts])
+
+
+    def test_balances_of_batch(self):
+        accounts = ['0x' + i.to_bytes(20, byteorder='big').hex() for i in range(1, 24)]
+        rpc = BalancesRPC()
+        sizes = []
+        send_batch = batch_module.send_batch
+
+        def send_batch_counted(rpc, requests):
+            sizes.append(len(requests))
+            return send_batch(rpc, requests)
+
+        with patch.object(batch_module, 'send_batch', send_batch_counted):
+            r = balances_of(rpc, self.chain_spec, token_address, accounts, chunk_size=10)
+        self.check_balances(r, accounts)
+        self.assertEqual(sizes, [22, 20, 6])
+        for height in rpc.heights:
+            self.assertEqual(int(height, 16), 42)
+
+        r = balances_of(BalancesRPC(), self.chain_spec, token_address, [])
+        self.assertEqual(r.balances, [])
+        self.assertEqual(r.demurrage_timestamp, 999960)
+
+
+if __name__ == '__main__':
+    unittest.main()
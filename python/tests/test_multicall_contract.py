@@ -0,0 +1,67 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from chainlib.eth.nonce import RPCNonceOracle
+from chainlib.eth.tx import receipt
+from chainlib.eth.block import (
+        block_latest,
+        block_by_number,
+        )
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token import DemurrageToken
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token.multicall import balances_of
+
+# test imports
+from erc20_demurrage_token.unittest import TestDemurrageDefault
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class TestMulticallContract(TestDemurrageDefault):
+
+    def test_balances_of(self):
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        c = DemurrageToken(self.chain_spec, signer=self.signer, nonce_oracle=nonce_oracle)
+        for (i, account) in enumerate(self.accounts[1:6]):
+            (tx_hash, o) = c.mint_to(self.address, self.accounts[0], account, 1024 * (i + 1))
+            self.rpc.do(o)
+            o = receipt(tx_hash)
+            r = self.rpc.do(o)
+            self.assertEqual(r['status'], 1)
+
+        self.backend.time_travel(self.start_time + self.period_seconds + 3600)
+        (tx_hash, o) = c.apply_demurrage(self.address, self.accounts[0])
+        self.rpc.do(o)
+
+        accounts = self.accounts[:8]
+        r = balances_of(self.rpc, self.chain_spec, self.address, accounts, chunk_size=3)
+
+        o = block_latest()
+        self.assertEqual(r.block_number, self.rpc.do(o))
+        o = block_by_number(r.block_number)
+        self.assertEqual(r.timestamp, self.rpc.do(o)['timestamp'])
+
+        o = c.demurrage_amount(self.address, sender_address=self.accounts[0])
+        v = self.rpc.do(o)
+        self.assertEqual(r.demurrage_amount, abdk.to_int128(int(strip_0x(v), 16)))
+        self.assertEqual(r.demurrage_amount / abdk.ONE_64X64, c.parse_demurrage_amount(v))
+        o = c.demurrage_timestamp(self.address, sender_address=self.accounts[0])
+        self.assertEqual(r.demurrage_timestamp, c.parse_demurrage_timestamp(self.rpc.do(o)))
+
+        for (i, account) in enumerate(accounts):
+            o = c.balance_of(self.address, account, sender_address=self.accounts[0])
+            self.assertEqual(r.balances[i], c.parse_balance_of(self.rpc.do(o)))
+            o = c.base_balance_of(self.address, account, sender_address=self.accounts[0])
+            self.assertEqual(r.base_balances[i], c.parse_balance_of(self.rpc.do(o)))
+        self.assertEqual(r.base_balances[1], 1024)
+        self.assertLess(r.balances[1], 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
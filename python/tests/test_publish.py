@@ -0,0 +1,35 @@
+# standard imports
+import os
+import sys
+import json
+import unittest
+import subprocess
+
+testdir = os.path.dirname(__file__)
+rootdir = os.path.join(testdir, '..')
+
+# modules the publish entry point must only load once arguments are parsed
+heavy_modules = [
+    'erc20_demurrage_token.token',
+    'chainlib.eth.cli',
+    'chainlib.eth.settings',
+    'chainlib.eth.tx',
+    'funga',
+    'dexif',
+        ]
+
+
+class TestPublish(unittest.TestCase):
+
+    def test_import_lazy(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([rootdir, env.get('PYTHONPATH', '')])
+        code = 'import sys, json; import erc20_demurrage_token.runnable.publish; print(json.dumps(list(sys.modules.keys())))'
+        r = subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True)
+        modules = json.loads(r.stdout)
+        for k in heavy_modules:
+            self.assertNotIn(k, modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
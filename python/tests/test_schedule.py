@@ -0,0 +1,101 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from chainlib.chain import ChainSpec
+from chainlib.hash import keccak256_string_to_hex
+from dexif import to_fixed
+from hexathon import strip_0x
+
+# local imports
+from erc20_demurrage_token import DemurrageTokenSettings
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token.schedule import DemurragePeriodSchedule
+from erc20_demurrage_token.sim import DemurrageTokenOfflineSimulation
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+contract_address = '0x' + '01' * 20
+decay_per_minute = 0.00000046765515
+period_minutes = 10800
+start_timestamp = 1000000
+
+
+def create_settings():
+    settings = DemurrageTokenSettings()
+    settings.name = 'Simulated Demurrage Token'
+    settings.symbol = 'SIM'
+    settings.decimals = 6
+    settings.demurrage_level = to_fixed(1 - decay_per_minute)
+    settings.period_minutes = period_minutes
+    return settings
+
+
+class ParamsRPC:
+
+    def __init__(self, values):
+        self.values = {}
+        for (k, v) in values.items():
+            self.values[keccak256_string_to_hex(k + '()')[:8]] = v
+        self.calls = []
+
+
+    def do(self, o):
+        self.calls.append(o)
+        v = self.values[strip_0x(o['params'][0]['data'])[:8]]
+        return '0x' + (v % (1 << 256)).to_bytes(32, byteorder='big').hex()
+
+
+class TestSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = DemurrageTokenOfflineSimulation(create_settings(), actors=1, start_timestamp=start_timestamp)
+        self.schedule = DemurragePeriodSchedule(self.sim.period_start, self.sim.period_duration, self.sim.decay_level, periods=10)
+
+
+    def test_period(self):
+        duration = period_minutes * 60
+        self.assertEqual(len(self.schedule), 10)
+        self.assertEqual(self.schedule.period_at(start_timestamp), 1)
+        self.assertEqual(self.schedule.period_at(start_timestamp + duration - 1), 1)
+        self.assertEqual(self.schedule.period_at(start_timestamp + duration), 2)
+        self.assertEqual(self.schedule.period_at(start_timestamp + (100 * duration)), 101)
+        self.assertEqual(self.schedule.start_of(2), start_timestamp + duration)
+        self.assertEqual(self.schedule.end_of(2), start_timestamp + (2 * duration))
+        with self.assertRaises(ValueError):
+            self.schedule.period_at(start_timestamp - 1)
+        with self.assertRaises(ValueError):
+            self.schedule.modifier(0)
+
+
+    def test_simulation(self):
+        self.sim.mint(self.sim.actors[0], self.sim.from_units(100))
+        # past the precomputed periods, modifiers are calculated on demand
+        for i in range(14):
+            self.sim.next()
+            self.assertEqual(self.schedule.period_at(self.sim.get_now()), self.sim.actual_period())
+            self.sim.change_period()
+        self.assertEqual(len(self.sim.redistributions), 15)
+        for (period, value, demurrage) in self.sim.redistributions:
+            self.assertEqual(self.schedule.redistribution_demurrage(period), demurrage)
+        self.assertEqual(self.schedule.modifier(1), abdk.ONE_64X64)
+        self.assertLess(self.schedule.modifier(3), self.schedule.modifier(2))
+        self.assertEqual(self.schedule.modifier_at(self.sim.get_now()), self.schedule.modifier(15))
+
+
+    def test_from_contract(self):
+        rpc = ParamsRPC({
+            'periodStart': start_timestamp,
+            'periodDuration': period_minutes * 60,
+            'decayLevel': self.sim.decay_level,
+            })
+        schedule = DemurragePeriodSchedule.from_contract(rpc, ChainSpec('evm', 'foochain', 42), contract_address, periods=10)
+        self.assertEqual(len(rpc.calls), 3)
+        self.assertEqual(schedule.decay_level, self.sim.decay_level)
+        self.assertEqual(schedule.modifiers, self.schedule.modifiers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# standard imports
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+# external imports
+from chainlib.eth.address import to_checksum_address
+
+# local imports
+from erc20_demurrage_token import abdk
+from erc20_demurrage_token.snapshot import (
+        DemurrageTokenState,
+        DemurrageTokenSnapshot,
+        write_snapshot,
+        )
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+def to_word(v):
+    return v.to_bytes(32, byteorder='big').hex()
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.d = tempfile.mkdtemp()
+        self.path = os.path.join(self.d, 'snapshot')
+        self.state = DemurrageTokenState(42, -(abdk.ONE_64X64 >> 1), 1234, total_sink=100, burned=10, supply=1000)
+        for i in range(255, 0, -3):
+            self.state.base_balances[to_checksum_address((bytes([i]) * 20).hex())] = (1 << 200) + i
+        self.state.redistributions.append(to_word(1) + to_word(1000) + to_word(0))
+        self.state.redistributions.append(to_word(2) + to_word(990) + to_word(abdk.ONE_64X64 >> 1))
+
+
+    def tearDown(self):
+        shutil.rmtree(self.d)
+
+
+    def test_roundtrip(self):
+        write_snapshot(self.path, self.state)
+        with DemurrageTokenSnapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.block_number, 42)
+            self.assertEqual(snapshot.demurrage_amount, -(abdk.ONE_64X64 >> 1))
+            self.assertEqual(snapshot.demurrage_timestamp, 1234)
+            self.assertEqual(snapshot.total_sink, 100)
+            self.assertEqual(snapshot.total_supply(), 990)
+            self.assertEqual(len(snapshot), len(self.state.base_balances))
+            self.assertEqual(dict(snapshot.base_balances()), self.state.base_balances)
+            for (k, v) in self.state.base_balances.items():
+                self.assertEqual(snapshot.base_balance_of(k), v)
+                self.assertEqual(snapshot.base_balance_of(k.lower()), v)
+            self.assertEqual(snapshot.base_balance_of('0x' + '01' * 20), 0)
+            self.assertEqual(snapshot.base_balance_of('0x' + 'ff' * 20), (1 << 200) + 255)
+
+            self.assertEqual(snapshot.redistribution_item(1), self.state.redistributions[1])
+            r = snapshot.redistribution(1)
+            self.assertEqual(r.period, 2)
+            self.assertEqual(r.value, 990)
+
+
+    def test_empty(self):
+        state = DemurrageTokenState(1, abdk.ONE_64X64, 0)
+        write_snapshot(self.path, state)
+        with DemurrageTokenSnapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 0)
+            self.assertEqual(snapshot.base_balance_of('0x' + '01' * 20), 0)
+
+
+    def test_invalid(self):
+        write_snapshot(self.path, self.state)
+        f = open(self.path, 'r+b')
+        f.truncate(300)
+        f.close()
+        with self.assertRaises(ValueError):
+            DemurrageTokenSnapshot(self.path)
+
+        f = open(self.path, 'r+b')
+        f.write(b'foo')
+        f.close()
+        with self.assertRaises(ValueError):
+            DemurrageTokenSnapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()